@@ -342,8 +342,8 @@ class SimpleJobSerializer(serializers.Serializer):
 
     def get_formats(self, obj):
         formats = []
-        data_provider_tasks, filtered_data_provider_tasks = attribute_class_filter(
-            obj.data_provider_tasks.all(), self.context["request"].user
+        data_provider_tasks, filtered_data_provider_tasks = provider_attribute_class_filter(
+            obj.data_provider_tasks.all(), self.context
         )
         for data_provider_task in data_provider_tasks:
             if hasattr(data_provider_task, "formats"):
@@ -413,16 +413,25 @@ class ExportRunSerializer(serializers.ModelSerializer):
 
     def get_provider_task_list_status(self, obj):
         request = self.context["request"]
-        return get_provider_task_list_status(request.user, obj.data_provider_task_records.all())
+        if "restricted_attribute_class_ids" not in self.context:
+            return get_provider_task_list_status(request.user, obj.data_provider_task_records.all())
+        data_provider_task_records, filtered_provider_tasks = provider_attribute_class_filter(
+            [record for record in obj.data_provider_task_records.all() if record.slug != "run"], self.context
+        )
+        if not data_provider_task_records:
+            return "EMPTY"
+        if not filtered_provider_tasks:
+            return "COMPLETE"
+        return "PARTIAL"
 
     def get_provider_tasks(self, obj):
         if not obj.deleted:
             request = self.context["request"]
             data = []
-            data_provider_tasks, filtered_data_provider_tasks = attribute_class_filter(
-                obj.data_provider_task_records.all(), request.user
+            data_provider_tasks, filtered_data_provider_tasks = provider_attribute_class_filter(
+                obj.data_provider_task_records.all(), self.context
             )
-            if data_provider_tasks.count() > 1:  # The will always be a run task.
+            if len(data_provider_tasks) > 1:  # The will always be a run task.
                 if request.query_params.get("slim"):
                     data = DataProviderListSerializer(data_provider_tasks, many=True, context=self.context).data
                 else:
@@ -439,17 +448,24 @@ class ExportRunSerializer(serializers.ModelSerializer):
             return data
 
     def get_zipfile(self, obj):
-        request = self.context["request"]
-        data_provider_task_records, filtered_data_provider_task_records = attribute_class_filter(
-            obj.data_provider_task_records.exclude(slug="run"), request.user
-        )
+        if "run_zip_files" in self.context:
+            data_provider_task_records, filtered_data_provider_task_records = provider_attribute_class_filter(
+                [record for record in obj.data_provider_task_records.all() if record.slug != "run"], self.context
+            )
+            run_zip_file = self.context["run_zip_files"].get(
+                frozenset(record.id for record in data_provider_task_records)
+            )
+        else:
+            data_provider_task_records, filtered_data_provider_task_records = attribute_class_filter(
+                obj.data_provider_task_records.exclude(slug="run"), self.context["request"].user
+            )
+            run_zip_file = get_run_zip_file(values=data_provider_task_records).first()
 
         if filtered_data_provider_task_records:
             data = None
         else:
             data = {"status": TaskState.PENDING.value}
 
-        run_zip_file = get_run_zip_file(values=data_provider_task_records).first()
         if run_zip_file:
             data = RunZipFileSerializer(run_zip_file, context=self.context).data
         elif obj.status == TaskState.FAILED.value:
@@ -506,7 +522,7 @@ class RunZipFileSerializer(serializers.ModelSerializer):
     def get_status(self, obj):
         if obj.downloadable_file:
             try:
-                return ExportTaskRecord.objects.get(result=obj.downloadable_file).status
+                return obj.downloadable_file.export_task.status
             except ExportTaskRecord.DoesNotExist:
                 logger.error(f"ExportTaskRecord does not exist for file: {obj.downloadable_file}")
         return obj.status
@@ -1693,6 +1709,27 @@ def get_selection_dict(obj):
     return feature_collection
 
 
+def provider_attribute_class_filter(queryset_or_list, context):
+    """
+    Splits DataProviderTasks or DataProviderTaskRecords by whether their provider is restricted to the user by an
+    attribute class. When the restrictions were loaded up front with get_run_serializer_context this doesn't query the
+    database, otherwise it falls back to attribute_class_filter.
+    :param queryset_or_list: The DataProviderTasks or DataProviderTaskRecords.
+    :param context: The serializer context.
+    :return: A tuple of the allowed and the filtered items.
+    """
+    restricted_attribute_class_ids = context.get("restricted_attribute_class_ids")
+    if restricted_attribute_class_ids is None:
+        return attribute_class_filter(queryset_or_list, context["request"].user)
+    allowed, filtered = [], []
+    for item in queryset_or_list:
+        if item.provider and item.provider.attribute_class_id in restricted_attribute_class_ids:
+            filtered.append(item)
+        else:
+            allowed.append(item)
+    return allowed, filtered
+
+
 def get_provider_task_list_status(user, data_provider_task_records):
     if data_provider_task_records and isinstance(data_provider_task_records.first(), DataProviderTaskRecord):
         data_provider_task_records = data_provider_task_records.exclude(slug="run")
@@ -11,6 +11,8 @@ from django.contrib.auth.models import Group, User
 from django.contrib.gis.gdal import DataSource
 from django.contrib.gis.geos import GeometryCollection, GEOSGeometry, LineString, Point, Polygon
 from django.core import serializers
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -19,7 +21,7 @@ from rest_framework.serializers import ValidationError
 from rest_framework.test import APITestCase
 
 from eventkit_cloud.api.pagination import LinkHeaderPagination
-from eventkit_cloud.api.views import ExportRunViewSet, get_models, get_provider_task
+from eventkit_cloud.api.views import ESTIMATE_CACHE_TIMEOUT, ExportRunViewSet, get_models, get_provider_task
 from eventkit_cloud.core.models import AttributeClass, GroupPermission, GroupPermissionLevel
 from eventkit_cloud.jobs.admin import get_example_from_file
 from eventkit_cloud.jobs.models import (
@@ -48,6 +50,7 @@ from eventkit_cloud.tasks.models import (
 )
 from eventkit_cloud.tasks.task_factory import InvalidLicense
 from eventkit_cloud.user_requests.models import DataProviderRequest, SizeIncreaseRequest
+from eventkit_cloud.utils.stats.geomutils import get_estimate_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -1013,6 +1016,37 @@ class TestExportRunViewSet(APITestCase):
         self.assertEqual(1, len(result))
         self.assertEqual(self.run_uid, result[0].get("uid"))
 
+    def test_list_runs_query_count(self):
+        def add_run():
+            run = ExportRun.objects.create(job=self.job, user=self.user)
+            DataProviderTaskRecord.objects.create(run=run, name="run", slug="run")
+            data_provider_task_record = DataProviderTaskRecord.objects.create(
+                run=run, provider=self.provider, name=self.provider.name, slug=self.provider.slug
+            )
+            run_zip_file = RunZipFile.objects.create(run=run)
+            run_zip_file.data_provider_task_records.set([data_provider_task_record])
+            return run, run_zip_file
+
+        def get_table_query_counts():
+            tables = [AttributeClass._meta.db_table, RunZipFile._meta.db_table]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f"{reverse('api:runs-list')}?job_uid={self.job.uid}")
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            counts = [len([query for query in queries if f'"{table}"' in query["sql"]]) for table in tables]
+            return response.data, counts
+
+        run, run_zip_file = add_run()
+        result, counts = get_table_query_counts()
+        zipfile = next(data["zipfile"] for data in result if data["uid"] == str(run.uid))
+        self.assertEqual(str(run_zip_file.uid), zipfile["uid"])
+
+        for _ in range(4):
+            add_run()
+        result, more_runs_counts = get_table_query_counts()
+        self.assertEqual(6, len(result))
+        # The attribute classes and zip files are loaded for all of the runs at once.
+        self.assertEqual(counts, more_runs_counts)
+
     @patch("eventkit_cloud.api.views.ExportRunViewSet.validate_licenses")
     def test_list_runs_invalid_license(self, mock_validate_licenses):
         from eventkit_cloud.tasks.task_factory import InvalidLicense
@@ -2086,6 +2120,22 @@ class TestDataProviderViewSet(APITestCase):
         expected_uids.pop(2)
         self.assertEqual(filtered_providers_uid, expected_uids)
 
+    def test_list_cache_cleared_on_save(self):
+        url = reverse("api:providers-list")
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        self.assertIn("providername0", [provider["name"] for provider in response.json()])
+
+        provider = self.data_providers[0]
+        provider.name = "updatedprovidername0"
+        provider.save()
+
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        provider_names = [provider["name"] for provider in response.json()]
+        self.assertIn("updatedprovidername0", provider_names)
+        self.assertNotIn("providername0", provider_names)
+
 
 class TestDataProviderRequestViewSet(APITestCase):
     def setUp(self):
@@ -2393,3 +2443,43 @@ class TestMetricsViewSet(APITestCase):
         self.assertEqual(expected_keys, list(response_data.keys()))
 
         # TODO: Add example users, groups, and UserDownloads to ensure filters work correctly.
+
+
+class TestEstimatorView(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="demo", email="demo@demo.com", password="demo")
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + token.key,
+            HTTP_ACCEPT="application/json; version=1.0",
+            HTTP_ACCEPT_LANGUAGE="en",
+            HTTP_HOST="testserver",
+        )
+
+    @patch("eventkit_cloud.api.views.AoiEstimator")
+    @patch("eventkit_cloud.api.views.cache")
+    def test_get(self, mock_cache, mock_estimator):
+        bbox = (-10.123, -10.123, 10.123, 10.123)
+        quantized_bbox = [-10.2, -10.2, 10.2, 10.2]
+        osm_cache_key = get_estimate_cache_key(quantized_bbox, "4326", 0, 10, "osm")
+        wms_cache_key = get_estimate_cache_key(quantized_bbox, "4326", 0, 10, "wms")
+        mock_cache.get_many.return_value = {osm_cache_key: [10, 20]}
+        mock_estimator.return_value.get_providers_estimates.return_value = {"wms": [30, 40]}
+
+        response = self.client.get(
+            "/api/estimate",
+            {"slugs": "osm,wms", "bbox": ",".join(map(str, bbox)), "srs": "4326", "min_zoom": 0, "max_zoom": 10},
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [
+                {"slug": "osm", "size": {"value": 10, "unit": "MB"}, "time": {"value": 20, "unit": "seconds"}},
+                {"slug": "wms", "size": {"value": 30, "unit": "MB"}, "time": {"value": 40, "unit": "seconds"}},
+            ],
+            response.json(),
+        )
+        mock_cache.get_many.assert_called_once_with([osm_cache_key, wms_cache_key])
+        mock_estimator.assert_called_once_with(bbox=list(bbox), bbox_srs="4326", min_zoom="0", max_zoom="10")
+        mock_estimator.return_value.get_providers_estimates.assert_called_once_with(["wms"])
+        mock_cache.set_many.assert_called_once_with({wms_cache_key: [30, 40]}, ESTIMATE_CACHE_TIMEOUT)
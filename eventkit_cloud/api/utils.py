@@ -8,13 +8,14 @@ import rest_framework.status
 from audit_logging.models import AuditEvent
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Count, Func, OuterRef, Q, QuerySet, Subquery
+from django.db.models import Count, Func, OuterRef, Q, QuerySet, Subquery, prefetch_related_objects
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
+from eventkit_cloud.core.models import AttributeClass
 from eventkit_cloud.jobs.models import DataProvider, Region
-from eventkit_cloud.tasks.models import RunZipFile, UserDownload
+from eventkit_cloud.tasks.models import ExportRun, RunZipFile, UserDownload
 from eventkit_cloud.utils.types.django_helpers import ListOrQuerySet
 
 logger = logging.getLogger(__name__)
@@ -168,6 +169,34 @@ def get_run_zip_file(field=None, values=[]):
     return queryset.select_related("downloadable_file")
 
 
+def get_run_serializer_context(runs: List[ExportRun], user: User) -> Dict[str, Any]:
+    """
+    Loads the attribute class restrictions and zip files needed to serialize the runs in a constant number of queries,
+    instead of querying them for each run in ExportRunSerializer.
+    :param runs: The runs which will be serialized.
+    :param user: The user the runs are serialized for.
+    :return: The restricted_attribute_class_ids for the user, and the run_zip_files of the runs keyed by the set of
+    DataProviderTaskRecord ids in each zip file.
+    """
+    prefetch_related_objects(runs, "data_provider_task_records__provider", "job__data_provider_tasks__provider")
+    restricted_attribute_class_ids = set(AttributeClass.objects.exclude(users=user).values_list("id", flat=True))
+
+    run_zip_files: Dict[frozenset, RunZipFile] = {}
+    queryset = (
+        RunZipFile.objects.filter(data_provider_task_records__run__in=runs)
+        .distinct()
+        .order_by("id")
+        .select_related("run", "downloadable_file__export_task")
+        .prefetch_related("data_provider_task_records")
+    )
+    for run_zip_file in queryset:
+        # Match get_run_zip_file, which returns the first zip file with exactly the same records.
+        key = frozenset(record.id for record in run_zip_file.data_provider_task_records.all())
+        run_zip_files.setdefault(key, run_zip_file)
+
+    return {"restricted_attribute_class_ids": restricted_attribute_class_ids, "run_zip_files": run_zip_files}
+
+
 def get_binned_groups(users: dict, user_group_bins: List[str]):
 
     groups: OrderedDict[str, Any] = OrderedDict()
@@ -80,6 +80,7 @@ from eventkit_cloud.api.utils import (
     get_download_counts_by_area,
     get_download_counts_by_product,
     get_logins_per_day,
+    get_run_serializer_context,
     get_run_zip_file,
 )
 from eventkit_cloud.api.validators import (
@@ -137,7 +138,7 @@ from eventkit_cloud.tasks.task_factory import (
 from eventkit_cloud.tasks.util_tasks import rerun_data_provider_records
 from eventkit_cloud.user_requests.models import DataProviderRequest, SizeIncreaseRequest
 from eventkit_cloud.utils.stats.aoi_estimators import AoiEstimator
-from eventkit_cloud.utils.stats.geomutils import get_estimate_cache_key
+from eventkit_cloud.utils.stats.geomutils import get_estimate_cache_key, get_quantized_bbox
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
@@ -421,10 +422,10 @@ class JobViewSet(EventkitViewSet):
                             error_data: Dict[str, List[Any]] = {"errors": []}
                             for provider_task in job.data_provider_tasks.all():
                                 provider = provider_task.provider
-                                bbox = job.extents
                                 srs = "4326"
+                                cache_bbox = list(get_quantized_bbox(job.extents, srs))
                                 cache_key = get_estimate_cache_key(
-                                    bbox, srs, provider_task.min_zoom, provider_task.max_zoom, provider.slug
+                                    cache_bbox, srs, provider_task.min_zoom, provider_task.max_zoom, provider.slug
                                 )
                                 # find cache key that contains the estimator hash with correct time, size values
                                 size, time = cache.get(cache_key, (None, None))
@@ -1061,7 +1062,8 @@ class DataProviderViewSet(EventkitViewSet):
             data = data + filtered_data
 
             if user_cache.add(cache_key, data, timeout=DEFAULT_TIMEOUT):
-                DataProvider.update_cache_key_list(cache_key)
+                # Register the key the data is actually stored under, so saving a provider deletes it.
+                DataProvider.update_cache_key_list(user_cache.get_cache_key(cache_key))
 
         return Response(data)
 
@@ -1306,9 +1308,18 @@ class ExportRunViewSet(EventkitViewSet):
             self.validate_licenses(queryset, user=request.user)
         except InvalidLicense as il:
             raise ValidationError(code="invalid_license", detail=str(il))
-        serializer = self.get_serializer(queryset, many=True, context={"request": request})
+        runs = list(queryset)
+        serializer = self.get_serializer(runs, many=True, context=self.get_run_serializer_context(runs))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_run_serializer_context(self, runs, **kwargs):
+        """
+        Loads what the serializer needs for all of the runs at once, rather than querying it for each run.
+        :param runs: A list of the runs being serialized.
+        :return: The serializer context.
+        """
+        return {"request": self.request, **kwargs, **get_run_serializer_context(runs, self.request.user)}
+
     @transaction.atomic
     def destroy(self, request, *args, **kwargs):
         """
@@ -1348,10 +1359,11 @@ class ExportRunViewSet(EventkitViewSet):
             queryset = queryset.filter(deleted=False)
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True, context={"request": request})
+            serializer = self.get_serializer(page, many=True, context=self.get_run_serializer_context(page))
             return self.get_paginated_response(serializer.data)
         else:
-            serializer = self.get_serializer(queryset, many=True, context={"request": request})
+            runs = list(queryset)
+            serializer = self.get_serializer(runs, many=True, context=self.get_run_serializer_context(runs))
             return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(methods=["post", "get"], detail=False)
@@ -1413,12 +1425,17 @@ class ExportRunViewSet(EventkitViewSet):
             queryset = queryset.filter(deleted=False)
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True, context={"request": request, "no_license": True})
+            serializer = self.get_serializer(
+                page, many=True, context=self.get_run_serializer_context(page, no_license=True)
+            )
             response = self.get_paginated_response(serializer.data)
             response.status_code = status_code
             return response
         else:
-            serializer = self.get_serializer(queryset, many=True, context={"request": request, "no_license": True})
+            runs = list(queryset)
+            serializer = self.get_serializer(
+                runs, many=True, context=self.get_run_serializer_context(runs, no_license=True)
+            )
             return Response(serializer.data, status=status_code)
 
     @transaction.atomic
@@ -2491,12 +2508,22 @@ class EstimatorView(views.APIView):
         min_zoom = request.query_params.get("min_zoom", None)
         max_zoom = request.query_params.get("max_zoom", None)
         if request.query_params.get("slugs", None):
-            estimator = AoiEstimator(bbox=bbox, bbox_srs=srs, min_zoom=min_zoom, max_zoom=max_zoom)
-            for slug in request.query_params.get("slugs").split(","):
-                cache_key = get_estimate_cache_key(bbox, srs, min_zoom, max_zoom, slug)
-                size, time = cache.get_or_set(
-                    cache_key, lambda: estimator.get_provider_estimates(slug), ESTIMATE_CACHE_TIMEOUT
-                )
+            # Nearby bboxes (e.g. while dragging an AOI) share estimates, which are computed for the bbox itself.
+            cache_bbox = list(get_quantized_bbox(bbox, srs))
+            slugs = request.query_params.get("slugs").split(",")
+            cache_keys = {slug: get_estimate_cache_key(cache_bbox, srs, min_zoom, max_zoom, slug) for slug in slugs}
+            estimates = cache.get_many(list(cache_keys.values()))
+            missing_slugs = [slug for slug in slugs if cache_keys[slug] not in estimates]
+            if missing_slugs:
+                estimator = AoiEstimator(bbox=bbox, bbox_srs=srs, min_zoom=min_zoom, max_zoom=max_zoom)
+                missing_estimates = {
+                    cache_keys[slug]: estimate
+                    for slug, estimate in estimator.get_providers_estimates(missing_slugs).items()
+                }
+                cache.set_many(missing_estimates, ESTIMATE_CACHE_TIMEOUT)
+                estimates.update(missing_estimates)
+            for slug in slugs:
+                size, time = estimates[cache_keys[slug]]
                 provider_estimate = {
                     "slug": slug,
                     "size": {"value": size, "unit": "MB"},
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
+import copy
 import logging
 import os
 import shutil
 import subprocess
+import threading
+import time
 import zipfile
 from enum import Enum
 from functools import wraps
-from typing import Type
+from typing import Dict, Optional, Tuple, Type
 from urllib.parse import urlparse
 
 import dj_database_url
@@ -34,8 +37,50 @@ def get_model_by_params(model_class: Type[models.Model], **kwargs):
     return model_class.objects.get(**kwargs)
 
 
-def get_cached_model(model: Type[models.Model], prop: str, value: str) -> models.Model:
-    return cache.get_or_set(f"{model.__name__}-{prop}-{value}", get_model_by_params(model, **{prop: value}), 360)
+# Models kept in process by get_cached_model, by model name and cache key, with the time they expire.
+local_model_cache: Dict[str, Dict[str, Tuple[float, models.Model]]] = {}
+local_model_cache_lock = threading.Lock()
+
+
+def get_model_cache_key(model: Type[models.Model], prop: str, value) -> str:
+    return f"{model.__name__}-{prop}-{value}"
+
+
+def get_cached_model(
+    model: Type[models.Model], prop: str, value: str, timeout: int = 360, local_timeout: Optional[int] = None
+) -> models.Model:
+    """
+    Gets a model from the cache, the database is only queried when it isn't cached.
+    :param model: The model class.
+    :param prop: The field to look the model up by.
+    :param value: The value of the field.
+    :param timeout: How long to keep the model in the cache.
+    :param local_timeout: How long to also keep the model in process, in front of the cache. Defaults to
+    LOCAL_MODEL_CACHE_TIMEOUT, 0 disables it. Saving a CachedModelMixin clears it in the saving process, other processes
+    see the change once their copy expires.
+    :return: The model.
+    """
+    cache_key = get_model_cache_key(model, prop, value)
+    if local_timeout is None:
+        local_timeout = getattr(settings, "LOCAL_MODEL_CACHE_TIMEOUT", 0)
+    if local_timeout:
+        with local_model_cache_lock:
+            expires_at, instance = local_model_cache.get(model.__name__, {}).get(cache_key, (0, None))
+        if instance is not None and time.monotonic() < expires_at:
+            # Callers get their own copy, like they would from the cache.
+            return copy.copy(instance)
+
+    instance = cache.get_or_set(cache_key, lambda: get_model_by_params(model, **{prop: value}), timeout)
+    if local_timeout:
+        with local_model_cache_lock:
+            local_model_cache.setdefault(model.__name__, {})[cache_key] = (time.monotonic() + local_timeout, instance)
+        return copy.copy(instance)
+    return instance
+
+
+def clear_local_model_cache(model: Type[models.Model]):
+    with local_model_cache_lock:
+        local_model_cache.pop(model.__name__, None)
 
 
 def get_query_cache_key(*args):
@@ -237,6 +282,25 @@ def get_or_update_session(*args, **session_info):
     return session
 
 
+def copy_session(session: requests.Session) -> requests.Session:
+    """
+    Sessions aren't threadsafe (https://github.com/psf/requests/issues/2766), this creates a new session with the same
+    configuration as the given session so that it can be used from another thread.
+    :param session: A session configured by get_or_update_session.
+    :return: A new session sharing the adapters (and their connection pools) of the given session.
+    """
+    new_session = requests.Session()
+    new_session.auth = session.auth
+    new_session.cert = session.cert
+    new_session.verify = session.verify
+    new_session.headers.update(session.headers)
+    new_session.cookies.update(session.cookies)
+    new_session.hooks = {event: list(hooks) for event, hooks in session.hooks.items()}
+    for prefix, adapter in session.adapters.items():
+        new_session.mount(prefix, adapter)
+    return new_session
+
+
 class NotificationLevel(Enum):
     SUCCESS = "success"
     INFO = "info"
@@ -1,9 +1,20 @@
+import time
+from typing import List, Optional
+
 from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# How many times a worker tries to claim a slot in the index before giving up on indexing a key.
+MAX_INDEX_ATTEMPTS = 10
 
 
 class MappedCache:
     """
     Interacts with the caches related to root_key
+
+    The keys are stored in a namespace stamped with a generation counter. delete_all increments the counter instead of
+    deleting every key, and the entries of older generations expire on their own. The index of keys used by get_all is
+    appended to one slot at a time with add, so concurrent workers can't overwrite each other's keys.
     """
 
     def __init__(self, root_key: str, *arg, **kwargs):
@@ -12,49 +23,98 @@ class MappedCache:
         self.root_key = root_key
 
     def get(self, key, *args, **kwargs):
-        return cache.get(key, *args, **kwargs)
+        return cache.get(self._get_key(key), *args, **kwargs)
 
     def get_all(self, *args, **kwargs) -> list:
         return self._get_cache_keys()
 
-    def add(self, key, value, *args, **kwargs):
-        self._add_cache_key(key)
-        return cache.add(key, value, *args, **kwargs)
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, *args, **kwargs):
+        generation = self._get_generation()
+        added = cache.add(self._get_key(key, generation), value, timeout, *args, **kwargs)
+        if added:
+            self._add_cache_key(key, generation, timeout)
+        return added
 
-    def set(self, key, value, *args, **kwargs):
-        cache_keys: list = self._get_cache_keys()
-        try:
-            cache_keys.index(key)
-        except ValueError:
-            cache_keys.append(key)
-            cache.set(key, value, *args, **kwargs)
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, *args, **kwargs):
+        generation = self._get_generation()
+        cache.set(self._get_key(key, generation), value, timeout, *args, **kwargs)
+        self._add_cache_key(key, generation, timeout)
 
     def delete(self, key, *arg, **kwargs):
-        delete = cache.delete(key, *arg, **kwargs)
+        generation = self._get_generation()
+        delete = cache.delete(self._get_key(key, generation), *arg, **kwargs)
         if delete:
-            self._remove_cache_key(key)
+            self._remove_cache_key(key, generation)
         return delete
 
-    def delete_all(self, *args, **kwargs):
-        for item in self._get_cache_keys():
-            self.delete(item)
-
-    def _get_cache_keys(self) -> list:
-        return cache.get(self.root_key, [])
+    def get_cache_key(self, key) -> str:
+        """
+        :return: The key the value for key is stored under in the cache for the current generation, e.g. to delete it
+        directly with cache.delete.
+        """
+        return self._get_key(key)
 
-    def _add_cache_key(self, key):
-        cache_keys: list = self._get_cache_keys()
+    def delete_all(self, *args, **kwargs):
+        generation_key = self._get_generation_key()
         try:
-            cache_keys.index(key)
+            cache.incr(generation_key)
         except ValueError:
-            cache_keys.append(key)
-            cache.set(self.root_key, cache_keys)
+            # The counter expired or was evicted, starting it again from the current time means the old keys can't be
+            # reached again.
+            cache.add(generation_key, self._get_initial_generation(), None)
 
-    def _remove_cache_key(self, key):
-        cache_keys: list = self._get_cache_keys()
-        try:
-            cache_keys.remove(key)
-            cache.set(self.root_key, cache_keys)
-        except ValueError:
-            # No need to reset cache, nothing changed
-            pass
+    def _get_generation_key(self) -> str:
+        return f"{self.root_key}-generation"
+
+    @staticmethod
+    def _get_initial_generation() -> int:
+        return int(time.time() * 1000)
+
+    def _get_generation(self) -> int:
+        generation_key = self._get_generation_key()
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, self._get_initial_generation(), None)
+            # Another worker may have added it first.
+            generation = cache.get(generation_key)
+        return generation
+
+    def _get_key(self, key, generation: Optional[int] = None) -> str:
+        if generation is None:
+            generation = self._get_generation()
+        return f"{self.root_key}-{generation}-{key}"
+
+    def _get_index_key(self, generation: int, *args) -> str:
+        return "-".join([self.root_key, str(generation), "index", *[str(arg) for arg in args]])
+
+    def _get_cache_keys(self) -> List[str]:
+        generation = self._get_generation()
+        count = cache.get(self._get_index_key(generation, "count"), 0)
+        slot_keys = [self._get_index_key(generation, "slot", slot) for slot in range(1, count + 1)]
+        slots = cache.get_many(slot_keys)
+        # A key which was deleted and added again is in more than one slot.
+        cache_keys = list(dict.fromkeys(slots[slot_key] for slot_key in slot_keys if slot_key in slots))
+        # Only return the keys which haven't been deleted since they were indexed.
+        indexed = cache.get_many([self._get_index_key(generation, "key", cache_key) for cache_key in cache_keys])
+        return [cache_key for cache_key in cache_keys if self._get_index_key(generation, "key", cache_key) in indexed]
+
+    def _add_cache_key(self, key, generation: int, timeout=DEFAULT_TIMEOUT):
+        # Only the first worker to index the key gets to add it to a slot.
+        if not cache.add(self._get_index_key(generation, "key", key), True, timeout):
+            return
+        count_key = self._get_index_key(generation, "count")
+        cache.add(count_key, 0, timeout)
+        for _ in range(MAX_INDEX_ATTEMPTS):
+            try:
+                slot = cache.incr(count_key)
+            except ValueError:
+                cache.add(count_key, 0, timeout)
+                continue
+            # incr isn't atomic for every backend, so the slot is only taken if nobody else added it.
+            if cache.add(self._get_index_key(generation, "slot", slot), key, timeout):
+                # Keep the count for as long as the newest slot.
+                cache.touch(count_key, timeout)
+                return
+
+    def _remove_cache_key(self, key, generation: int):
+        cache.delete(self._get_index_key(generation, "key", key))
@@ -126,17 +126,29 @@ class CachedModelMixin(models.Model):
     class Meta:
         abstract = True
 
+    cache_key_props = ["pk", "uid", "slug"]
+
     def save(self, *args, **kwargs):
+        from eventkit_cloud.core.helpers import clear_local_model_cache, get_model_cache_key
+
         super(CachedModelMixin, self).save(*args, **kwargs)
-        cache_key_props = ["pk", "uid", "slug"]
-        for cache_key_prop in cache_key_props:
+        # Clear the data cached from the old model, e.g. serialized lists, before caching the model itself.
+        self.clear_cache_key_list()
+        for cache_key_prop in self.cache_key_props:
             if hasattr(self, cache_key_prop):
-                # TODO: Confirm if this is being used.
-                cache_key = f"{type(self).__name__}-{cache_key_prop}-{getattr(self, cache_key_prop)}"
+                # These are the keys read by get_cached_model.
+                cache_key = get_model_cache_key(type(self), cache_key_prop, getattr(self, cache_key_prop))
                 cache.set(cache_key, self, timeout=DEFAULT_TIMEOUT)
                 self.update_cache_key_list(cache_key)
+        clear_local_model_cache(type(self))
+
+    def delete(self, *args, **kwargs):
+        from eventkit_cloud.core.helpers import clear_local_model_cache
 
+        result = super(CachedModelMixin, self).delete(*args, **kwargs)
         self.clear_cache_key_list()
+        clear_local_model_cache(type(self))
+        return result
 
     @classmethod
     def get_caches_key(cls):
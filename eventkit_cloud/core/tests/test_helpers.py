@@ -3,14 +3,16 @@
 
 import logging
 import os
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, patch
 
+from django.contrib.auth.models import User
 from django.test import TestCase, override_settings
 
 from eventkit_cloud.core.helpers import (
+    clear_local_model_cache,
+    copy_session,
     get_cached_model,
     get_id,
-    get_model_by_params,
     get_or_update_session,
     verify_login_callback,
 )
@@ -33,8 +35,9 @@ class TestCoreHelpers(TestCase):
         user_identification = str(get_id(mock_user_oauth))
         self.assertEqual(user_identification, username)
 
+    @patch("eventkit_cloud.core.helpers.get_model_by_params")
     @patch("eventkit_cloud.core.helpers.cache")
-    def test_get_cached_model(self, mocked_cache: MagicMock):
+    def test_get_cached_model(self, mocked_cache: MagicMock, mock_get_model_by_params: MagicMock):
         export_provider = MagicMock()
         expected_name = "SomeProvider"
         expected_prop = "slug"
@@ -42,14 +45,47 @@ class TestCoreHelpers(TestCase):
         export_provider.__name__ = expected_name
 
         mocked_cache.get_or_set.return_value = export_provider
-        get_model = get_model_by_params(export_provider)
 
-        return_value = get_cached_model(export_provider, expected_prop, expected_val)
+        return_value = get_cached_model(export_provider, expected_prop, expected_val, local_timeout=0)
 
         self.assertEquals(export_provider, return_value)
         expected_call_value = f"{expected_name}-{expected_prop}-{expected_val}"
 
-        mocked_cache.get_or_set.assert_called_once_with(expected_call_value, get_model, 360)
+        mocked_cache.get_or_set.assert_called_once_with(expected_call_value, ANY, 360)
+        # The model is only queried when it isn't cached.
+        mock_get_model_by_params.assert_not_called()
+        get_model = mocked_cache.get_or_set.call_args[0][1]
+        self.assertEqual(get_model(), mock_get_model_by_params.return_value)
+        mock_get_model_by_params.assert_called_once_with(export_provider, **{expected_prop: expected_val})
+
+    def test_get_cached_model_local_cache(self):
+        user = User.objects.create(username="demo")
+        self.addCleanup(clear_local_model_cache, User)
+        with patch("eventkit_cloud.core.helpers.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 100
+            self.assertEqual(get_cached_model(User, "username", "demo", local_timeout=5), user)
+
+            # A warm hit doesn't query the database or the cache.
+            mock_monotonic.return_value = 104
+            with self.assertNumQueries(0), patch("eventkit_cloud.core.helpers.cache") as mocked_cache:
+                cached_user = get_cached_model(User, "username", "demo", local_timeout=5)
+            mocked_cache.get_or_set.assert_not_called()
+            self.assertEqual(cached_user, user)
+
+            # Callers get their own copy of the model.
+            cached_user.first_name = "changed"
+            self.assertEqual(get_cached_model(User, "username", "demo", local_timeout=5).first_name, "")
+
+            # The model is read from the cache again once it expires locally or is cleared.
+            mock_monotonic.return_value = 105
+            with patch("eventkit_cloud.core.helpers.cache") as mocked_cache:
+                mocked_cache.get_or_set.return_value = user
+                get_cached_model(User, "username", "demo", local_timeout=5)
+                get_cached_model(User, "username", "demo", local_timeout=5)
+                self.assertEqual(mocked_cache.get_or_set.call_count, 1)
+                clear_local_model_cache(User)
+                get_cached_model(User, "username", "demo", local_timeout=5)
+                self.assertEqual(mocked_cache.get_or_set.call_count, 2)
 
     @override_settings(SSL_VERIFICATION=10)
     @patch.dict(os.environ, {"CERT_PATH": "mytemp"})
@@ -66,6 +102,18 @@ class TestCoreHelpers(TestCase):
         self.assertTrue(expected_headers.items() <= dict(session.headers).items())
         self.assertEqual(session.verify, 10)
 
+    @patch("eventkit_cloud.utils.auth_requests.get_cred")
+    def test_copy_session(self, mock_get_cred):
+        mock_get_cred.return_value = ["cred_user", "cred_pass"]
+        session = get_or_update_session(headers={"test": "value"}, slug="abc")
+        new_session = copy_session(session)
+        self.assertIsNot(session, new_session)
+        self.assertIsNot(session.cookies, new_session.cookies)
+        self.assertEqual(session.auth, new_session.auth)
+        self.assertEqual(session.verify, new_session.verify)
+        self.assertTrue({"test": "value"}.items() <= dict(new_session.headers).items())
+        self.assertEqual(session.adapters["https://"], new_session.adapters["https://"])
+
     def test_verify_login(self):
         expected_response = Mock()
         mock_session = Mock(get=Mock(return_value=expected_response))
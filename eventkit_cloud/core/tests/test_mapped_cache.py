@@ -2,6 +2,7 @@
 
 
 import logging
+from unittest.mock import patch
 
 from django.core.cache import cache
 from django.test import TestCase
@@ -22,35 +23,71 @@ class TestMappedCache(TestCase):
     def test_add(self):
         example_key = "key"
         example_value = "value"
-        self.mapped_cache.add(example_key, example_value)
-        self.assertCountEqual([example_key], cache.get(self.username))
+        self.assertTrue(self.mapped_cache.add(example_key, example_value))
+        self.assertCountEqual([example_key], self.mapped_cache.get_all())
+        self.assertEqual(example_value, self.mapped_cache.get(example_key))
+
+        self.assertFalse(self.mapped_cache.add(example_key, "new value"))
+        self.assertEqual(example_value, self.mapped_cache.get(example_key))
 
     def test_set(self):
         example_key = "key"
         example_value = "value"
         self.mapped_cache.add(example_key, example_value)
-        self.assertCountEqual([example_key], cache.get(self.username))
+        self.assertCountEqual([example_key], self.mapped_cache.get_all())
 
         example_value = "new value"
         self.mapped_cache.set(example_key, example_value)
-        self.assertCountEqual([example_key], cache.get(self.username))
+        self.assertCountEqual([example_key], self.mapped_cache.get_all())
+        self.assertEqual(example_value, self.mapped_cache.get(example_key))
+
+    def test_get_cache_key(self):
+        self.mapped_cache.add("key", "value")
+        cache_key = self.mapped_cache.get_cache_key("key")
+        self.assertEqual("value", cache.get(cache_key))
+
+        # Deleting the key directly, like CachedModelMixin.clear_cache_key_list does, removes the value.
+        cache.delete(cache_key)
+        self.assertIsNone(self.mapped_cache.get("key"))
 
     def test_delete(self):
         example_key = "key"
         example_value = "value"
         self.mapped_cache.add(example_key, example_value)
-        self.assertCountEqual([example_key], cache.get(self.username))
+        self.assertCountEqual([example_key], self.mapped_cache.get_all())
+
+        self.assertTrue(self.mapped_cache.delete(example_key))
+        self.assertCountEqual([], self.mapped_cache.get_all())
+        self.assertIsNone(self.mapped_cache.get(example_key))
 
-        self.mapped_cache.delete(example_key)
-        self.assertCountEqual([], cache.get(self.username))
+        self.mapped_cache.add(example_key, example_value)
+        self.assertCountEqual([example_key], self.mapped_cache.get_all())
 
     def test_delete_all(self):
         example_keys: list = ["key1", "key2", "key3", "key4"]
-        i = 0
-        for key in example_keys:
+        for i, key in enumerate(example_keys):
             self.mapped_cache.add(key, i)
-            ++i
-        self.assertCountEqual(example_keys, cache.get(self.username))
+        # Keys added by another worker aren't lost.
+        MappedCache(self.username).set("key5", 4)
+        self.assertCountEqual(example_keys + ["key5"], self.mapped_cache.get_all())
+
+        with patch.object(cache, "delete") as mock_delete:
+            self.mapped_cache.delete_all()
+            # The keys are invalidated by starting a new generation rather than deleting each one.
+            mock_delete.assert_not_called()
+        self.assertCountEqual([], self.mapped_cache.get_all())
+        for key in example_keys:
+            self.assertIsNone(self.mapped_cache.get(key))
+
+        # Other root keys aren't affected.
+        other_cache = MappedCache("other_username")
+        other_cache.add("key1", 0)
+        self.mapped_cache.delete_all()
+        self.assertEqual(0, other_cache.get("key1"))
+        other_cache.delete_all()
 
+    def test_delete_all_expired_generation(self):
+        self.mapped_cache.add("key", "value")
+        cache.delete(self.mapped_cache._get_generation_key())
         self.mapped_cache.delete_all()
-        self.assertCountEqual([], cache.get(self.username))
+        self.assertIsNone(self.mapped_cache.get("key"))
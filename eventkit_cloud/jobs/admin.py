@@ -291,6 +291,7 @@ class DataProviderStatusAdmin(admin.ModelAdmin):
         "status_type",
         "message",
         "last_check_time",
+        "check_duration",
         "related_provider",
     )
     list_display = (
@@ -298,6 +299,7 @@ class DataProviderStatusAdmin(admin.ModelAdmin):
         "status_type",
         "message",
         "last_check_time",
+        "check_duration",
         "related_provider",
     )
     list_filter = ("related_provider", "status", "status_type", "last_check_time")
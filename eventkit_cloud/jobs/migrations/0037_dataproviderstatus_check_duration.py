@@ -0,0 +1,18 @@
+# Generated by Django 4.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0036_alter_dataprovider_config_proxyformat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataproviderstatus',
+            name='check_duration',
+            field=models.FloatField(blank=True, help_text='How long the check took in seconds.', null=True),
+        ),
+    ]
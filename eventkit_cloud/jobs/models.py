@@ -7,7 +7,7 @@ import logging
 import multiprocessing
 import uuid
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List, Type, Union, cast
+from typing import TYPE_CHECKING, Dict, List, Optional, Type, Union, cast
 
 from django.contrib.auth.models import Group, User
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -40,6 +40,8 @@ from eventkit_cloud.utils.services.types import LayersDescription
 from eventkit_cloud.utils.types.django_helpers import ListOrQuerySet
 
 if TYPE_CHECKING:
+    import requests
+
     from eventkit_cloud.utils.services.base import GisClient
 
 logger = logging.getLogger(__name__)
@@ -361,7 +363,7 @@ class DataProvider(UIDMixin, TimeStampedModelMixin, CachedModelMixin):
         if geometry:
             self.the_geom = convert_polygon(geometry)
 
-    def get_service_client(self) -> GisClient:
+    def get_service_client(self, session: Optional[requests.Session] = None) -> GisClient:
         url = self.url
         if not self.url and "osm" in self.export_provider_type.type_name:
             logger.error("Use of settings.OVERPASS_API_URL is deprecated and will be removed in 1.13")
@@ -370,11 +372,11 @@ class DataProvider(UIDMixin, TimeStampedModelMixin, CachedModelMixin):
         config = None
         if self.config:
             config = self.config or dict()
-        return Client(url, self.layer, aoi_geojson=None, slug=self.slug, config=config)
+        return Client(url, self.layer, aoi_geojson=None, slug=self.slug, config=config, session=session)
 
-    def check_status(self, aoi_geojson: dict = None):
+    def check_status(self, aoi_geojson: dict = None, session: Optional[requests.Session] = None):
         try:
-            client = self.get_service_client()
+            client = self.get_service_client(session=session)
             response = client.check(aoi_geojson=aoi_geojson)
 
         except Exception as e:
@@ -627,6 +629,7 @@ class DataProviderStatus(UIDMixin, TimeStampedModelMixin):
     status_type = models.CharField(max_length=25, blank=True)
     message = models.CharField(max_length=150, blank=True)
     last_check_time = models.DateTimeField(null=True)
+    check_duration = models.FloatField(null=True, blank=True, help_text="How long the check took in seconds.")
     related_provider = models.ForeignKey(DataProvider, on_delete=models.CASCADE, related_name="data_provider_status")
 
     class Meta:
@@ -1143,11 +1146,17 @@ def clean_config(config: dict) -> dict:
     service_keys = [
         "cert_info",
         "cert_cred",
+        "chunk_concurrency",
         "concurrency",
+        "feature_format",
         "max_repeat",
         "overpass_query",
+        "page_concurrency",
         "max_data_size",
         "pbf_file",
+        "seed_partitions",
+        "shared_tile_cache",
+        "tile_concurrency",
         "tile_size",
     ]
 
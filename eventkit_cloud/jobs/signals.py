@@ -100,6 +100,11 @@ def provider_pre_save(sender, instance: DataProvider, **kwargs):
             logger.exception(e)
 
 
+@receiver(post_save, sender=DataProvider)
+def provider_post_save(sender, instance: DataProvider, **kwargs):
+    clear_mapproxy_config_cache()
+
+
 @receiver(post_save, sender=Region)
 def region_post_save(sender, instance, **kwargs):
     clear_mapproxy_config_cache()
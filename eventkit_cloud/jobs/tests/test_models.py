@@ -10,6 +10,7 @@ from django.contrib.gis.gdal import DataSource
 from django.contrib.gis.geos import GEOSGeometry, MultiPolygon, Polygon
 from django.test import TestCase
 
+from eventkit_cloud.core.helpers import clear_local_model_cache, get_cached_model
 from eventkit_cloud.jobs.enumerations import GeospatialDataType, StyleType
 from eventkit_cloud.jobs.models import (
     DatamodelPreset,
@@ -419,6 +420,17 @@ class TestDataProvider(TestCase):
 
         mocked_cache.set.assert_has_calls(cache_calls, any_order=True)
 
+    def test_cached_model_local_cache_cleared_on_save(self):
+        """Test that saving a provider replaces the copy kept in process by get_cached_model"""
+        self.addCleanup(clear_local_model_cache, DataProvider)
+        get_cached_model(DataProvider, "slug", self.data_provider.slug, local_timeout=60)
+
+        self.data_provider.label = "Changed"
+        self.data_provider.save()
+
+        provider = get_cached_model(DataProvider, "slug", self.data_provider.slug, local_timeout=60)
+        self.assertEqual(provider.label, "Changed")
+
     @patch("eventkit_cloud.jobs.models.cache")
     def test_deleted_mapproxy_cache_on_save(self, mocked_cache):
         """Test that triggers a save on a provider and clears the associated mapproxy cache"""
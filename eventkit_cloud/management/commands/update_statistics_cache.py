@@ -8,7 +8,10 @@ logger = getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Deletes the directory where tiles are cached."
+    help = "Rebuilds the statistics used to estimate exports for every provider."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--incremental", action="store_true", help="Only add tasks finished since the last update.")
 
     def handle(self, *args, **options):
-        update_all_statistics_caches()
+        update_all_statistics_caches(rebuild=not options["incremental"])
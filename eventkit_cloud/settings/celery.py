@@ -46,13 +46,17 @@ CELERY_BEAT_SCHEDULE = {
         "task": "Clear Tile Cache",
         "schedule": crontab(minute="0", day_of_month="*/14"),
     },
+    "prune-shared-tile-cache": {
+        "task": "Prune Shared Tile Cache",
+        "schedule": crontab(minute="30"),
+    },
     "clear-user-sessions": {
         "task": "Clear User Sessions",
         "schedule": crontab(minute="0", day_of_month="*/2"),
     },
     "update-statistics-cache": {
         "task": "Update Statistics Caches",
-        "schedule": crontab(minute="0", day_of_month="*/4"),
+        "schedule": crontab(minute="0"),
     },
     "clean-up-stuck-tasks": {
         "task": "Clean Up Stuck Tasks",
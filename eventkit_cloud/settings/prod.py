@@ -60,12 +60,22 @@ if not EXPORT_STAGING_ROOT:
     EXPORT_STAGING_ROOT = os.getenv("EXPORT_STAGING_ROOT", "/var/lib/eventkit/exports_stage/")
 if not TILE_CACHE_DIR:
     TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "/var/lib/eventkit/tile_cache/")
+# where tiles shared between the runs of providers using the shared_tile_cache option are stored, this is kept apart
+# from the TILE_CACHE_DIR which is periodically cleared.
+SHARED_TILE_CACHE_DIR = os.getenv(
+    "SHARED_TILE_CACHE_DIR", os.path.join(os.path.dirname(TILE_CACHE_DIR.rstrip("/")), "shared_tile_cache")
+)
+# The size in MB the shared tile cache is pruned to, and the default number of seconds tiles are kept.
+SHARED_TILE_CACHE_MAX_SIZE = int(os.getenv("SHARED_TILE_CACHE_MAX_SIZE", 10240))
+SHARED_TILE_CACHE_TTL = int(os.getenv("SHARED_TILE_CACHE_TTL", 60 * 60 * 24 * 30))
 
 # where map image snapshots are stored (e.g. thumbnails)
 IMAGES_STAGING = os.path.join(EXPORT_STAGING_ROOT, "images")
 
 # where export run files to be added to every datapack are stored
 EXPORT_RUN_FILES = os.path.join(EXPORT_STAGING_ROOT, "export_run_files")
+# where export run files are cached between runs, they are only downloaded again when they are updated
+EXPORT_RUN_FILES_CACHE_DIR = os.getenv("EXPORT_RUN_FILES_CACHE_DIR", os.path.join(EXPORT_RUN_FILES, "cache"))
 
 # the root url for export downloads
 EXPORT_MEDIA_ROOT = os.getenv("EXPORT_MEDIA_ROOT", EXPORT_STAGING_ROOT)
@@ -83,6 +93,9 @@ GEOCODING_UPDATE_URL = os.getenv("GEOCODING_UPDATE_URL", None)
 GEOCODING_AUTH_URL = os.getenv("GEOCODING_AUTH_URL", None)
 GEOCODING_AUTH_CERT = os.getenv("GEOCODING_AUTH_CERT", None)
 CONVERT_API_URL = os.getenv("CONVERT_API_URL", None)
+# How long search results are cached, and how long each thread keeps a session open to a geocoder.
+GEOCODING_CACHE_TIMEOUT = int(os.getenv("GEOCODING_CACHE_TIMEOUT", 86400))
+GEOCODING_SESSION_TIMEOUT = int(os.getenv("GEOCODING_SESSION_TIMEOUT", 300))
 
 # zoom extents of reverse geocode point result (in degrees)
 REVERSE_GEOCODE_ZOOM = 0.1
@@ -274,8 +287,18 @@ if os.getenv("MEMCACHED"):
         },
         "fallback_cache": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "eventkit_cache"},
     }
+    # How long the primary cache is trusted after a successful check, and how long to wait before checking it again
+    # after it fails (doubled for each failure up to the max).
+    FALLBACK_CACHE_HEALTH_TTL = int(os.getenv("FALLBACK_CACHE_HEALTH_TTL", 10))
+    FALLBACK_CACHE_RETRY_INTERVAL = int(os.getenv("FALLBACK_CACHE_RETRY_INTERVAL", 5))
+    FALLBACK_CACHE_MAX_RETRY_INTERVAL = int(os.getenv("FALLBACK_CACHE_MAX_RETRY_INTERVAL", 300))
 else:
     CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "eventkit_cache"}}
+# How long models read with get_cached_model are also kept in each process, 0 disables it.
+LOCAL_MODEL_CACHE_TIMEOUT = int(os.getenv("LOCAL_MODEL_CACHE_TIMEOUT", 5))
+# How many tiles are requested at once for map snapshots (thumbnails and previews), and how long snapshots are cached.
+SNAPSHOT_TILE_CONCURRENCY = int(os.getenv("SNAPSHOT_TILE_CONCURRENCY", 8))
+SNAPSHOT_CACHE_TIMEOUT = int(os.getenv("SNAPSHOT_CACHE_TIMEOUT", 3600))
 
 # session settings
 SESSION_COOKIE_NAME = "eventkit_exports_sessionid"
@@ -351,12 +374,25 @@ AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or AWS_ENDPOINT_URL
 AWS_S3_ACCESS_KEY_ID = os.getenv("AWS_S3_ACCESS_KEY_ID") or AWS_ACCESS_KEY_ID
 AWS_S3_SECRET_ACCESS_KEY = os.getenv("AWS_S3_SECRET_ACCESS_KEY") or AWS_SECRET_ACCESS_KEY
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME") or AWS_STORAGE_BUCKET_NAME
+# Files over the threshold are transferred in parts of AWS_S3_MULTIPART_CHUNKSIZE bytes, with up to
+# AWS_S3_MAX_CONCURRENCY parts in flight per file and AWS_S3_DOWNLOAD_CONCURRENCY files downloaded at once.
+AWS_S3_MULTIPART_THRESHOLD = int(os.getenv("AWS_S3_MULTIPART_THRESHOLD", 64 * 1024 * 1024))
+AWS_S3_MULTIPART_CHUNKSIZE = int(os.getenv("AWS_S3_MULTIPART_CHUNKSIZE", 64 * 1024 * 1024))
+AWS_S3_MAX_CONCURRENCY = int(os.getenv("AWS_S3_MAX_CONCURRENCY", 10))
+AWS_S3_DOWNLOAD_CONCURRENCY = int(os.getenv("AWS_S3_DOWNLOAD_CONCURRENCY", 4))
 
 # https://django-storages.readthedocs.io/en/latest/backends/amazon-S3.html#settings
 AWS_DEFAULT_ACL: str = None
 
 
 MAPPROXY_CONCURRENCY = os.getenv("MAPPROXY_CONCURRENCY", 1)
+# The number of mapproxy apps each process keeps built for serving map tiles.
+MAPPROXY_APP_CACHE_SIZE = int(os.getenv("MAPPROXY_APP_CACHE_SIZE", 32))
+# The number of partitions a raster seed is split into, each partition is seeded by MAPPROXY_CONCURRENCY workers.
+MAPPROXY_SEED_PARTITIONS = os.getenv("MAPPROXY_SEED_PARTITIONS", 1)
+# Download progress is reported at most every PROGRESS_UPDATE_INTERVAL seconds and PROGRESS_UPDATE_PERCENT percent.
+PROGRESS_UPDATE_INTERVAL = float(os.getenv("PROGRESS_UPDATE_INTERVAL", 5))
+PROGRESS_UPDATE_PERCENT = float(os.getenv("PROGRESS_UPDATE_PERCENT", 5))
 MAPPROXY_LOGS = {
     "requests": is_true(os.getenv("MAPPROXY_LOGS_REQUESTS")),
     "verbose": is_true(os.getenv("MAPPROXY_LOGS_VERBOSE")),
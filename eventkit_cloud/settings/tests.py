@@ -4,5 +4,10 @@ from eventkit_cloud.settings.prod import *  # NOQA
 TESTING = True
 CELERY_ALWAYS_EAGER = True
 BROKER_BACKEND = "memory"
+# The in process model cache isn't rolled back with the database between tests.
+LOCAL_MODEL_CACHE_TIMEOUT = 0
+# Tests mock the geocoders, so neither their sessions nor their results can be kept between tests.
+GEOCODING_CACHE_TIMEOUT = 0
+GEOCODING_SESSION_TIMEOUT = 0
 
 PASSWORD_HASHERS = ("django.contrib.auth.hashers.MD5PasswordHasher",)
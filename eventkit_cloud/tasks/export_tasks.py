@@ -10,9 +10,9 @@ import time
 import traceback
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, List, Type, Union, cast
+from typing import Any, List, Optional, Type, Union, cast
 from urllib.parse import urlencode
-from zipfile import ZIP_DEFLATED, ZipFile
+from zipfile import ZIP_DEFLATED
 
 from audit_logging.file_logging import logging_open
 from billiard.einfo import ExceptionInfo
@@ -26,7 +26,7 @@ from django.contrib.gis.geos import GEOSGeometry, Polygon
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import EmailMultiAlternatives
 from django.db import DatabaseError, transaction
-from django.db.models import Q
+from django.db.models import F, Q
 from django.template.loader import get_template
 from django.utils import timezone
 from gdal_utils import convert, convert_bbox
@@ -85,6 +85,7 @@ from eventkit_cloud.utils.rocket_chat import RocketChat
 from eventkit_cloud.utils.services.ogcapi_process import OGCAPIProcess
 from eventkit_cloud.utils.services.types import LayersDescription
 from eventkit_cloud.utils.stats.eta_estimator import ETA
+from eventkit_cloud.utils.zip_archive import ParallelZipFile
 
 BLACKLISTED_ZIP_EXTS = [".ini", ".om5", ".osm", ".lck", ".pyc"]
 
@@ -1525,6 +1526,7 @@ def mapproxy_export_task(
             task_uid=self.task.uid,
             selection=selection,
             projection=projection,
+            provider_slug=self.task.export_provider_task.provider.slug,
         )
         gpkg = w2g.convert()
         result["driver"] = "gpkg"
@@ -1595,24 +1597,80 @@ def wait_for_run(run_uid: str = None) -> None:
     """
     run = ExportRun.objects.get(uid=run_uid)
     if run.status:
+        # Check often at first, most runs this is used for are nearly finished.
+        interval = 1
         while (
             TaskState[run.status] not in TaskState.get_finished_states()
             and TaskState[run.status] not in TaskState.get_incomplete_states()
         ):
-            time.sleep(10)
+            time.sleep(interval)
+            interval = min(interval * 2, 10)
             run.refresh_from_db()
 
 
-# This could be improved by using Redis or Memcached to help manage state.
+def count_finished_provider(run_uid: str, data_provider_task_record_uid: str) -> Optional[int]:
+    """
+    Counts a provider of the run as finished, only once per provider.
+    :param run_uid: The uid of the run.
+    :param data_provider_task_record_uid: The uid of the DataProviderTaskRecord which finished.
+    :return: The number of providers the run is still waiting on, or None if the provider was already counted.
+    """
+    with transaction.atomic():
+        if not DataProviderTaskRecord.objects.filter(uid=data_provider_task_record_uid, finish_counted=False).update(
+            finish_counted=True
+        ):
+            return None
+        # The update locks the run until the transaction ends, so only one provider can see the count reach zero.
+        ExportRun.objects.filter(uid=run_uid).update(pending_provider_count=F("pending_provider_count") - 1)
+        return ExportRun.objects.values_list("pending_provider_count", flat=True).get(uid=run_uid)
+
+
+def are_providers_finished(run: ExportRun) -> bool:
+    """
+    :return: True if every provider of the run is in a finished state.
+    """
+    provider_tasks = run.data_provider_task_records.filter(~Q(slug="run"))
+    return all(TaskState[provider_task.status] in TaskState.get_finished_states() for provider_task in provider_tasks)
+
+
+def release_pending_providers(run_uid: str) -> bool:
+    """
+    Stops counting the providers of a run which finished without all of them being counted.
+    :param run_uid: The uid of the run.
+    :return: True if the count was released by this call, only one caller gets to run the callback.
+    """
+    return bool(ExportRun.objects.filter(uid=run_uid, pending_provider_count__gt=0).update(pending_provider_count=0))
+
+
 @app.task(name="Wait For Providers", base=EventKitBaseTask, acks_late=True)
-def wait_for_providers_task(result=None, apply_args=None, run_uid=None, callback_task=None, *args, **kwargs):
+def wait_for_providers_task(
+    result=None, apply_args=None, run_uid=None, callback_task=None, data_provider_task_record_uid=None, *args, **kwargs
+):
+    """
+    Runs the callback_task once every provider of the run has finished. Each provider counts itself as finished, and
+    the last one runs the callback. Runs which aren't counting their providers check the state of every provider.
+    """
     if isinstance(callback_task, dict):
         callback_task = signature(callback_task)
 
     run = ExportRun.objects.filter(uid=run_uid).first()
     if run:
-        provider_tasks = run.data_provider_task_records.filter(~Q(slug="run"))
-        if all(TaskState[provider_task.status] in TaskState.get_finished_states() for provider_task in provider_tasks):
+        if data_provider_task_record_uid and run.pending_provider_count is not None:
+            pending_provider_count = count_finished_provider(run_uid, data_provider_task_record_uid)
+            if pending_provider_count is None:
+                logger.warning(f"The provider {data_provider_task_record_uid} was already counted as finished.")
+            elif pending_provider_count == 0:
+                callback_task.apply_async(**apply_args)
+            elif are_providers_finished(run) and release_pending_providers(run_uid):
+                # A provider which was canceled or lost its worker never counts itself, so the states are still
+                # checked in case every provider has finished anyway.
+                logger.info(f"The run: {run_uid} has finished with {pending_provider_count} providers uncounted.")
+                callback_task.apply_async(**apply_args)
+            else:
+                logger.info(f"The run: {run_uid} is waiting for {pending_provider_count} other providers to finish.")
+            return
+
+        if are_providers_finished(run):
             callback_task.apply_async(**apply_args)
         else:
             logger.warning(f"The run: {run_uid} is Waiting for other tasks to finish.")
@@ -1763,7 +1821,8 @@ def zip_files(files, run_zip_file_uid, meta_files={}, file_path=None, metadata=N
             cleaned_files[Path(stage_path)] = Path(archive_path)
 
     logger.debug("Opening the zipfile.")
-    with ZipFile(file_path, "a", compression=ZIP_DEFLATED, allowZip64=True) as zipfile:
+    # Files are compressed in parallel and their CRCs are checked as they are written, so testzip isn't needed.
+    with ParallelZipFile(file_path, "a", compression=ZIP_DEFLATED, allowZip64=True) as zipfile:
         for absolute_file_path, relative_file_path in cleaned_files.items():
             if "__pycache__" in str(absolute_file_path):
                 continue
@@ -1773,10 +1832,7 @@ def zip_files(files, run_zip_file_uid, meta_files={}, file_path=None, metadata=N
 
         manifest_file = get_data_package_manifest(metadata=metadata, ignore_files=list(meta_files.values()))
         zipfile.write(manifest_file, arcname=os.path.join("MANIFEST", os.path.basename(manifest_file)))
-        add_export_run_files_to_zip(zipfile, run_zip_file)
-
-        if zipfile.testzip():
-            raise Exception("The zipped file was corrupted.")
+        add_export_run_files_to_zip(zipfile, run_zip_file, stage_dir=os.path.dirname(file_path))
 
     return file_path
 
@@ -1,21 +1,25 @@
 import copy
 import glob
+import hashlib
 import json
 import logging
 import os
 import pathlib
 import pickle
 import re
+import shutil
 import signal
 import tempfile
+import threading
 import time
 import urllib.parse
 import uuid
 import xml.etree.ElementTree as ET
+from collections import deque
 from concurrent import futures
 from contextlib import contextmanager
 from distutils import dir_util
-from functools import reduce
+from functools import partial, reduce
 from json import JSONDecodeError
 from operator import itemgetter
 from pathlib import Path
@@ -35,7 +39,7 @@ from gdal_utils import convert, get_band_statistics, get_meta
 from numpy import linspace
 from requests import Response, Session
 
-from eventkit_cloud.core.helpers import get_or_update_session, handle_auth
+from eventkit_cloud.core.helpers import copy_session, get_or_update_session, handle_auth
 from eventkit_cloud.jobs.enumerations import GeospatialDataType, StyleType
 from eventkit_cloud.jobs.models import StyleFile
 from eventkit_cloud.tasks import DEFAULT_CACHE_EXPIRATION, set_cache_value
@@ -43,6 +47,7 @@ from eventkit_cloud.tasks.enumerations import UNSUPPORTED_CARTOGRAPHY_FORMATS, D
 from eventkit_cloud.tasks.exceptions import FailedException
 from eventkit_cloud.tasks.models import DataProviderTaskRecord, ExportRun, ExportRunFile, ExportTaskRecord
 from eventkit_cloud.tasks.task_process import TaskProcess
+from eventkit_cloud.utils.arcgis2geojson import convert_feature as convert_arcgis_feature_to_geojson
 from eventkit_cloud.utils.arcgis.arcgis_layer import ArcGISLayer
 from eventkit_cloud.utils.generic import retry
 from eventkit_cloud.utils.helpers import make_dirs
@@ -54,6 +59,12 @@ CHUNK = 1024 * 1024 * 2  # 2MB chunks
 
 logger = logging.getLogger(__name__)
 
+# Holds the session belonging to each download worker thread.
+_download_worker = threading.local()
+
+# GDAL connection prefixes for the supported ArcGIS feature output formats.
+ARCGIS_FEATURE_FORMATS = {"esrijson": "ESRIJSON", "geojsonseq": "GeoJSONSeq"}
+
 
 def get_run_staging_dir(run_uid):
     """
@@ -757,21 +768,85 @@ def check_cached_task_failures(task_name, task_uid):
         raise FailedException(task_name=task_name)
 
 
-def add_export_run_files_to_zip(zipfile, run_zip_file):
+def get_export_run_file_cache_path(export_run_file: ExportRunFile) -> str:
+    """
+    The cache path is addressed by the storage key of the file and when it was last saved, so a new upload is cached
+    under a new path.
+    :param export_run_file: The ExportRunFile.
+    :return: The path to the cached file.
+    """
+    key = hashlib.sha256(export_run_file.file.name.encode()).hexdigest()[:32]
+    modified = int(export_run_file.updated_at.timestamp())
+    return os.path.join(
+        settings.EXPORT_RUN_FILES_CACHE_DIR, f"{key}-{modified}{Path(export_run_file.file.name).suffix}"
+    )
+
+
+def get_cached_export_run_file(export_run_file: ExportRunFile) -> str:
+    """
+    Gets the file from the cache, or downloads it into the cache if it isn't there yet.
+    :param export_run_file: The ExportRunFile.
+    :return: The path to the cached file.
+    """
+    cache_path = get_export_run_file_cache_path(export_run_file)
+    if os.path.isfile(cache_path):
+        logger.debug(f"Using the cached {export_run_file.file.name} at {cache_path}.")
+        return cache_path
+
+    make_dirs(settings.EXPORT_RUN_FILES_CACHE_DIR)
+    # Older versions of the file aren't needed anymore.
+    key = os.path.basename(cache_path).split("-")[0]
+    for stale_path in glob.glob(os.path.join(settings.EXPORT_RUN_FILES_CACHE_DIR, f"{key}-*")):
+        if stale_path == cache_path:
+            continue
+        try:
+            os.remove(stale_path)
+        except OSError:
+            pass
+
+    # Download to a temporary file first, so that other workers never see a partial file.
+    with tempfile.NamedTemporaryFile(dir=settings.EXPORT_RUN_FILES_CACHE_DIR, delete=False) as temp_file:
+        try:
+            with requests.get(export_run_file.file.url, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(CHUNK):
+                    temp_file.write(chunk)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+    os.replace(temp_file.name, cache_path)
+    return cache_path
+
+
+def link_or_copy(source: str, destination: str):
+    """
+    Hard links the file to the destination, so that the data isn't duplicated, or copies it if it can't be linked
+    (e.g. it is on another filesystem).
+    """
+    make_dirs(os.path.dirname(destination))
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def add_export_run_files_to_zip(zipfile, run_zip_file, stage_dir=None):
     """
-    Add additional files stored in ExportRunFile objects to a zipfile.
+    Add additional files stored in ExportRunFile objects to a zipfile. The files rarely change so they are cached
+    locally, and only downloaded again when they are updated.
+    :param zipfile: The ZipFile to add the files to.
+    :param run_zip_file: The RunZipFile being created.
+    :param stage_dir: The directory the files are placed in while they are zipped, defaults to EXPORT_RUN_FILES.
     """
-    if not os.path.exists(settings.EXPORT_RUN_FILES):
-        os.makedirs(settings.EXPORT_RUN_FILES)
+    stage_dir = os.path.join(stage_dir, "export_run_files") if stage_dir else settings.EXPORT_RUN_FILES
 
-    export_run_files = ExportRunFile.objects.all()
+    export_run_files = ExportRunFile.objects.select_related("provider")
     for export_run_file in export_run_files:
         run_zip_file.message = f"Adding {export_run_file.file.name} to zip archive."
-        export_run_file_path = os.path.join(settings.EXPORT_RUN_FILES, export_run_file.file.name)
-
-        request = requests.get(export_run_file.file.url)
-        with open(export_run_file_path, "wb+") as file:
-            file.write(request.content)
+        export_run_file_path = os.path.join(stage_dir, export_run_file.file.name)
+        link_or_copy(get_cached_export_run_file(export_run_file), export_run_file_path)
 
         extra_directory = export_run_file.directory or ""
         if export_run_file.provider:
@@ -870,6 +945,7 @@ def merge_chunks(
     session=None,
     dst_srs: int = 4326,
     service_description: dict = None,
+    chunk_executor: Optional[futures.Executor] = None,
     *args,
     **kwargs,
 ):
@@ -887,6 +963,7 @@ def merge_chunks(
         level=level,
         session=session,
         service_description=service_description,
+        chunk_executor=chunk_executor,
         *args,
         **kwargs,
     )  # type: ignore
@@ -912,7 +989,7 @@ def merge_chunks(
         logger.error("Failed to convert %s in merge_chunks", chunks, exc_info=True)
 
 
-def download_chunks_concurrently(layer, task_points, feature_data, *args, **kwargs):
+def download_chunks_concurrently(layer, task_points, feature_data, chunk_executor=None, *args, **kwargs):
     # Session is not threadsafe https://github.com/psf/requests/issues/2766.
     # We can create a new session and this should be ok to use, but will require more overhead.
     logger.debug("download_chunks_concurrently using *args %s and **kwargs %s", args, kwargs)
@@ -935,14 +1012,53 @@ def download_chunks_concurrently(layer, task_points, feature_data, *args, **kwar
         distinct_field=layer.get("distinct_field"),
         service_description=layer.get("service_description"),
         session=session,
+        chunk_executor=chunk_executor,
+        page_concurrency=kwargs.get("page_concurrency"),
+        feature_format=kwargs.get("feature_format"),
+    )
+
+
+def init_download_worker(*args, **session_info):
+    """
+    Initializer for download threads, each thread gets its own session because sessions aren't threadsafe.
+    :param session_info: kwargs to be passed in arbitrarily from a provider config, or a session to copy.
+    """
+    session = session_info.pop("session", None)
+    _download_worker.session = copy_session(session) if session else get_or_update_session(*args, **session_info)
+
+
+def get_download_session(session: Optional[Session] = None) -> Session:
+    """
+    :return: The session for the current download worker thread, or the given session outside of a worker thread.
+    """
+    return getattr(_download_worker, "session", None) or session
+
+
+def get_chunk_executor(chunk_concurrency: Optional[int], *args, **session_info) -> Optional[futures.Executor]:
+    """
+    Returns a bounded pool used to download the chunks of all of a provider's layers, or None if chunks should be
+    downloaded one at a time.
+    :param chunk_concurrency: The maximum number of chunks to download at once for the provider.
+    :param session_info: kwargs to be passed in arbitrarily from a provider config.
+    """
+    chunk_concurrency = int(chunk_concurrency or 1)
+    if chunk_concurrency <= 1:
+        return None
+    return futures.ThreadPoolExecutor(
+        max_workers=chunk_concurrency,
+        thread_name_prefix="chunk-download",
+        initializer=partial(init_download_worker, *args, **session_info),
     )
 
 
 def download_concurrently(layers: list, concurrency=None, feature_data=False, *args, **kwargs):
     """
     Function concurrently downloads data from a given list URLs and download paths.
+    The layers are downloaded using `concurrency` threads, and the chunks of every layer share a single pool of
+    `chunk_concurrency` threads so that the provider never receives more than that many chunk requests at once.
     """
 
+    chunk_executor = get_chunk_executor(kwargs.pop("chunk_concurrency", None), *args, **kwargs)
     try:
         executor = futures.ThreadPoolExecutor(max_workers=concurrency)
 
@@ -956,6 +1072,7 @@ def download_concurrently(layers: list, concurrency=None, feature_data=False, *a
                 layer=layer,
                 task_points=task_points,
                 feature_data=feature_data,
+                chunk_executor=chunk_executor,
                 *args,
                 **kwargs,
             )  # type: ignore
@@ -969,6 +1086,9 @@ def download_concurrently(layers: list, concurrency=None, feature_data=False, *a
     except Exception as e:
         logger.error(f"Unable to execute concurrent downloads: {e}")
         raise e
+    finally:
+        if chunk_executor:
+            chunk_executor.shutdown(cancel_futures=True)
 
     return layers
 
@@ -1009,6 +1129,112 @@ def parse_arcgis_feature_response(file_path: str) -> dict:
     return json_response
 
 
+def get_arcgis_page_url(input_url: str, result_offset: int, result_record_count: int, out_sr: int = None) -> str:
+    """
+    Adds the pagination parameters to an ArcGIS query url.
+    """
+    url_parts: dict = urllib.parse.urlparse(input_url)._asdict()
+    query = urllib.parse.parse_qs(url_parts["query"])
+    query.update({"resultOffset": [result_offset], "resultRecordCount": [result_record_count]})
+    if out_sr:
+        query["outSR"] = [out_sr]
+    url_parts["query"] = urllib.parse.urlencode(query, doseq=True)
+    return urllib.parse.ParseResult(**url_parts).geturl()
+
+
+def get_arcgis_feature_pages(
+    task_uid: str,
+    input_url: str,
+    total_expected_features: Optional[int],
+    result_record_count: int,
+    page_concurrency: int = 1,
+    session: Session = None,
+    task_points: int = 100,
+    out_sr: int = None,
+):
+    """
+    Downloads the pages of an ArcGIS query, yielding each page response in order.
+    When the total is known every offset is known up front, so up to page_concurrency pages are downloaded at once and
+    at most page_concurrency responses are held in memory.  Pages past the expected total (or all pages if the total is
+    unknown) are downloaded one at a time until the service stops reporting that the transfer limit was exceeded.
+    """
+    offsets = range(0, total_expected_features or 0, result_record_count)
+    # Each page is a share of the task points given to this query.
+    page_points = task_points * max(len(offsets), 1)
+
+    def download_page(result_offset: int) -> dict:
+        page_url = get_arcgis_page_url(input_url, result_offset, result_record_count, out_sr=out_sr)
+        with tempfile.NamedTemporaryFile(mode="w+b") as arcgis_response_file:
+            download_data(
+                task_uid,
+                page_url,
+                arcgis_response_file.name,
+                session=get_download_session(session),
+                task_points=page_points,
+            )
+            return parse_arcgis_feature_response(arcgis_response_file.name)
+
+    feature_response: dict = {"exceededTransferLimit": True}
+    if offsets:
+        executor = futures.ThreadPoolExecutor(
+            max_workers=page_concurrency,
+            thread_name_prefix="arcgis-page",
+            initializer=partial(init_download_worker, session=get_download_session(session)),
+        )
+        try:
+            pending: deque = deque()
+            for result_offset in offsets:
+                pending.append(executor.submit(download_page, result_offset))
+                if len(pending) >= page_concurrency:
+                    feature_response = pending.popleft().result()
+                    yield feature_response
+            while pending:
+                feature_response = pending.popleft().result()
+                yield feature_response
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    result_offset = len(offsets) * result_record_count
+    while feature_response.get("exceededTransferLimit"):
+        feature_response = download_page(result_offset)
+        yield feature_response
+        result_offset += result_record_count
+
+
+def write_arcgis_features(out_file: str, feature_responses, document: dict, feature_format: str = "esrijson") -> int:
+    """
+    Streams the features of each response to out_file without holding the whole document in memory.
+    :param out_file: The file to write.
+    :param feature_responses: An iterable of parsed ArcGIS query responses.
+    :param document: The ESRI JSON document attributes (fields, geometryType, etc.) used for esrijson.
+    :param feature_format: Either esrijson for a single ESRI JSON document, or geojsonseq for newline delimited GeoJSON.
+    :return: The number of features written.
+    """
+    feature_count = 0
+    with open(out_file, "w") as f:
+        if feature_format == "geojsonseq":
+            for feature_response in feature_responses:
+                for feature in feature_response["features"]:
+                    f.write(json.dumps(convert_arcgis_feature_to_geojson(feature)))
+                    f.write("\n")
+                    feature_count += 1
+            return feature_count
+
+        f.write("{")
+        for key, value in document.items():
+            if key != "features":
+                f.write(f"{json.dumps(key)}: {json.dumps(value)}, ")
+        f.write('"features": [')
+        for feature_response in feature_responses:
+            for feature in feature_response["features"]:
+                if feature_count:
+                    f.write(", ")
+                f.write(json.dumps(feature))
+                feature_count += 1
+        f.write("]}")
+    return feature_count
+
+
 @retry
 def download_arcgis_feature_data(
     task_uid: str,
@@ -1017,9 +1243,17 @@ def download_arcgis_feature_data(
     task_points: int = 100,
     session: Session = None,
     service_description: dict = None,
+    page_concurrency: int = None,
+    feature_format: str = None,
     *args,
     **kwargs,
 ):
+    """
+    Downloads the features of an ArcGIS query to out_file.
+    :param page_concurrency: The number of pages to download at once if the service supports pagination.
+    :param feature_format: esrijson (default) or geojsonseq, the format used to write the features.
+    :return: The out_file prefixed with the GDAL driver to use to read it.
+    """
     # This function is necessary because ArcGIS servers often either
     # respond with a 200 status code but also return an error message in the response body,
     # or redirect to a parent URL if a resource is not found.
@@ -1030,25 +1264,30 @@ def download_arcgis_feature_data(
     service_description = service_description or dict()
     pagination = service_description.get("advancedQueryCapabilities", {}).get("supportsPagination", False)
     result_record_count = service_description.get("maxRecordCount", 1000)
-    json_response = None
+    page_concurrency = int(page_concurrency or 1)
+    feature_format = (feature_format or "esrijson").lower()
+    if feature_format not in ARCGIS_FEATURE_FORMATS:
+        raise Exception(f"Unsupported ArcGIS feature format {feature_format}.")
+    # GeoJSON is always WGS84, so have the service reproject the features.
+    out_sr = 4326 if feature_format == "geojsonseq" else None
     try:
         feature_count_url = f"{input_url}&returnCountOnly=true"
         total_expected_features_response = None
+        total_expected_features: Optional[int] = None
         try:
             total_expected_features_response = session.get(feature_count_url)
-            total_expected_features = session.get(feature_count_url).json()["count"]
-            if total_expected_features and int(total_expected_features):
+            total_expected_features = int(total_expected_features_response.json()["count"])
+            if total_expected_features:
                 logger.info("Downloading %s features", total_expected_features)
         except Exception:
             logger.error(
                 "Could not parse feature count from %s: \n %s",
                 feature_count_url,
-                total_expected_features_response.content,
+                getattr(total_expected_features_response, "content", None),
                 exc_info=True,
             )
             logger.error("No count was provided for the current request %s", feature_count_url)
-            total_expected_features = 1  # we need to set this to something so we can just proceed since we don't know
-        json_response = {
+        document = {
             "displayFieldName": service_description.get("displayField") or "NAME",
             "fields": service_description.get("fields") or [],
             "fieldAliases": {
@@ -1056,42 +1295,36 @@ def download_arcgis_feature_data(
             },
             "spatialReference": {"wkid": (service_description.get("sourceSpatialReference") or {}).get("wkid")},
             "geometryType": service_description.get("geometryType"),
-            "features": [],
         }
-        if pagination and total_expected_features:
-            result_offset = 0
-            exceeded_transfer_limit: bool = True
-            while exceeded_transfer_limit:
-                url_parts: dict = urllib.parse.urlparse(input_url)._asdict()
-                query = urllib.parse.parse_qs(url_parts["query"])
-                query.update({"resultOffset": [result_offset], "resultRecordCount": [result_record_count]})
-                url_parts["query"] = urllib.parse.urlencode(query, doseq=True)
-                input_url = urllib.parse.ParseResult(**url_parts).geturl()
-
-                with tempfile.NamedTemporaryFile(mode="w+b") as arcgis_response_file:
-                    download_data(
-                        task_uid, input_url, arcgis_response_file.name, session=session, task_points=task_points
-                    )
-                    feature_response = parse_arcgis_feature_response(arcgis_response_file.name)
-                    if not json_response:
-                        json_response = copy.deepcopy(feature_response)
-
-                    json_response["features"].extend(feature_response["features"])
-                    result_offset = result_offset + result_record_count
-                    exceeded_transfer_limit = bool(feature_response.get("exceededTransferLimit"))
-        if not json_response:
+        if total_expected_features == 0:
+            feature_responses: Any = []
+        elif pagination:
+            # If the count is unknown pages are requested until the service stops reporting that the transfer limit
+            # was exceeded.
+            feature_responses = get_arcgis_feature_pages(
+                task_uid,
+                input_url,
+                total_expected_features,
+                result_record_count,
+                page_concurrency=page_concurrency,
+                session=session,
+                task_points=task_points,
+                out_sr=out_sr,
+            )
+        else:
+            if out_sr:
+                input_url = f"{input_url}&outSR={out_sr}"
             download_data(task_uid, input_url, out_file, session=session, task_points=task_points)
-            json_response = parse_arcgis_feature_response(out_file)
-        with open(out_file, "w") as f:
-            json.dump(json_response, f)
+            feature_response = parse_arcgis_feature_response(out_file)
+            document = {key: value for key, value in feature_response.items() if key != "features"}
+            feature_responses = [feature_response]
+        feature_count = write_arcgis_features(out_file, feature_responses, document, feature_format=feature_format)
+        logger.info("Downloaded %s features", feature_count)
     except Exception as e:
-        if json_response:
-            logger.info(json_response)
         logger.error(f"Feature data download error: {e}")
         raise e
     #  Use prefix to disambiguate drivers, https://gdal.org/drivers/vector/esrijson.html#datasource
-    esri_json_file = f"ESRIJSON:{out_file}"
-    return esri_json_file
+    return f"{ARCGIS_FEATURE_FORMATS[feature_format]}:{out_file}"
 
 
 def download_chunks(
@@ -1106,31 +1339,45 @@ def download_chunks(
     size=None,
     session=None,
     service_description=None,
+    chunk_executor: Optional[futures.Executor] = None,
     *args,
     **kwargs,
 ):
+    """
+    Downloads the data for each tile of the bbox, using the chunk_executor if one is provided.
+    :return: A list of the downloaded files, in the same order as the tiles.
+    """
     tile_bboxes = get_chunked_bbox(bbox, size=size, level=level)
-    chunks = []
-    for _index, _tile_bbox in enumerate(tile_bboxes):
+    if chunk_executor:
+        # The pages of a chunk are downloaded one at a time within a chunk worker, so the provider still never receives
+        # more than chunk_concurrency requests at once.
+        kwargs["page_concurrency"] = 1
+    download_function = download_arcgis_feature_data if feature_data else download_data
+
+    def download_chunk(_index, _tile_bbox):
         # Replace bbox placeholder here, allowing for the bbox as either a list or tuple
         url = base_url.replace("BBOX_PLACEHOLDER", urllib.parse.quote(str([*_tile_bbox]).strip("[]")))
         if layer_name:
             base_name = f"{layer_name}-chunk-{_index}.json"
         outfile = os.path.join(stage_dir, base_name)
-        download_function = download_arcgis_feature_data if feature_data else download_data
-        downloaded_file = download_function(
+        return download_function(
             task_uid,
             url,
             outfile,
             task_points=(task_points * len(tile_bboxes)),
             service_description=service_description,
-            session=session,
+            # Chunk worker threads use their own session, since sessions aren't threadsafe.
+            session=get_download_session(session),
             *args,
             **kwargs,
         )
-        if downloaded_file:
-            chunks.append(downloaded_file)
-    return chunks
+
+    if chunk_executor:
+        # map returns the results in the order of the tiles regardless of when each download finishes.
+        downloaded_files = list(chunk_executor.map(download_chunk, range(len(tile_bboxes)), tile_bboxes))
+    else:
+        downloaded_files = [download_chunk(_index, _tile_bbox) for _index, _tile_bbox in enumerate(tile_bboxes)]
+    return [downloaded_file for downloaded_file in downloaded_files if downloaded_file]
 
 
 def get_file_name_from_response(response: Response) -> str:
@@ -1189,30 +1436,19 @@ def download_data(task_uid: str, input_url: str, out_file: str = None, session=N
     except Exception:
         logger.error("Unable to verify data type.")
 
-    written_size = 0
-    update_interval = total_size / 100
     start_points = cache.get_or_set(get_task_progress_cache_key(task_uid), 0, timeout=DEFAULT_CACHE_EXPIRATION)
     start_percent = (start_points / task_points) * 100
 
+    # Progress is accumulated per download and flushed periodically, chunks of the same task can be downloaded in
+    # different threads and only the atomic incr of the progress points is shared between them.
+    progress_accumulator = ProgressAccumulator(task_uid, task_points=task_points, start_percent=start_percent)
     logger.debug("Saving data to: %s", out_file)
     with logging_open(out_file, "wb") as file_:
         for chunk in response.iter_content(CHUNK):
             file_.write(chunk)
-            written_size += CHUNK
-
-            last_update = cache.get_or_set(get_last_update_cache_key(task_uid), 0)
-            last_update += CHUNK
-            cache.set(get_last_update_cache_key(task_uid), last_update, timeout=DEFAULT_CACHE_EXPIRATION)
-
-            if last_update > update_interval:
-                updated_points = int((last_update / total_size) * 100) if last_update < total_size else 100
-                cache.incr(get_task_progress_cache_key(task_uid), updated_points)
-
-                progress_points = cache.get(get_task_progress_cache_key(task_uid))
-                progress = progress_points / task_points * 100 if progress_points < task_points else 100
-                update_progress(task_uid, progress, subtask_percentage=100 / task_points, subtask_start=start_percent)
-
-                cache.set(get_last_update_cache_key(task_uid), 0, timeout=DEFAULT_CACHE_EXPIRATION)
+            if total_size:
+                progress_accumulator.add(len(chunk) / total_size * 100)
+    progress_accumulator.flush()
 
     if not os.path.isfile(out_file):
         raise Exception("Nothing was returned from the vector feature service.")
@@ -1220,6 +1456,56 @@ def download_data(task_uid: str, input_url: str, out_file: str = None, session=N
     return out_file
 
 
+class ProgressAccumulator:
+    """
+    Accumulates the progress points of a download in process, instead of reporting every chunk to the cache.
+    The points are flushed to the cache, and the progress of the task updated, once at least PROGRESS_UPDATE_PERCENT
+    points have accumulated and PROGRESS_UPDATE_INTERVAL seconds have passed since the last flush.
+    A download is worth 100 points, so a 1 GB download is flushed at most 100 / PROGRESS_UPDATE_PERCENT times.
+    """
+
+    def __init__(
+        self,
+        task_uid: str,
+        task_points: int = 100,
+        start_percent: float = 0,
+        interval: float = None,
+        min_points: float = None,
+    ):
+        """
+        :param task_uid: A uid to reference the ExportTaskRecord.
+        :param task_points: The total number of points for the task, see update_progress.
+        :param start_percent: The progress of the task when the download started.
+        :param interval: The minimum number of seconds between flushes, defaults to PROGRESS_UPDATE_INTERVAL.
+        :param min_points: The minimum number of points to flush, defaults to PROGRESS_UPDATE_PERCENT.
+        """
+        self.task_uid = task_uid
+        self.task_points = task_points
+        self.start_percent = start_percent
+        self.interval = settings.PROGRESS_UPDATE_INTERVAL if interval is None else interval
+        self.min_points = settings.PROGRESS_UPDATE_PERCENT if min_points is None else min_points
+        self.pending_points = 0.0
+        self.last_flush = time.monotonic()
+
+    def add(self, points: float):
+        self.pending_points += points
+        if self.pending_points >= self.min_points and time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        # Only whole points are added to the cache, the remainder is kept for the next flush.
+        points = int(self.pending_points)
+        if not points:
+            return
+        self.pending_points -= points
+        self.last_flush = time.monotonic()
+        progress_points = cache.incr(get_task_progress_cache_key(self.task_uid), points)
+        progress = progress_points / self.task_points * 100 if progress_points < self.task_points else 100
+        update_progress(
+            self.task_uid, progress, subtask_percentage=100 / self.task_points, subtask_start=self.start_percent
+        )
+
+
 def get_task_points_cache_key(task_uid: str):
     return f"{task_uid}_task_points"
 
@@ -1228,10 +1514,6 @@ def get_task_progress_cache_key(task_uid: str):
     return f"{task_uid}_progress"
 
 
-def get_last_update_cache_key(task_uid: str):
-    return f"{task_uid}_mb_since_update"
-
-
 def find_in_zip(
     zip_filepath: str,
     stage_dir: str,
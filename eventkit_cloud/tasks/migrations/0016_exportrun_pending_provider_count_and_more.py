@@ -0,0 +1,23 @@
+# Generated by Django 4.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_remove_fileproducingtaskresult_download_url_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportrun',
+            name='pending_provider_count',
+            field=models.IntegerField(blank=True, editable=False, help_text='The number of providers the run is waiting on to finish.', null=True),
+        ),
+        migrations.AddField(
+            model_name='dataprovidertaskrecord',
+            name='finish_counted',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether the run has counted this provider as finished.'),
+        ),
+    ]
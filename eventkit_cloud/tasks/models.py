@@ -174,6 +174,9 @@ class ExportRun(UIDMixin, TimeStampedModelMixin, TimeTrackingModelMixin, Notific
     deleted = models.BooleanField(default=False, db_index=True)
     is_cloning = models.BooleanField(default=False)
     delete_user = models.ForeignKey(User, null=True, blank=True, editable=False, on_delete=models.CASCADE)
+    pending_provider_count = models.IntegerField(
+        null=True, blank=True, editable=False, help_text="The number of providers the run is waiting on to finish."
+    )
 
     class Meta:
         managed = True
@@ -317,6 +320,9 @@ class DataProviderTaskRecord(UIDMixin, TimeStampedModelMixin, TimeTrackingModelM
     preview = models.ForeignKey(
         MapImageSnapshot, blank=True, null=True, on_delete=models.SET_NULL, help_text="A preview for a provider task."
     )
+    finish_counted = models.BooleanField(
+        default=False, editable=False, help_text="Whether the run has counted this provider as finished."
+    )
 
     class Meta:
         ordering = ["name"]
@@ -3,16 +3,20 @@ import copy
 import datetime
 import json
 import os
+import random
 import socket
+import time
 from collections import OrderedDict
-from concurrent.futures import ThreadPoolExecutor
-from typing import Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Tuple, Union
 
+import requests
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.contrib.sessions.models import Session
 from django.core.mail import EmailMultiAlternatives
 from django.core.management import call_command
+from django.db import connection
 from django.db.models import Q
 from django.template.loader import get_template
 from django.utils import timezone
@@ -27,8 +31,10 @@ from eventkit_cloud.tasks.helpers import delete_rabbit_objects, get_all_rabbitmq
 from eventkit_cloud.tasks.models import ExportRun, ExportTaskRecord
 from eventkit_cloud.tasks.task_base import EventKitBaseTask, LockingTask
 from eventkit_cloud.tasks.util_tasks import kill_workers
+from eventkit_cloud.utils.mapproxy import prune_shared_tile_cache
 from eventkit_cloud.utils.scaling.scale_client import ScaleClient
 from eventkit_cloud.utils.scaling.util import get_scale_client
+from eventkit_cloud.utils.services.check_result import CheckResult, get_status_result
 from eventkit_cloud.utils.stats.generator import update_all_statistics_caches
 
 logger = get_task_logger(__name__)
@@ -370,22 +376,89 @@ def run_task_command(client: ScaleClient, app_name: str, queue_name: str, task:
     expires=timezone.now() + timezone.timedelta(minutes=int(os.getenv("PROVIDER_CHECK_INTERVAL", "30"))),
 )
 def check_provider_availability_task():
-    from eventkit_cloud.jobs.models import DataProvider, DataProviderStatus
-
-    for provider in DataProvider.objects.all():
-        status = provider.check_status()
-        data_provider_status = DataProviderStatus.objects.create(related_provider=provider)
-        data_provider_status.last_check_time = datetime.datetime.now()
-        try:
-            data_provider_status.status = status["status"]
-            data_provider_status.status_type = status["type"]
-            data_provider_status.message = status["message"]
-            data_provider_status.save()
-        except Exception as e:
-            logger.error(f"Cannot read index from {status}")
-            if isinstance(status, Response):
-                logger.error(f"Status content: {status.content}")  # type: ignore
-            raise e
+    """
+    Checks the status of every provider in a pool of threads, so that slow providers don't hold up the others. A check
+    which doesn't finish within PROVIDER_CHECK_TIMEOUT seconds is recorded as a timeout. The checks start at a random
+    offset of up to PROVIDER_CHECK_JITTER seconds, so that providers on the same server aren't all hit at once.
+    """
+    from eventkit_cloud.jobs.models import DataProvider
+
+    max_workers = int(os.getenv("PROVIDER_CHECK_CONCURRENCY", "8"))
+    check_timeout = float(os.getenv("PROVIDER_CHECK_TIMEOUT", "60"))
+    jitter = float(os.getenv("PROVIDER_CHECK_JITTER", "10"))
+
+    # The checks share a connection pool, but each provider gets its own session for its credentials.
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    providers = list(DataProvider.objects.select_related("export_provider_type"))
+    schedule = sorted([(random.uniform(0, jitter), provider) for provider in providers], key=lambda item: item[0])
+
+    check_started_at: Dict[int, float] = {}
+    futures: Dict[Future, Any] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        started_at = time.monotonic()
+        for delay, provider in schedule:
+            time.sleep(max(0.0, started_at + delay - time.monotonic()))
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            futures[executor.submit(check_provider_status, provider, session, check_started_at)] = provider
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                status, duration = future.result()
+                save_provider_status(futures[future], status, duration)
+            now = time.monotonic()
+            for future in list(pending):
+                provider = futures[future]
+                if provider.id in check_started_at and now - check_started_at[provider.id] > check_timeout:
+                    logger.warning(f"The check of {provider.slug} did not finish within {check_timeout} seconds.")
+                    pending.remove(future)
+                    save_provider_status(
+                        provider, get_status_result(CheckResult.TIMEOUT), now - check_started_at[provider.id]
+                    )
+    finally:
+        # Checks which timed out are left to finish in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def check_provider_status(
+    provider, session: requests.Session, check_started_at: Dict[int, float]
+) -> Tuple[dict, float]:
+    """
+    Checks the status of a provider in a worker thread.
+    :param provider: The DataProvider to check.
+    :param session: A new session for the provider.
+    :param check_started_at: When each check started, by provider id.
+    :return: The status and how long the check took in seconds.
+    """
+    started_at = check_started_at[provider.id] = time.monotonic()
+    try:
+        return provider.check_status(session=session), time.monotonic() - started_at
+    finally:
+        # The thread opens its own database connection if the check uses the database cache.
+        connection.close()
+
+
+def save_provider_status(provider, status: dict, duration: float):
+    from eventkit_cloud.jobs.models import DataProviderStatus
+
+    logger.info(f"Checked {provider.slug} in {duration:.2f} seconds.")
+    data_provider_status = DataProviderStatus.objects.create(related_provider=provider)
+    data_provider_status.last_check_time = datetime.datetime.now()
+    data_provider_status.check_duration = duration
+    try:
+        data_provider_status.status = status["status"]
+        data_provider_status.status_type = status["type"]
+        data_provider_status.message = status["message"]
+        data_provider_status.save()
+    except Exception as e:
+        logger.error(f"Cannot read index from {status}")
+        if isinstance(status, Response):
+            logger.error(f"Status content: {status.content}")  # type: ignore
+        raise e
 
 
 def send_warning_email(date=None, url=None, addr=None, job_name=None):
@@ -425,6 +498,11 @@ def clear_tile_cache_task():
     call_command("clear_tile_cache")
 
 
+@app.task(name="Prune Shared Tile Cache", base=EventKitBaseTask)
+def prune_shared_tile_cache_task():
+    prune_shared_tile_cache()
+
+
 @app.task(name="Clear User Sessions", base=EventKitBaseTask)
 def clear_user_sessions_task():
     call_command("clearsessions")
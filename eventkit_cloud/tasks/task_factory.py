@@ -138,6 +138,7 @@ class TaskFactory:
         }
 
         finalized_provider_task_chain_list = []
+        pending_provider_task_record_uids = []
         # Create a task record which can hold tasks for the run (datapack)
         run_task_record, created = DataProviderTaskRecord.objects.get_or_create(
             run=run, name="run", slug="run", defaults={"status": TaskState.PENDING.value, "display": False}
@@ -189,6 +190,7 @@ class TaskFactory:
 
                 wait_for_providers_signature = wait_for_providers_task.s(
                     run_uid=run_uid,
+                    data_provider_task_record_uid=provider_task_record_uid,
                     locking_task_key=run_uid,
                     callback_task=create_finalize_run_task_collection(
                         run_uid=run_uid,
@@ -229,6 +231,7 @@ class TaskFactory:
                         )
                         provider_subtask_chain = chain(provider_subtask_chain, zip_export_provider_sig)
 
+                    pending_provider_task_record_uids.append(provider_task_record_uid)
                     finalized_provider_task_chain_list.append(
                         chain(
                             selection_task,
@@ -242,6 +245,12 @@ class TaskFactory:
         # that if an error occurs earlier on in the method, all of the tasks will fail rather than an undefined
         # number of them. this simplifies error handling, because we don't have to deduce which tasks were
         # successfully kicked off and which ones failed.
+        # Each provider counts itself as finished in wait_for_providers_task, the last one finalizes the run.
+        with transaction.atomic():
+            DataProviderTaskRecord.objects.filter(uid__in=pending_provider_task_record_uids).update(
+                finish_counted=False
+            )
+            ExportRun.objects.filter(uid=run_uid).update(pending_provider_count=len(pending_provider_task_record_uids))
         for item in finalized_provider_task_chain_list:
             item.apply_async(**finalize_task_settings)
 
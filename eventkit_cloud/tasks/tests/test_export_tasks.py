@@ -762,7 +762,7 @@ class TestExportTasks(ExportTaskBase):
     @patch("eventkit_cloud.tasks.export_tasks.retry")
     @patch("shutil.copy")
     @patch("os.remove")
-    @patch("eventkit_cloud.tasks.export_tasks.ZipFile")
+    @patch("eventkit_cloud.tasks.export_tasks.ParallelZipFile")
     @patch("os.walk")
     @patch("os.path.getsize")
     def test_zipfile_task(
@@ -787,9 +787,6 @@ class TestExportTasks(ExportTaskBase):
             def __enter__(self, *args, **kw):
                 return self
 
-            def testzip(self):
-                return None
-
         expected_archived_files = {
             "MANIFEST/manifest.xml": "MANIFEST/manifest.xml",
             "data/osm/file1.txt": "osm/file1.txt",
@@ -823,10 +820,6 @@ class TestExportTasks(ExportTaskBase):
         self.assertEqual(result, zipfile_path)
         mock_get_data_package_manifest.assert_called_once()
 
-        zipfile.testzip = Exception("Bad Zip")
-        with self.assertRaises(Exception):
-            zip_files(files=files, file_path=zipfile_path)
-
     @patch("eventkit_cloud.tasks.export_tasks.geopackage")
     def test_bounds_export_task(self, mock_geopackage):
         mock_geopackage.add_geojson_to_geopackage.return_value = self.output_file
@@ -1062,6 +1055,92 @@ class TestExportTasks(ExportTaskBase):
             mock_export_run.objects.filter().first().__nonzero__.return_value = False
             wait_for_providers_task(run_uid=self.run.uid, callback_task=callback_task, apply_args=apply_args)
 
+    def test_wait_for_providers_task_counts_providers(self):
+        first_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="first", slug="first", status=TaskState.COMPLETED.value
+        )
+        second_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="second", slug="second", status=TaskState.RUNNING.value
+        )
+        ExportRun.objects.filter(uid=self.run.uid).update(pending_provider_count=2)
+        callback_task = MagicMock()
+        apply_args = {"arg1": "example_value"}
+
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=first_record.uid,
+        )
+        callback_task.apply_async.assert_not_called()
+
+        # A provider which is finalized again isn't counted twice.
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=first_record.uid,
+        )
+        callback_task.apply_async.assert_not_called()
+        self.assertEqual(ExportRun.objects.get(uid=self.run.uid).pending_provider_count, 1)
+
+        # The last provider to finish runs the callback.
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=second_record.uid,
+        )
+        callback_task.apply_async.assert_called_once_with(**apply_args)
+        self.assertEqual(ExportRun.objects.get(uid=self.run.uid).pending_provider_count, 0)
+
+    def test_wait_for_providers_task_provider_canceled(self):
+        first_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="first", slug="first", status=TaskState.COMPLETED.value
+        )
+        second_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="second", slug="second", status=TaskState.RUNNING.value
+        )
+        third_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="third", slug="third", status=TaskState.RUNNING.value
+        )
+        ExportRun.objects.filter(uid=self.run.uid).update(pending_provider_count=3)
+        callback_task = MagicMock()
+        apply_args = {"arg1": "example_value"}
+
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=first_record.uid,
+        )
+        callback_task.apply_async.assert_not_called()
+
+        # The second provider is killed, its chain never reaches the wait task so it is never counted.
+        second_record.status = TaskState.CANCELED.value
+        second_record.save()
+        third_record.status = TaskState.COMPLETED.value
+        third_record.save()
+
+        # The last provider to finish still runs the callback, since every provider is in a finished state.
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=third_record.uid,
+        )
+        callback_task.apply_async.assert_called_once_with(**apply_args)
+        self.assertEqual(ExportRun.objects.get(uid=self.run.uid).pending_provider_count, 0)
+
+        # If the killed provider is counted after all, the callback isn't run again.
+        wait_for_providers_task(
+            run_uid=self.run.uid,
+            callback_task=callback_task,
+            apply_args=apply_args,
+            data_provider_task_record_uid=second_record.uid,
+        )
+        callback_task.apply_async.assert_called_once_with(**apply_args)
+
     @patch("eventkit_cloud.tasks.export_tasks.get_arcgis_templates")
     @patch("eventkit_cloud.tasks.export_tasks.get_metadata")
     @patch("eventkit_cloud.tasks.export_tasks.zip_files")
@@ -4,21 +4,32 @@ import json
 import logging
 import os
 import signal
+import tempfile
+import threading
+import urllib.parse
 from unittest.mock import MagicMock, Mock, call, patch
 
 import requests
 import requests_mock
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from eventkit_cloud.tasks.enumerations import TaskState
 from eventkit_cloud.tasks.helpers import (
+    ProgressAccumulator,
+    add_export_run_files_to_zip,
     cd,
     delete_rabbit_objects,
+    download_arcgis_feature_data,
+    download_chunks,
+    download_data,
     find_in_zip,
     get_all_rabbitmq_objects,
+    get_arcgis_feature_pages,
     get_arcgis_metadata,
+    get_arcgis_page_url,
+    get_chunk_executor,
     get_data_package_manifest,
     get_file_paths,
     get_last_update,
@@ -30,6 +41,7 @@ from eventkit_cloud.tasks.helpers import (
     progressive_kill,
     split_bbox,
     update_progress,
+    write_arcgis_features,
 )
 
 logger = logging.getLogger(__name__)
@@ -256,6 +268,38 @@ class TestHelpers(TestCase):
         expected_metadata = {"stuff": "test", "data_sources": {"osm": {"files": [{"data": "here"}]}}}
         self.assertEqual(expected_metadata, get_arcgis_metadata(example_metadata))
 
+    @requests_mock.Mocker()
+    @patch("eventkit_cloud.tasks.helpers.ExportRunFile")
+    def test_add_export_run_files_to_zip(self, mock_export_run_file, requests_mocker):
+        url = "http://example/export_run_files/legend.png"
+        requests_mocker.get(url, content=b"legend")
+        export_run_file = Mock(directory="", provider=None, updated_at=timezone.now())
+        export_run_file.file.name = "legend.png"
+        export_run_file.file.url = url
+        mock_export_run_file.objects.select_related.return_value = [export_run_file]
+        mock_zipfile = Mock()
+
+        with tempfile.TemporaryDirectory() as temp_dir, override_settings(
+            EXPORT_RUN_FILES_CACHE_DIR=os.path.join(temp_dir, "cache")
+        ):
+            stage_dir = os.path.join(temp_dir, "run")
+            expected_path = os.path.join(stage_dir, "export_run_files", "legend.png")
+            add_export_run_files_to_zip(mock_zipfile, Mock(), stage_dir=stage_dir)
+            add_export_run_files_to_zip(mock_zipfile, Mock(), stage_dir=stage_dir)
+            mock_zipfile.write.assert_called_with(expected_path, "legend.png")
+            with open(expected_path, "rb") as open_file:
+                self.assertEqual(b"legend", open_file.read())
+            # The file is only downloaded again after it is updated.
+            self.assertEqual(1, requests_mocker.call_count)
+
+            requests_mocker.get(url, content=b"new legend")
+            export_run_file.updated_at += timezone.timedelta(minutes=1)
+            add_export_run_files_to_zip(mock_zipfile, Mock(), stage_dir=stage_dir)
+            with open(expected_path, "rb") as open_file:
+                self.assertEqual(b"new legend", open_file.read())
+            self.assertEqual(2, requests_mocker.call_count)
+            self.assertEqual(1, len(os.listdir(os.path.join(temp_dir, "cache"))))
+
     @requests_mock.Mocker()
     def test_get_all_rabbitmq_objects(self, requests_mocker):
         example_api = "http://example/api/"
@@ -450,3 +494,231 @@ class TestHelpers(TestCase):
         bbox = [-2, 0, 0, 2]
         expected_result = [[-2, 0, -1.0, 1.0], [-2, 1.0, -1.0, 2], [-1.0, 1.0, 0, 2], [-1.0, 0, 0, 1.0]]
         self.assertCountEqual(expected_result, split_bbox(bbox))
+
+    def test_get_chunk_executor(self):
+        self.assertIsNone(get_chunk_executor(None))
+        self.assertIsNone(get_chunk_executor(1))
+        executor = get_chunk_executor("3")
+        try:
+            self.assertEqual(3, executor._max_workers)
+        finally:
+            executor.shutdown()
+
+    @patch("eventkit_cloud.tasks.helpers.get_or_update_session")
+    @patch("eventkit_cloud.tasks.helpers.download_data")
+    @patch("eventkit_cloud.tasks.helpers.get_chunked_bbox")
+    def test_download_chunks(self, mock_get_chunked_bbox, mock_download_data, mock_get_or_update_session):
+        task_uid = "1234"
+        stage_dir = "/stage"
+        tile_bboxes = [[-1, -1, 0, 0], [0, -1, 1, 0], [-1, 0, 0, 1], [0, 0, 1, 1]]
+        mock_get_chunked_bbox.return_value = tile_bboxes
+        expected_files = [os.path.join(stage_dir, f"layer-chunk-{index}.json") for index in range(len(tile_bboxes))]
+        mock_download_data.side_effect = lambda task_uid, url, outfile, *args, **kwargs: outfile
+        session = Mock()
+
+        # Test chunks downloaded serially with the provided session.
+        result = download_chunks(
+            task_uid,
+            [-1, -1, 1, 1],
+            stage_dir,
+            "http://example.test?BBOX=BBOX_PLACEHOLDER",
+            layer_name="layer",
+            session=session,
+            page_concurrency=4,
+        )
+        self.assertEqual(expected_files, result)
+        self.assertEqual(len(tile_bboxes), mock_download_data.call_count)
+        for download_call in mock_download_data.call_args_list:
+            self.assertEqual(session, download_call.kwargs["session"])
+            self.assertEqual(100 * len(tile_bboxes), download_call.kwargs["task_points"])
+            self.assertEqual(4, download_call.kwargs["page_concurrency"])
+
+        # Test chunks downloaded concurrently, each worker thread using its own session and the results in order.
+        mock_download_data.reset_mock()
+        thread_sessions = {}
+        mock_get_or_update_session.side_effect = lambda *args, **kwargs: thread_sessions.setdefault(
+            threading.get_ident(), Mock()
+        )
+        chunk_executor = get_chunk_executor(2, cert_info=None)
+        try:
+            result = download_chunks(
+                task_uid,
+                [-1, -1, 1, 1],
+                stage_dir,
+                "http://example.test?BBOX=BBOX_PLACEHOLDER",
+                layer_name="layer",
+                session=session,
+                chunk_executor=chunk_executor,
+                page_concurrency=4,
+            )
+        finally:
+            chunk_executor.shutdown()
+        self.assertEqual(expected_files, result)
+        self.assertEqual(len(tile_bboxes), mock_download_data.call_count)
+        # Pages are downloaded one at a time within chunk workers, which are already limited to chunk_concurrency.
+        for download_call in mock_download_data.call_args_list:
+            self.assertEqual(1, download_call.kwargs["page_concurrency"])
+        used_sessions = {download_call.kwargs["session"] for download_call in mock_download_data.call_args_list}
+        self.assertNotIn(session, used_sessions)
+        self.assertTrue(used_sessions.issubset(set(thread_sessions.values())))
+
+    def test_get_arcgis_page_url(self):
+        url = get_arcgis_page_url("http://example.test/query?f=json&where=", 2000, 1000, out_sr=4326)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+        self.assertEqual(["2000"], query["resultOffset"])
+        self.assertEqual(["1000"], query["resultRecordCount"])
+        self.assertEqual(["4326"], query["outSR"])
+        self.assertEqual(["json"], query["f"])
+
+    @patch("eventkit_cloud.tasks.helpers.download_data")
+    def test_get_arcgis_feature_pages(self, mock_download_data):
+        total_features = 25
+
+        def download_page(task_uid, url, out_file, *args, **kwargs):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+            result_offset = int(query["resultOffset"][0])
+            result_record_count = int(query["resultRecordCount"][0])
+            features = [
+                {"attributes": {"OBJECTID": index}, "geometry": {"x": index, "y": index}}
+                for index in range(result_offset, min(result_offset + result_record_count, total_features))
+            ]
+            with open(out_file, "w") as f:
+                json.dump(
+                    {
+                        "features": features,
+                        "exceededTransferLimit": result_offset + result_record_count < total_features,
+                    },
+                    f,
+                )
+
+        mock_download_data.side_effect = download_page
+
+        # Test pages downloaded concurrently are returned in order, with the unexpected last page downloaded after.
+        pages = list(get_arcgis_feature_pages("1234", "http://example.test/query?f=json", 20, 10, page_concurrency=2))
+        feature_ids = [feature["attributes"]["OBJECTID"] for page in pages for feature in page["features"]]
+        self.assertEqual(list(range(total_features)), feature_ids)
+        self.assertEqual(3, mock_download_data.call_count)
+        # Each of the expected pages gets an equal share of the task points.
+        self.assertEqual({200}, {call.kwargs["task_points"] for call in mock_download_data.call_args_list})
+
+        # Test an unknown count pages serially until the transfer limit isn't exceeded.
+        mock_download_data.reset_mock()
+        pages = list(get_arcgis_feature_pages("1234", "http://example.test/query?f=json", None, 10))
+        self.assertEqual(3, len(pages))
+        self.assertEqual(3, mock_download_data.call_count)
+
+    def test_write_arcgis_features(self):
+        document = {"geometryType": "esriGeometryPoint", "fields": [{"name": "OBJECTID"}]}
+        feature_responses = [
+            {"features": [{"attributes": {"OBJECTID": 1}, "geometry": {"x": 1, "y": 2}}]},
+            {"features": []},
+            {"features": [{"attributes": {"OBJECTID": 2}, "geometry": {"x": 3, "y": 4}}]},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_file = os.path.join(tmp_dir, "out.json")
+            self.assertEqual(2, write_arcgis_features(out_file, feature_responses, document))
+            with open(out_file) as f:
+                esri_json = json.load(f)
+            self.assertEqual(document["geometryType"], esri_json["geometryType"])
+            self.assertEqual(document["fields"], esri_json["fields"])
+            self.assertEqual([1, 2], [feature["attributes"]["OBJECTID"] for feature in esri_json["features"]])
+
+            self.assertEqual(2, write_arcgis_features(out_file, feature_responses, document, "geojsonseq"))
+            with open(out_file) as f:
+                features = [json.loads(line) for line in f]
+            self.assertEqual([[1, 2], [3, 4]], [feature["geometry"]["coordinates"] for feature in features])
+            self.assertEqual([1, 2], [feature["id"] for feature in features])
+
+    @patch("eventkit_cloud.tasks.helpers.write_arcgis_features")
+    @patch("eventkit_cloud.tasks.helpers.get_arcgis_feature_pages")
+    def test_download_arcgis_feature_data(self, mock_get_arcgis_feature_pages, mock_write_arcgis_features):
+        mock_session = Mock()
+        mock_session.get.return_value.json.return_value = {"count": 20}
+        mock_write_arcgis_features.return_value = 20
+        service_description = {"advancedQueryCapabilities": {"supportsPagination": True}, "maxRecordCount": 10}
+        input_url = "http://example.test/query?f=json"
+
+        result = download_arcgis_feature_data(
+            "1234",
+            input_url,
+            "out.json",
+            session=mock_session,
+            service_description=service_description,
+            page_concurrency=4,
+        )
+        self.assertEqual("ESRIJSON:out.json", result)
+        # The count is only requested once.
+        mock_session.get.assert_called_once_with(f"{input_url}&returnCountOnly=true")
+        mock_get_arcgis_feature_pages.assert_called_once_with(
+            "1234", input_url, 20, 10, page_concurrency=4, session=mock_session, task_points=100, out_sr=None
+        )
+
+        result = download_arcgis_feature_data(
+            "1234",
+            input_url,
+            "out.json",
+            session=mock_session,
+            service_description=service_description,
+            feature_format="geojsonseq",
+        )
+        self.assertEqual("GeoJSONSeq:out.json", result)
+        self.assertEqual(4326, mock_get_arcgis_feature_pages.call_args.kwargs["out_sr"])
+
+    @patch("eventkit_cloud.tasks.helpers.update_progress")
+    @patch("eventkit_cloud.tasks.helpers.cache")
+    def test_progress_accumulator(self, mock_cache, mock_update_progress):
+        task_uid = "1234"
+        mock_cache.incr.side_effect = [30, 60]
+        progress_accumulator = ProgressAccumulator(
+            task_uid, task_points=200, start_percent=10, interval=0, min_points=5
+        )
+
+        # Points below the threshold are kept in process.
+        progress_accumulator.add(2.5)
+        mock_cache.incr.assert_not_called()
+
+        # Whole points are flushed once the threshold is reached and the remainder is kept.
+        progress_accumulator.add(27.75)
+        mock_cache.incr.assert_called_once_with(f"{task_uid}_progress", 30)
+        mock_update_progress.assert_called_once_with(task_uid, 15.0, subtask_percentage=0.5, subtask_start=10)
+        self.assertEqual(0.25, progress_accumulator.pending_points)
+
+        # Nothing is flushed within the interval.
+        progress_accumulator.interval = 3600
+        progress_accumulator.add(29.75)
+        self.assertEqual(1, mock_cache.incr.call_count)
+        progress_accumulator.flush()
+        mock_cache.incr.assert_called_with(f"{task_uid}_progress", 30)
+
+    @override_settings(PROGRESS_UPDATE_INTERVAL=0, PROGRESS_UPDATE_PERCENT=5)
+    @patch("eventkit_cloud.tasks.helpers.set_cache_value")
+    @patch("django.db.connection.close")
+    @patch("audit_logging.file_logging.logging_open")
+    @patch("eventkit_cloud.tasks.helpers.cache")
+    def test_download_data_cache_writes(self, mock_cache, mock_logging_open, mock_close, mock_set_cache_value):
+        one_gb = 1024**3
+        chunk_size = 1024 * 1024 * 2
+        mock_cache.get_or_set.return_value = 0
+        mock_cache.incr.side_effect = lambda key, points: points
+        mock_session = Mock()
+        mock_session.get.return_value.headers = {"content-length": str(one_gb), "content-type": "application/json"}
+        mock_session.get.return_value.iter_content.return_value = (
+            b"0" * chunk_size for _ in range(one_gb // chunk_size)
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_file = os.path.join(tmp_dir, "out.json")
+            mock_logging_open.side_effect = lambda *args, **kwargs: open(os.devnull, "wb")
+            with patch("eventkit_cloud.tasks.helpers.os.path.isfile", return_value=True):
+                download_data("1234", "http://example.test", out_file, session=mock_session)
+
+        cache_writes = (
+            mock_cache.get_or_set.call_count
+            + mock_cache.set.call_count
+            + mock_cache.incr.call_count
+            + mock_set_cache_value.call_count
+        )
+        # Each flush is an incr and a progress update, plus the initial get_or_set of the progress points.
+        max_cache_writes_per_gb = 2 * 100 / 5 + 1
+        self.assertLessEqual(cache_writes, max_cache_writes_per_gb)
+        self.assertEqual(100, sum(points for (_, points), _ in mock_cache.incr.call_args_list))
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import copy
 import logging
+import os
+import threading
 import uuid
 from collections import OrderedDict
-from unittest.mock import Mock, call, patch
+from unittest.mock import ANY, Mock, call, patch
 
 from django.conf import settings
 from django.contrib.auth.models import Group, User
@@ -349,30 +351,57 @@ class TestScaleCeleryTask(TestCase):
         self.assertEquals(expected_value, returned_value)
 
 
+@patch.dict(os.environ, {"PROVIDER_CHECK_JITTER": "0"})
 class TestCheckProviderAvailabilityTask(TestCase):
-    def test_check_provider_availability(self):
-        perform_provider_check_mock = Mock()
-
-        perform_provider_check_mock.return_value = CheckResult.SUCCESS.value
-        DataProvider.check_status = perform_provider_check_mock
+    def setUp(self):
         data_provider_type = DataProviderType.objects.create(type_name="test")
-        first_provider = DataProvider.objects.create(
+        self.first_provider = DataProvider.objects.create(
             slug="first_provider", name="first_provider", export_provider_type=data_provider_type
         )
-        DataProvider.objects.create(
+        self.second_provider = DataProvider.objects.create(
             slug="second_provider", name="second_provider", export_provider_type=data_provider_type
         )
-        DataProviderStatus.objects.create(related_provider=first_provider)
+
+    @patch.object(DataProvider, "check_status")
+    def test_check_provider_availability(self, perform_provider_check_mock):
+        perform_provider_check_mock.return_value = CheckResult.SUCCESS.value
+        DataProviderStatus.objects.create(related_provider=self.first_provider)
 
         check_provider_availability_task()
 
-        perform_provider_check_mock.assert_has_calls([call(), call()])
-        statuses = DataProviderStatus.objects.filter(related_provider=first_provider)
+        perform_provider_check_mock.assert_has_calls([call(session=ANY), call(session=ANY)])
+        # Each check gets its own session.
+        sessions = [check_call.kwargs["session"] for check_call in perform_provider_check_mock.call_args_list]
+        self.assertIsNot(sessions[0], sessions[1])
+        statuses = DataProviderStatus.objects.filter(related_provider=self.first_provider)
         self.assertEqual(len(statuses), 2)
-        most_recent_first_provider_status = statuses.last()
+        most_recent_first_provider_status = statuses.order_by("created_at").last()
         self.assertEqual(most_recent_first_provider_status.status, CheckResult.SUCCESS.value["status"])
         self.assertEqual(most_recent_first_provider_status.status_type, CheckResult.SUCCESS.value["type"])
         self.assertEqual(most_recent_first_provider_status.message, CheckResult.SUCCESS.value["message"])
+        self.assertIsNotNone(most_recent_first_provider_status.check_duration)
+
+    @patch.dict(os.environ, {"PROVIDER_CHECK_TIMEOUT": "0.1"})
+    @patch.object(DataProvider, "check_status", autospec=True)
+    def test_check_provider_availability_timeout(self, perform_provider_check_mock):
+        release_check = threading.Event()
+        self.addCleanup(release_check.set)
+
+        def check_status(provider, session=None):
+            if provider.slug == self.first_provider.slug:
+                release_check.wait(10)
+            return CheckResult.SUCCESS.value
+
+        perform_provider_check_mock.side_effect = check_status
+
+        check_provider_availability_task()
+
+        # The slow provider doesn't hold up the other one.
+        first_status = DataProviderStatus.objects.get(related_provider=self.first_provider)
+        self.assertEqual(first_status.status_type, CheckResult.TIMEOUT.value["type"])
+        self.assertGreaterEqual(first_status.check_duration, 0.1)
+        second_status = DataProviderStatus.objects.get(related_provider=self.second_provider)
+        self.assertEqual(second_status.status_type, CheckResult.SUCCESS.value["type"])
 
 
 class TestEmailNotifications(TestCase):
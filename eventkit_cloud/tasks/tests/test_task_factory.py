@@ -93,6 +93,8 @@ class TestExportTaskFactory(TestCase):
         task_factory_chain.assert_called()
         finalize_task.s.assert_called()
         self.assertEqual(2, create_task.call_count)
+        # The run waits for both providers to finish.
+        self.assertEqual(2, ExportRun.objects.get(uid=run_uid).pending_provider_count)
 
         # Test that run is prevented and deleted if the user has not agreed to the licenses.
         mock_invalid_licenses.return_value = ["invalid-licenses"]
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import io
+import struct
+import zipfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, User
+from django.contrib.gis.geos import GEOSGeometry, Polygon
+from django.db.models.fields.files import FieldFile
+from django.test import TestCase
+
+from eventkit_cloud.jobs.models import DataProvider, Job
+from eventkit_cloud.tasks.enumerations import TaskState
+from eventkit_cloud.tasks.models import (
+    DataProviderTaskRecord,
+    ExportRun,
+    ExportTaskRecord,
+    FileProducingTaskResult,
+    RunZipFile,
+    UserDownload,
+)
+
+
+class TestDownloadZip(TestCase):
+    fixtures = ("osm_provider.json",)
+
+    def setUp(self):
+        Group.objects.get_or_create(name="DefaultExportExtentGroup")
+        self.user = User.objects.create_user(username="demo", email="demo@demo.com", password="demo")
+        self.other_user = User.objects.create_user(username="other", email="other@demo.com", password="other")
+        the_geom = GEOSGeometry(Polygon.from_bbox((-10, -10, 10, 10)), srid=4326)
+        self.job = Job.objects.create(
+            name="Test Job", description="Test description", user=self.user, the_geom=the_geom
+        )
+        self.run = ExportRun.objects.create(job=self.job, user=self.user)
+        self.provider = DataProvider.objects.get(slug="osm")
+        self.data_provider_task_record = DataProviderTaskRecord.objects.create(
+            run=self.run, name="OSM", slug="osm", provider=self.provider, status=TaskState.COMPLETED.value
+        )
+        # The files of the run, as they are in storage.
+        self.files = {
+            f"{self.run.uid}/osm/data.gpkg": b"gpkg" * 10000,
+            f"{self.run.uid}/osm/data.kml": b"<kml/>" * 1000,
+        }
+        self.downloadables = [
+            self.create_downloadable(self.data_provider_task_record, file_name) for file_name in self.files
+        ]
+        self.client.login(username="demo", password="demo")
+
+        def open_storage_file(field_file):
+            return io.BytesIO(self.files[field_file.name])
+
+        patcher = patch("eventkit_cloud.tasks.views.open_storage_file", side_effect=open_storage_file)
+        self.mock_open_storage_file = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(FieldFile, "size", property(lambda field_file: len(self.files[field_file.name])))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_downloadable(self, data_provider_task_record, file_name, status=TaskState.SUCCESS.value):
+        downloadable = FileProducingTaskResult(file=file_name)
+        downloadable.save(write_file=False)
+        ExportTaskRecord.objects.create(
+            export_provider_task=data_provider_task_record, name="Test Task", status=status, result=downloadable
+        )
+        return downloadable
+
+    def get_archive(self, response) -> bytes:
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/zip", response["Content-Type"])
+        self.assertEqual('attachment; filename="test_job.zip"', response["Content-Disposition"])
+        return b"".join(response.streaming_content)
+
+    def test_download_zip(self):
+        response = self.client.get("/download/zip", {"run_uid": str(self.run.uid)})
+        archive = self.get_archive(response)
+
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(["data/osm/data.gpkg", "data/osm/data.kml"], sorted(zip_file.namelist()))
+            for file_name, data in self.files.items():
+                arcname = f"data/osm/{file_name.split('/')[-1]}"
+                self.assertEqual(data, zip_file.read(arcname))
+                # The size of each file is known, so no member needs the ZIP64 extra field in its local header.
+                header_offset = zip_file.getinfo(arcname).header_offset
+                self.assertEqual(0, struct.unpack("<H", archive[header_offset + 28 : header_offset + 30])[0])
+        self.assertEqual(len(self.files), self.mock_open_storage_file.call_count)
+        for downloadable in self.downloadables:
+            self.assertEqual(1, UserDownload.objects.filter(user=self.user, downloadable=downloadable).count())
+
+    def test_download_zip_selected_records(self):
+        run_zip_file = RunZipFile.objects.create(run=self.run)
+        run_zip_file.data_provider_task_records.set([self.data_provider_task_record])
+
+        response = self.client.get("/download/zip", {"uid": str(run_zip_file.uid), "compression": "stored"})
+        archive = self.get_archive(response)
+
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(
+                [zipfile.ZIP_STORED, zipfile.ZIP_STORED], [info.compress_type for info in zip_file.infolist()]
+            )
+
+        response = self.client.get(
+            "/download/zip",
+            {"run_uid": str(self.run.uid), "data_provider_task_record_uids": str(self.data_provider_task_record.uid)},
+        )
+        with zipfile.ZipFile(io.BytesIO(self.get_archive(response))) as zip_file:
+            self.assertEqual(2, len(zip_file.namelist()))
+
+    def test_download_zip_bad_request(self):
+        # Neither a uid nor a run_uid.
+        response = self.client.get("/download/zip")
+        self.assertEqual(400, response.status_code)
+
+        # An invalid uid, or one which doesn't exist.
+        self.assertEqual(400, self.client.get("/download/zip", {"uid": "not-a-uid"}).status_code)
+        self.assertEqual(400, self.client.get("/download/zip", {"run_uid": str(self.job.uid)}).status_code)
+
+        # Records from different runs.
+        other_run = ExportRun.objects.create(job=self.job, user=self.user)
+        other_data_provider_task_record = DataProviderTaskRecord.objects.create(
+            run=other_run, name="OSM", slug="osm", provider=self.provider, status=TaskState.COMPLETED.value
+        )
+        run_zip_file = RunZipFile.objects.create(run=self.run)
+        run_zip_file.data_provider_task_records.set([self.data_provider_task_record, other_data_provider_task_record])
+        response = self.client.get("/download/zip", {"uid": str(run_zip_file.uid)})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(b"Cannot zip files from different datapacks.", response.content)
+
+        # Nothing to download, the only file of the run failed.
+        self.create_downloadable(
+            other_data_provider_task_record, f"{other_run.uid}/osm/data.gpkg", status=TaskState.FAILED.value
+        )
+        response = self.client.get("/download/zip", {"run_uid": str(other_run.uid)})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(b"There are no files to download for the requested id value.", response.content)
+
+        self.mock_open_storage_file.assert_not_called()
+        self.assertFalse(UserDownload.objects.exists())
+
+    def test_download_zip_unauthorized(self):
+        self.client.login(username="other", password="other")
+
+        response = self.client.get("/download/zip", {"run_uid": str(self.run.uid)})
+
+        self.assertEqual(401, response.status_code)
+        self.mock_open_storage_file.assert_not_called()
+        self.assertFalse(UserDownload.objects.exists())
@@ -5,11 +5,12 @@ from django.contrib.auth.decorators import login_required
 from django.urls import re_path
 from django.views.decorators.cache import never_cache
 
-from eventkit_cloud.tasks.views import download
+from eventkit_cloud.tasks.views import download, download_zip
 
 urlpatterns = []
 
 
 urlpatterns += [
+    re_path(r"^download/zip", never_cache(login_required(download_zip))),
     re_path(r"^download", never_cache(login_required(download))),
 ]
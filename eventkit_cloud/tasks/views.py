@@ -1,15 +1,28 @@
 # -*- coding: utf-8 -*-
 import json
+from functools import partial
 from logging import getLogger
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED
 
-from django.http import HttpResponse
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 
 from eventkit_cloud.auth.views import requires_oauth_authentication
 from eventkit_cloud.tasks.enumerations import TaskState
-from eventkit_cloud.tasks.models import ExportRun, FileProducingTaskResult, RunZipFile, UserDownload
+from eventkit_cloud.tasks.export_tasks import BLACKLISTED_ZIP_EXTS, create_zip_task
+from eventkit_cloud.tasks.helpers import normalize_name
+from eventkit_cloud.tasks.models import (
+    DataProviderTaskRecord,
+    ExportRun,
+    FileProducingTaskResult,
+    RunZipFile,
+    UserDownload,
+)
 from eventkit_cloud.tasks.task_factory import get_zip_task_chain
-from eventkit_cloud.utils.s3 import download_folder_from_s3
+from eventkit_cloud.utils.s3 import download_folder_from_s3, open_storage_file
+from eventkit_cloud.utils.zip_archive import StreamMember, stream_zip
 
 logger = getLogger(__name__)
 
@@ -46,6 +59,99 @@ def download(request):
     return redirect(downloadable.file.url)
 
 
+@requires_oauth_authentication
+def download_zip(request):
+    """
+    Streams a zip archive of the files of a run, which is built as it is downloaded instead of being created by
+    create_zip_task first. The files are selected with the uid of a RunZipFile, or with a run_uid and optionally a
+    comma separated list of data_provider_task_record_uids. Members are deflated unless compression=stored is passed.
+    :return: A streaming response with the zip archive.
+    """
+
+    current_user = request.user
+
+    if current_user is None:
+        return HttpResponse(status=401)
+
+    data_provider_task_records = DataProviderTaskRecord.objects.exclude(slug="run").select_related(
+        "preview", "run__job"
+    )
+    zip_uid = request.GET.get("uid")
+    run_uid = request.GET.get("run_uid")
+    data_provider_task_record_uids = request.GET.get("data_provider_task_record_uids")
+    try:
+        if zip_uid:
+            data_provider_task_records = data_provider_task_records.filter(runzipfile__uid=zip_uid)
+        elif run_uid:
+            data_provider_task_records = data_provider_task_records.filter(run__uid=run_uid)
+            if data_provider_task_record_uids:
+                data_provider_task_records = data_provider_task_records.filter(
+                    uid__in=data_provider_task_record_uids.split(",")
+                )
+        else:
+            return HttpResponse(status=400, content="A uid or run_uid is required.")
+        data_provider_task_records = list(data_provider_task_records)
+    except ValidationError:
+        return HttpResponse(status=400, content="Download not found for requested id value.")
+
+    runs = {data_provider_task_record.run for data_provider_task_record in data_provider_task_records}
+    if not runs:
+        return HttpResponse(status=400, content="Download not found for requested id value.")
+    if len(runs) > 1:
+        return HttpResponse(status=400, content="Cannot zip files from different datapacks.")
+    run = runs.pop()
+
+    downloadables = (
+        FileProducingTaskResult.objects.select_related(
+            "export_task__export_provider_task__provider", "export_task__export_provider_task__run"
+        )
+        .filter(
+            export_task__export_provider_task__in=data_provider_task_records,
+            export_task__status=TaskState.SUCCESS.value,
+            deleted=False,
+        )
+        .exclude(export_task__name=create_zip_task.name)
+    )
+    downloadables = [
+        downloadable for downloadable in downloadables if Path(downloadable.filename).suffix not in BLACKLISTED_ZIP_EXTS
+    ]
+    if not downloadables:
+        return HttpResponse(status=400, content="There are no files to download for the requested id value.")
+
+    for downloadable in downloadables:
+        if not downloadable.user_can_download(current_user):
+            return HttpResponse(
+                status=401, content=f"The user: {current_user.username} does not have permission to download it."
+            )
+
+    UserDownload.objects.bulk_create(
+        [UserDownload(user=current_user, downloadable=downloadable) for downloadable in downloadables]
+    )
+
+    file_models = [
+        data_provider_task_record.preview
+        for data_provider_task_record in data_provider_task_records
+        if data_provider_task_record.preview
+    ]
+    file_models += downloadables
+    # The files are read from storage one chunk at a time as the archive is sent, each member is only created (and its
+    # size requested from storage) once the archive reaches it.
+    members = (
+        StreamMember(
+            arcname=file_model.get_file_path(archive=True),
+            open=partial(open_storage_file, file_model.file),
+            size=file_model.file.size,
+        )
+        for file_model in file_models
+    )
+    compression = ZIP_STORED if request.GET.get("compression") == "stored" else ZIP_DEFLATED
+
+    logger.info(f"Streaming {len(file_models)} files from run {run.uid} to {current_user.username}.")
+    response = StreamingHttpResponse(stream_zip(members, compression=compression), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{normalize_name(run.job.name)}.zip"'
+    return response
+
+
 def generate_zipfile(data_provider_task_record_uids, run_zip_file):
 
     # Check to make sure the UIDs are all from the same ExportRun.
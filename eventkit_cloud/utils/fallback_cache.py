@@ -1,74 +1,197 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import BaseCache
 
+# Only errors reaching the primary cache open the circuit. Errors for a single operation, e.g. a value which is too
+# large for memcached, are raised like any other cache would raise them.
+try:
+    from pymemcache.exceptions import MemcacheUnexpectedCloseError
+
+    CACHE_ERRORS: tuple = (OSError, MemcacheUnexpectedCloseError)
+except ImportError:
+    CACHE_ERRORS = (OSError,)
+
+logger = logging.getLogger(__name__)
+
 
 class FallbackCache(BaseCache):
     def __init__(self, config, params):  # NOQA BaseCache uses params but others use both.
         super().__init__(params)
 
     def add(self, *args, **kwargs):
-        return get_cache().add(*args, **kwargs)
+        return call_cache("add", *args, **kwargs)
 
     def clear(self):
-        return get_cache().clear()
+        return call_cache("clear")
 
     def close(self, *args, **kwargs):
-        return get_cache().close(*args, **kwargs)
+        return call_cache("close", *args, **kwargs)
 
     def decr(self, *args, **kwargs):
-        return get_cache().decr(*args, **kwargs)
+        return call_cache("decr", *args, **kwargs)
 
     def decr_version(self, *args, **kwargs):
-        return get_cache().decr_version(*args, **kwargs)
+        return call_cache("decr_version", *args, **kwargs)
 
     def delete(self, *args, **kwargs):
-        return get_cache().delete(*args, **kwargs)
+        return call_cache("delete", *args, **kwargs)
 
     def delete_many(self, *args, **kwargs):
-        return get_cache().delete_many(*args, **kwargs)
+        return call_cache("delete_many", *args, **kwargs)
 
     def get(self, *args, **kwargs):
-        return get_cache().get(*args, **kwargs)
+        return call_cache("get", *args, **kwargs)
 
     def get_backend_timeout(self, *args, **kwargs):
         return get_cache().get_backend_timeout(*args, **kwargs)
 
     def get_many(self, *args, **kwargs):
-        return get_cache().get_many(*args, **kwargs)
+        return call_cache("get_many", *args, **kwargs)
 
     def get_or_set(self, *args, **kwargs):
-        return get_cache().get_or_set(*args, **kwargs)
+        return call_cache("get_or_set", *args, **kwargs)
 
     def has_key(self, *args, **kwargs):
-        return get_cache().has_key(*args, **kwargs)  # NOQA has_key deprecation warning doesn't apply here.
+        return call_cache("has_key", *args, **kwargs)  # NOQA has_key deprecation warning doesn't apply here.
 
     def incr(self, *args, **kwargs):
-        return get_cache().incr(*args, **kwargs)
+        return call_cache("incr", *args, **kwargs)
 
     def incr_version(self, *args, **kwargs):
-        return get_cache().incr_version(*args, **kwargs)
+        return call_cache("incr_version", *args, **kwargs)
 
     def make_key(self, *args, **kwargs):
         return get_cache().make_key(*args, **kwargs)
 
     def set(self, *args, **kwargs):
-        return get_cache().set(*args, **kwargs)
+        return call_cache("set", *args, **kwargs)
 
     def set_many(self, *args, **kwargs):
-        return get_cache().set_many(*args, **kwargs)
+        return call_cache("set_many", *args, **kwargs)
 
     def touch(self, *args, **kwargs):
-        return get_cache().touch(*args, **kwargs)
+        return call_cache("touch", *args, **kwargs)
 
     def validate_key(self, *args, **kwargs):
         return get_cache().validate_key(*args, **kwargs)
 
 
+class CacheHealth(object):
+    """
+    A circuit breaker for the primary cache, shared by the threads of the process.
+
+    While the primary cache is healthy it is only probed again after FALLBACK_CACHE_HEALTH_TTL seconds, so cache
+    operations don't pay for an extra round trip. Once it fails, operations go straight to the fallback cache and the
+    primary cache is probed again after a backoff, starting at FALLBACK_CACHE_RETRY_INTERVAL seconds and doubling up to
+    FALLBACK_CACHE_MAX_RETRY_INTERVAL seconds while it keeps failing.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Counter = Counter()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.healthy = False
+            self.checked_at = None
+            self.retry_at = None
+            self.failures = 0
+            self.metrics.clear()
+
+    def get_state(self, now: float) -> str:
+        """
+        :return: "healthy" to use the primary cache, "open" to use the fallback cache, or "probe" if the primary cache
+        should be checked first.
+        """
+        with self.lock:
+            if self.healthy and now - self.checked_at < getattr(settings, "FALLBACK_CACHE_HEALTH_TTL", 10):
+                return "healthy"
+            if not self.healthy and self.retry_at is not None and now < self.retry_at:
+                return "open"
+            return "probe"
+
+    def record_success(self, now: float):
+        with self.lock:
+            if not self.healthy and self.failures:
+                logger.info(f"The primary cache is available again after {self.failures} failed checks.")
+            self.healthy = True
+            self.checked_at = now
+            self.retry_at = None
+            self.failures = 0
+
+    def record_failure(self, now: float):
+        with self.lock:
+            if self.healthy or not self.failures:
+                logger.warning("The primary cache is not available, using the fallback cache.")
+            self.healthy = False
+            self.failures += 1
+            self.metrics["primary_failures"] += 1
+            retry_interval = getattr(settings, "FALLBACK_CACHE_RETRY_INTERVAL", 5) * 2 ** (self.failures - 1)
+            self.retry_at = now + min(retry_interval, getattr(settings, "FALLBACK_CACHE_MAX_RETRY_INTERVAL", 300))
+
+    def count(self, metric: str):
+        with self.lock:
+            self.metrics[metric] += 1
+
+
+cache_health = CacheHealth()
+
+
+def get_cache_metrics() -> Dict[str, int]:
+    """
+    :return: The number of operations sent to each cache, probes of the primary cache and primary cache failures since
+    the process started.
+    """
+    with cache_health.lock:
+        return dict(cache_health.metrics)
+
+
+def probe_primary_cache() -> bool:
+    try:
+        caches["primary_cache"].set("primary_cache", True)
+        return bool(caches["primary_cache"].get("primary_cache"))
+    except CACHE_ERRORS as e:
+        logger.debug(f"Failed to reach the primary cache: {e}")
+        return False
+
+
 def get_cache():
-    if caches["primary_cache"].get("primary_cache"):
-        return caches["primary_cache"]
-    caches["primary_cache"].set("primary_cache", True)
-    if caches["primary_cache"].get("primary_cache"):
+    now = time.monotonic()
+    state = cache_health.get_state(now)
+    if state == "probe":
+        cache_health.count("primary_probes")
+        if probe_primary_cache():
+            cache_health.record_success(now)
+            state = "healthy"
+        else:
+            cache_health.record_failure(now)
+            state = "open"
+
+    if state == "healthy":
+        cache_health.count("primary_operations")
         return caches["primary_cache"]
-
+    cache_health.count("fallback_operations")
     return caches["fallback_cache"]
+
+
+def call_cache(method: str, *args, **kwargs):
+    """
+    Calls the method on the primary cache if it is healthy, otherwise on the fallback cache. If the primary cache fails
+    during the call, the circuit is opened and the call is made again on the fallback cache.
+    """
+    cache = get_cache()
+    try:
+        return getattr(cache, method)(*args, **kwargs)
+    except CACHE_ERRORS:
+        if cache is caches["fallback_cache"]:
+            raise
+        cache_health.record_failure(time.monotonic())
+        cache_health.count("fallback_operations")
+        return getattr(caches["fallback_cache"], method)(*args, **kwargs)
@@ -3,7 +3,7 @@ import logging
 import requests
 from django.conf import settings
 
-from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse
+from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse, get_cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,9 @@ class CoordinateConverter(GeocodeAuthResponse):
         return self.get_data(query)
 
     def get_data(self, query):
+        return get_cached_search(self.url, query, self.convert)
+
+    def convert(self, query):
         payload = {"from": "mgrs", "to": "decdeg", "q": str(query)}
         try:
             return self.get_response(payload).json()
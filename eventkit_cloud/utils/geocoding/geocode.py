@@ -6,7 +6,7 @@ from gdal_utils import bbox2polygon, expand_bbox, is_valid_bbox
 
 from eventkit_cloud.core.helpers import get_or_update_session
 from eventkit_cloud.utils.geocoding.geocode_auth import get_geocode_cert_info
-from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse
+from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse, get_cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -329,4 +329,4 @@ class Geocode(object):
         return self.geocoder.add_bbox(self.update_url, data)
 
     def search(self, query):
-        return self.geocoder.get_data(query)
+        return get_cached_search(self.geocoder.url, query, self.geocoder.get_data)
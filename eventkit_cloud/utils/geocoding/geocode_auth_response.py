@@ -1,5 +1,15 @@
+import hashlib
+import json
 import logging
 import os
+import threading
+import time
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
 
 from eventkit_cloud.core.helpers import get_or_update_session
 from eventkit_cloud.utils.geocoding.geocode_auth import (
@@ -11,6 +21,9 @@ from eventkit_cloud.utils.geocoding.geocode_auth import (
 
 logger = logging.getLogger(__name__)
 
+# Sessions aren't threadsafe, so each thread keeps its own pool of geocoding sessions.
+geocoding_sessions = threading.local()
+
 
 class GeocodeAuthResponse(object):
     def __int__(self):
@@ -29,7 +42,7 @@ class GeocodeAuthResponse(object):
             else:
                 raise Exception(error_message)
         else:
-            session = get_or_update_session()
+            session = get_geocoding_session(self.url)
             response = session.get(self.url, params=payload)
             if not response.ok:
                 raise Exception(error_message)
@@ -39,14 +52,14 @@ class GeocodeAuthResponse(object):
 def get_cached_response(url, payload):
     cookies = get_session_cookies()
     headers = get_auth_headers()
-    session = get_or_update_session(headers=headers)
+    session = get_geocoding_session(url, headers=headers)
     response = session.get(url, params=payload, cookies=cookies)
     if response.ok and check_data(response):
         return response
 
 
 def get_auth_response(url, payload):
-    session = get_or_update_session(cert_info=get_geocode_cert_info())
+    session = get_geocoding_session(url, cert_info=get_geocode_cert_info())
     response = session.get(url, params=payload)
     if response.ok and check_data(response):
         update_session_cookies(session.cookies)
@@ -64,3 +77,74 @@ def check_data(response):
         logger.warning("Invalid response.")
         logger.debug(response.content)
     return False
+
+
+def get_geocoding_session(url: str, **session_info) -> requests.Session:
+    """
+    Returns a session for the geocoder at url, which is kept for GEOCODING_SESSION_TIMEOUT seconds so that searches
+    reuse its connections instead of opening new ones.
+    :param url: The url of the geocoder, sessions are shared by the urls of the same host.
+    :param session_info: kwargs to be passed to get_or_update_session, a session is kept for each set of them.
+    :return: A session for the current thread.
+    """
+    timeout = getattr(settings, "GEOCODING_SESSION_TIMEOUT", 300)
+    if not timeout:
+        return get_or_update_session(**session_info)
+
+    parsed_url = urlparse(url)
+    key = (f"{parsed_url.scheme}://{parsed_url.netloc}", json.dumps(session_info, sort_keys=True, default=str))
+    now = time.monotonic()
+    sessions = getattr(geocoding_sessions, "sessions", None)
+    if sessions is None:
+        sessions = geocoding_sessions.sessions = {}
+    session, created_at = sessions.get(key, (None, now))
+    if session and now - created_at < timeout:
+        return session
+
+    # Drop the expired sessions, e.g. the ones using an old auth token.
+    for expired_key, (expired_session, expired_at) in list(sessions.items()):
+        if now - expired_at >= timeout:
+            expired_session.close()
+            del sessions[expired_key]
+    session = get_or_update_session(**session_info)
+    sessions[key] = (session, now)
+    return session
+
+
+def get_geocode_cache_key(url: str, query: Any) -> str:
+    """
+    Normalizes a query so that searches which only differ by case or whitespace share a cache key.
+    :param url: The url of the geocoder.
+    :param query: A search string, or a dict of search parameters.
+    :return: The cache key.
+    """
+    if isinstance(query, dict):
+        normalized_query = json.dumps(
+            {key: " ".join(str(value).split()) for key, value in query.items()}, sort_keys=True
+        )
+    else:
+        normalized_query = " ".join(str(query).split())
+    query_hash = hashlib.md5(f"{url}-{normalized_query.lower()}".encode()).hexdigest()
+    return f"geocode-{query_hash}"
+
+
+def get_cached_search(url: str, query: Any, search: Callable[[Any], Any]) -> Any:
+    """
+    Returns the result of a search, which is cached for GEOCODING_CACHE_TIMEOUT seconds so that repeated searches
+    (e.g. from many users typing the same place) don't all reach the geocoder. Empty results aren't cached.
+    :param url: The url of the geocoder.
+    :param query: A search string, or a dict of search parameters.
+    :param search: A function taking the query and returning the result from the geocoder.
+    :return: The result of the search.
+    """
+    timeout = getattr(settings, "GEOCODING_CACHE_TIMEOUT", 86400)
+    if not timeout:
+        return search(query)
+
+    cache_key = get_geocode_cache_key(url, query)
+    result = cache.get(cache_key)
+    if result is None:
+        result = search(query)
+        if result:
+            cache.set(cache_key, result, timeout)
+    return result
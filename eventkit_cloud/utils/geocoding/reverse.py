@@ -4,7 +4,7 @@ from abc import ABCMeta, abstractmethod
 import requests
 from django.conf import settings
 
-from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse
+from eventkit_cloud.utils.geocoding.geocode_auth_response import GeocodeAuthResponse, get_cached_search
 
 logger = logging.getLogger(__name__)
 
@@ -293,7 +293,7 @@ class ReverseGeocode(object):
         return self.geocoder.add_bbox(self.update_url, data)
 
     def search(self, query):
-        return self.geocoder.get_data(query)
+        return get_cached_search(self.geocoder.url, query, self.geocoder.get_data)
 
 
 # TODO: This is redundant code to what is in geocode.py additionally these functions
@@ -567,6 +567,33 @@ def get_tile_table_names(gpkg):
         return [table for (table,) in result]
 
 
+def merge_tile_tables(gpkg, source_gpkg):
+    """
+    Copies the tiles of the source geopackage into the tile tables of the same name in the geopackage, this is used to
+    combine geopackages which were seeded at the same time for the same cache.
+
+    :param gpkg: Path to geopackage file, which must have the tile tables of the source geopackage.
+    :param source_gpkg: Path to geopackage file to copy the tiles from.
+    :return: None
+    """
+    tables = get_tile_table_names(source_gpkg)
+    with sqlite3.connect(gpkg) as conn:
+        conn.execute("ATTACH DATABASE ? AS source;", (source_gpkg,))
+        for table in tables:
+            if not is_alnum(table):
+                raise Exception("Unable to merge the table {0} from {1}".format(table, source_gpkg))
+            conn.execute(
+                'INSERT OR REPLACE INTO "{0}" (zoom_level, tile_column, tile_row, tile_data) '
+                'SELECT zoom_level, tile_column, tile_row, tile_data FROM source."{0}";'.format(table)
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO gpkg_tile_matrix SELECT * FROM source.gpkg_tile_matrix WHERE table_name = ?;",
+                (table,),
+            )
+        conn.commit()
+        conn.execute("DETACH DATABASE source;")
+
+
 def get_table_gpkg_contents_information(gpkg, table_name):
     """
 
@@ -1,10 +1,13 @@
 import copy
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
 from typing import Union
 from urllib.parse import urlparse
 
 from django.conf import settings
+from django.core.cache import cache
 from PIL import Image
 from requests import Response
 from webtest.response import TestResponse
@@ -17,17 +20,19 @@ logger = logging.getLogger(__name__)
 WGS84_FULL_WORLD = [-180, -90, 180, 90]
 
 
-def get_wmts_snapshot_image(base_url: str, zoom_level: int = None, bbox: list = None):
+def get_wmts_snapshot_image(base_url: str, zoom_level: int = None, bbox: list = None, concurrency: int = None):
     """
     Returns an image comprised of all tiles touched by bbox at a given zoom_level for the provided provider URL.
 
     The higher zoom_level is and the bigger the area encompossed by bbox, the longer this takes. At high zooms this
     can be prohibitively expensive, even if optimized. This function should be used to generate small images of
     small regions or high level (low zoom) snapshots of a map. Full world, zoom level 0 is used to generate Thumbnails.
+    Snapshots are cached for SNAPSHOT_CACHE_TIMEOUT seconds.
 
     :param base_url: URL that tiles are to be requested from, must be formatted with {x], {y}, and {z}
     :param zoom_level: level to look for tiles at, will be determined automatically based on extent if one isn't passed.
     :param bbox: region of the world to get tiles for
+    :param concurrency: The number of tiles to request at once, defaults to SNAPSHOT_TILE_CONCURRENCY.
     :return: A Pillow Image object built for the collected tiles.
     """
 
@@ -41,46 +46,84 @@ def get_wmts_snapshot_image(base_url: str, zoom_level: int = None, bbox: list =
         resolution = get_resolution_for_extent(bbox)
         zoom_level = mapproxy_grid.closest_level(resolution)
 
+    cache_key = get_snapshot_cache_key(base_url, zoom_level, bbox)
+    cached_snapshot = cache.get(cache_key)
+    if cached_snapshot:
+        return Image.open(BytesIO(cached_snapshot))
+
     tiles = mapproxy_grid.get_affected_level_tiles(bbox, zoom_level)
     dim_col, dim_row = tiles[1]
     # this will be a generator that returns all affected tile coords, scanning row by row (col increasing first)
     # convert to list for easy access
     tiles = [_tile_coords for _tile_coords in tiles[2]]
 
-    # Grab a tile and read it to get the size we will be working with.
-    # This is WMTS, all subsequent tiles will be the same size
+    tile_url = base_url
     if getattr(settings, "SITE_NAME") in base_url:
         # If the request is local, use a mapproxy app here instead of making a network request to the view.
         parsed_url = urlparse(base_url)  # base_url = https://test/map/slug/one/two?q1=1&q2=2
         split_path = parsed_url.path.lstrip("/").split("/")  # ['map','slug','one','two']
         slug = split_path[1]
         map_path = split_path[2:]
-        base_url = f"/{'/'.join(map_path)}?{parsed_url.query}"  # /one/two?q1=1&q2=2
+        tile_url = f"/{'/'.join(map_path)}?{parsed_url.query}"  # /one/two?q1=1&q2=2
         mapproxy_app = create_mapproxy_app(slug)
         requests = mapproxy_app
     else:
         # Ensure proper requests is loaded
         import requests  # type: ignore
-    response = requests.get(base_url.format(x=0, y=0, z=0))
-    tile = get_tile(response)
-    size_x, size_y = tile.size  # These should be the same
-
-    # Create the image we will paste all other tiles into.
-    snapshot = Image.new("RGB", (size_x * dim_col, size_y * dim_row))
-    tile_count = 0
-    for _row in range(dim_row):
-        for _col in range(dim_col):
-            # Capture the coords for this tile.
-            tile_coords = tiles[tile_count]
-            response = requests.get(base_url.format(x=tile_coords[0], y=tile_coords[1], z=zoom_level))
-            tile = get_tile(response)
-            # Paste this tile into the corresponding position relative to the overall image.
-            # Tiles will inserted one after the other, left to right, top to bottom.
+
+    def fetch_tile(tile_coords):
+        tile = get_tile(requests.get(tile_url.format(x=tile_coords[0], y=tile_coords[1], z=zoom_level)))
+        # Decode the tile in the worker so that only pasting is left for the caller.
+        tile.load()
+        return tile
+
+    concurrency = concurrency or getattr(settings, "SNAPSHOT_TILE_CONCURRENCY", 8)
+    snapshot = None
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(tiles)))) as executor:
+        # Tiles are listed left to right, top to bottom.
+        tile_futures = {
+            executor.submit(fetch_tile, tile_coords): divmod(tile_count, dim_col)
+            for tile_count, tile_coords in enumerate(tiles)
+        }
+        for tile_future in as_completed(tile_futures):
+            tile = tile_future.result()
+            if snapshot is None:
+                # This is WMTS, all of the tiles are the same size.
+                size_x, size_y = tile.size
+                snapshot = Image.new("RGB", (size_x * dim_col, size_y * dim_row))
+            # Paste each tile into its position relative to the overall image as soon as it arrives.
+            _row, _col = tile_futures[tile_future]
             snapshot.paste(im=tile, box=(size_x * _col, size_y * _row))
-            tile_count += 1
+
+    cache_snapshot(cache_key, snapshot)
     return snapshot
 
 
+def get_snapshot_cache_key(base_url: str, zoom_level: int, bbox: list) -> str:
+    """
+    :return: A key for the snapshot of a provider's tiles at the zoom level within the bbox.
+    """
+    snapshot_id = hashlib.md5(f"{base_url}-{zoom_level}-{list(map(float, bbox))}".encode()).hexdigest()
+    return f"snapshot-{snapshot_id}"
+
+
+def cache_snapshot(cache_key: str, snapshot: Image):
+    """
+    Keeps a PNG of the snapshot for SNAPSHOT_CACHE_TIMEOUT seconds, so that repeated thumbnails and previews of the
+    same area don't request the tiles again.
+    """
+    timeout = getattr(settings, "SNAPSHOT_CACHE_TIMEOUT", 3600)
+    if not timeout:
+        return
+    snapshot_file = BytesIO()
+    snapshot.save(snapshot_file, format="PNG")
+    try:
+        cache.set(cache_key, snapshot_file.getvalue(), timeout=timeout)
+    except Exception as e:
+        # Large snapshots may not fit in the cache, they are just requested again next time.
+        logger.warning(f"Could not cache the snapshot {cache_key}: {e}")
+
+
 def get_tile(response: Union[Response, TestResponse]) -> Image:
     """
     A wrapper to get content from requests response, or webop response.
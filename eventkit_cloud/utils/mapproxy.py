@@ -1,9 +1,14 @@
 import copy
+import hashlib
+import json
 import logging
 import multiprocessing
 import os
 import sqlite3
+import threading
 import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Process
 from multiprocessing.dummy import DummyProcess
 from typing import Any, Dict, Tuple, TypedDict, Union, cast
@@ -27,13 +32,15 @@ from eventkit_cloud.utils.geopackage import (
     get_table_tile_matrix_information,
     get_tile_table_names,
     get_zoom_levels_table,
+    merge_tile_tables,
     remove_empty_zoom_levels,
     set_gpkg_contents_bounds,
 )
 from eventkit_cloud.utils.stats.eta_estimator import ETA
 from mapproxy.config.config import load_config, load_default_config
 from mapproxy.config.loader import ConfigurationError, ProxyConfiguration, validate_references
-from mapproxy.grid import tile_grid
+from mapproxy.grid import GridError, tile_grid
+from mapproxy.srs import SRS
 from mapproxy.wsgiapp import MapProxyApp
 
 # Mapproxy uses processes by default, but we can run child processes in demonized process, so we use
@@ -57,6 +64,12 @@ client_logger.setLevel(settings.LOG_LEVEL if log_settings.get("requests", False)
 
 mapproxy_config_keys_index = "mapproxy-config-cache-keys"
 
+# The mapproxy apps built by this process, most recently used last.
+mapproxy_apps: "OrderedDict[Tuple[str, str], TestApp]" = OrderedDict()
+mapproxy_apps_lock = threading.Lock()
+
+SHARED_TILE_CACHE = "shared_tile_cache"
+
 DEFAULT_PROJECTION = 4326
 
 SeedLevel = TypedDict("SeedLevel", {"from": int, "to": int})
@@ -78,6 +91,7 @@ class SeedCoverage(TypedDict, total=False):
     datasource: str  # Filepath
     where: str  # SQL String
     srs: str  # EPSG
+    intersection: list["SeedCoverage"]
 
 
 class SeedConfiguration(TypedDict):
@@ -85,6 +99,19 @@ class SeedConfiguration(TypedDict):
     coverages: dict[str, SeedCoverage]
 
 
+class _SeedPartition(TypedDict):
+    levels: SeedLevel
+    weight: float  # The share of the tiles to seed in the partition.
+
+
+class SeedPartition(_SeedPartition, total=False):
+    bbox: list[float]  # Limits the partition to a strip of the coverage.
+    srs: str  # The projection of the bbox, which is the projection of the grid.
+
+
+PartitionProgress = namedtuple("PartitionProgress", ["progress", "progress_str"])
+
+
 def get_mapproxy_config_template(slug, user=None):
     if user:
         return f"mapproxy-config-{user}-{slug}"
@@ -104,6 +131,18 @@ class CustomLogger(ProgressLog):
         self.log_step_counter = self.log_step_step
         self.eta = ETA(task_uid=task_uid)
         self.interval = 1
+        self.partition_progress: Dict[int, float] = {}
+        self.partition_lock = threading.Lock()
+
+    def log_partition_step(self, partition, progress):
+        """
+        Logs the progress of the whole seed when one of the partitions seeded at the same time makes progress.
+        :param partition: The index of the partition.
+        :param progress: The progress of the partition weighted by its share of the tiles.
+        """
+        with self.partition_lock:
+            self.partition_progress[partition] = progress
+            self.log_step(PartitionProgress(sum(self.partition_progress.values()), f"partition {partition}"))
 
     def log_step(self, progress):
         from eventkit_cloud.tasks.helpers import update_progress
@@ -138,6 +177,21 @@ class CustomLogger(ProgressLog):
             self._laststep = time.time()
 
 
+class PartitionLogger(ProgressLog):
+    """
+    Reports the progress of a seed partition to the logger of the whole seed.
+    """
+
+    def __init__(self, parent_logger: CustomLogger, partition: int, weight: float, *args, **kwargs):
+        super(PartitionLogger, self).__init__(*args, **kwargs)
+        self.parent_logger = parent_logger
+        self.partition = partition
+        self.weight = weight
+
+    def log_step(self, progress):
+        self.parent_logger.log_partition_step(self.partition, progress.progress * self.weight)
+
+
 def get_custom_exp_backoff(max_repeat=None, task_uid=None):
     def custom_exp_backoff(*args, **kwargs):
         if max_repeat:
@@ -171,6 +225,7 @@ class MapproxyGeopackage(object):
         selection=None,
         projection=None,
         input_gpkg=None,
+        provider_slug=None,
     ):
         """
         Initialize the ExternalServiceToGeopackage utility.
@@ -197,6 +252,7 @@ class MapproxyGeopackage(object):
         self.selection = selection
         self.projection = projection if projection else DEFAULT_PROJECTION  # This could be improved through code.
         self.input_gpkg = input_gpkg
+        self.provider_slug = provider_slug
 
     def build_config(self):
         pass
@@ -228,6 +284,11 @@ class MapproxyGeopackage(object):
                 table_name=self.layer,
             )
 
+        # Read tiles through the tile cache shared by every run of the provider, reprojecting input_gpkg only reads
+        # local tiles so it doesn't need it.
+        if self.use_shared_tile_cache():
+            add_shared_tile_cache(conf_dict, self.provider_slug, self.layer, service_url=self.service_url)
+
         if self.projection != DEFAULT_PROJECTION:
             conf_dict["caches"]["repro_cache"] = copy.deepcopy(conf_dict["caches"]["default"])
 
@@ -282,6 +343,8 @@ class MapproxyGeopackage(object):
             projection=self.projection,
         )
 
+        self.seed_dict = seed_dict
+
         # Create a seed configuration object
         seed_configuration = SeedingConfiguration(seed_dict, mapproxy_conf=mapproxy_configuration)
         errors = validate_references(conf_dict)
@@ -293,6 +356,75 @@ class MapproxyGeopackage(object):
 
         return conf_dict, seed_configuration, mapproxy_configuration
 
+    def use_shared_tile_cache(self):
+        return bool(self.provider_slug and not self.input_gpkg and get_shared_tile_cache_ttl(self.config))
+
+    def get_seed_partitions(self, conf_dict, mapproxy_configuration) -> list[SeedPartition]:
+        partition_count = get_seed_partition_count(conf_dict)
+        if partition_count <= 1:
+            return []
+        seed = self.seed_dict["seeds"]["seed"]
+        coverage = self.seed_dict["coverages"][seed["coverages"][0]]
+        grid = mapproxy_configuration.grids.get(seed["grids"][0]).tile_grid()
+        return get_seed_partitions(
+            grid,
+            convert_bbox(self.bbox, to_projection=self.projection),
+            coverage["srs"],
+            seed["levels"]["from"],
+            seed["levels"]["to"],
+            partition_count,
+        )
+
+    def seed(self, conf_dict, seed_configuration, mapproxy_configuration, progress_logger):
+        """
+        Seeds the geopackage. When seed_partitions is more than one the seed is split into partitions with about the
+        same number of tiles, which are seeded at the same time into their own geopackages and then merged.
+        """
+        partitions = self.get_seed_partitions(conf_dict, mapproxy_configuration)
+        if len(partitions) <= 1:
+            seeder.seed(
+                tasks=seed_configuration.seeds(["seed"]),
+                concurrency=get_concurrency(conf_dict),
+                progress_logger=progress_logger,
+            )
+            return
+
+        logger.info(f"Seeding {self.gpkgfile} in {len(partitions)} partitions.")
+        # The first partition is seeded into the geopackage itself, the others are merged into it.
+        partition_gpkgs = [self.gpkgfile] + [
+            f"{os.path.splitext(self.gpkgfile)[0]}-{index}.gpkg" for index in range(1, len(partitions))
+        ]
+        # Celery workers can't start child processes, so the partitions are seeded in threads like mapproxy's workers.
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            futures = []
+            for index, (partition, partition_gpkg) in enumerate(zip(partitions, partition_gpkgs)):
+                partition_conf_dict = copy.deepcopy(conf_dict)
+                partition_conf_dict["caches"]["default"]["cache"]["filename"] = partition_gpkg
+                partition_logger = PartitionLogger(
+                    progress_logger,
+                    index,
+                    partition["weight"],
+                    verbose=progress_logger.verbose,
+                    silent=progress_logger.silent,
+                    progress_store=get_progress_store(self.gpkgfile, partition=index),
+                )
+                futures.append(
+                    executor.submit(
+                        seed_partition,
+                        partition_conf_dict,
+                        get_partition_seed_template(self.seed_dict, partition),
+                        get_concurrency(conf_dict),
+                        partition_logger,
+                    )
+                )
+            for future in futures:
+                future.result()
+
+        for partition_gpkg in partition_gpkgs[1:]:
+            if os.path.isfile(partition_gpkg):
+                merge_tile_tables(self.gpkgfile, partition_gpkg)
+                os.remove(partition_gpkg)
+
     def convert(self):
         """
         Convert external service to gpkg.
@@ -323,13 +455,15 @@ class MapproxyGeopackage(object):
                 verbose=log_settings.get("verbose"),
                 silent=log_settings.get("silent"),
             )
+            if SHARED_TILE_CACHE in conf_dict["caches"]:
+                touch_shared_tile_cache(
+                    conf_dict["caches"][SHARED_TILE_CACHE]["cache"]["directory"],
+                    self.level_from or 0,
+                    self.level_to or 10,
+                )
             task_process = TaskProcess(task_uid=self.task_uid)
             task_process.start_process(
-                lambda: seeder.seed(
-                    tasks=seed_configuration.seeds(["seed"]),
-                    concurrency=get_concurrency(conf_dict),
-                    progress_logger=progress_logger,
-                )
+                lambda: self.seed(conf_dict, seed_configuration, mapproxy_configuration, progress_logger)
             )
             check_zoom_levels(self.gpkgfile, mapproxy_configuration)
             remove_empty_zoom_levels(self.gpkgfile)
@@ -350,11 +484,106 @@ class MapproxyGeopackage(object):
             connections.close_all()
 
 
-def get_progress_store(gpkg):
+def get_progress_store(gpkg, partition=None):
     progress_file = os.path.join(os.path.dirname(gpkg), ".progress_logger")
+    if partition is not None:
+        progress_file = f"{progress_file}-{partition}"
     return ProgressStore(filename=progress_file, continue_seed=True)
 
 
+def get_seed_partitions(grid, bbox, srs, level_from, level_to, partition_count) -> list[SeedPartition]:
+    """
+    Splits the levels to seed into partitions with about the same number of tiles. Consecutive levels are grouped into
+    a partition, and levels with more tiles than a partition (usually the last ones, since each level has about four
+    times the tiles of the previous one) are split into vertical strips along tile columns, so no tile is seeded twice.
+    :param grid: The mapproxy tile grid being seeded.
+    :param bbox: The bbox of the seed coverage.
+    :param srs: The projection of the bbox.
+    :param level_from: The first level to seed.
+    :param level_to: The last level to seed.
+    :param partition_count: The number of partitions to aim for.
+    :return: A list of partitions, which is a single partition with all levels if the seed can't be split.
+    """
+    all_levels: SeedPartition = {"levels": {"from": level_from, "to": level_to}, "weight": 1.0}
+    try:
+        grid_bbox = SRS(srs).transform_bbox_to(grid.srs, bbox)
+        level_tiles = {}
+        for level in range(level_from, level_to + 1):
+            affected_bbox, (width, height), _ = grid.get_affected_level_tiles(grid_bbox, level)
+            level_tiles[level] = (width * height, width, affected_bbox)
+    except (GridError, IndexError, ValueError) as e:
+        logger.warning(f"Unable to partition the seed, seeding all levels at once: {e}")
+        return [all_levels]
+
+    total_tiles = sum(tiles for tiles, _, _ in level_tiles.values())
+    partition_tiles = total_tiles / partition_count
+    partitions: list[SeedPartition] = []
+    group_from, group_tiles = level_from, 0
+    for level, (tiles, columns, affected_bbox) in level_tiles.items():
+        strips = min(round(tiles / partition_tiles), columns)
+        if strips > 1:
+            if group_tiles:
+                partitions.append(
+                    {"levels": {"from": group_from, "to": level - 1}, "weight": group_tiles / total_tiles}
+                )
+            column_width = (affected_bbox[2] - affected_bbox[0]) / columns
+            # Keep the strips half a pixel inside their columns so that they don't touch the tiles next to them.
+            inset = grid.resolution(level) / 2
+            for strip in range(strips):
+                column_from, column_to = round(strip * columns / strips), round((strip + 1) * columns / strips)
+                partitions.append(
+                    {
+                        "levels": {"from": level, "to": level},
+                        "weight": tiles * (column_to - column_from) / columns / total_tiles,
+                        "bbox": [
+                            affected_bbox[0] + column_from * column_width + inset,
+                            affected_bbox[1] + inset,
+                            affected_bbox[0] + column_to * column_width - inset,
+                            affected_bbox[3] - inset,
+                        ],
+                        "srs": grid.srs.srs_code,
+                    }
+                )
+            group_from, group_tiles = level + 1, 0
+            continue
+        group_tiles += tiles
+        if group_tiles >= partition_tiles or level == level_to:
+            partitions.append({"levels": {"from": group_from, "to": level}, "weight": group_tiles / total_tiles})
+            group_from, group_tiles = level + 1, 0
+    return partitions or [all_levels]
+
+
+def get_partition_seed_template(seed_template: SeedConfiguration, partition: SeedPartition) -> SeedConfiguration:
+    """
+    Limits the seed template to the levels, and bbox if it has one, of the partition.
+    """
+    seed_template = copy.deepcopy(seed_template)
+    seed = seed_template["seeds"]["seed"]
+    seed["levels"] = partition["levels"]
+    if partition.get("bbox"):
+        coverage_name = seed["coverages"][0]
+        coverage = seed_template["coverages"][coverage_name]
+        seed_template["coverages"][coverage_name] = {
+            "intersection": [coverage, {"bbox": partition["bbox"], "srs": partition["srs"]}]
+        }
+    return seed_template
+
+
+def seed_partition(conf_dict, seed_dict, concurrency, progress_logger):
+    """
+    Seeds a partition of a seed, the caches of the mapproxy configuration are recreated so that the partition has its
+    own connection to its geopackage.
+    """
+    mapproxy_config = load_default_config()
+    load_config(mapproxy_config, config_dict=conf_dict)
+    mapproxy_configuration = ProxyConfiguration(mapproxy_config, seed=seeder.seed, renderd=None)
+    seed_configuration = SeedingConfiguration(seed_dict, mapproxy_conf=mapproxy_configuration)
+    try:
+        seeder.seed(tasks=seed_configuration.seeds(["seed"]), concurrency=concurrency, progress_logger=progress_logger)
+    finally:
+        connections.close_all()
+
+
 def get_cache_template(sources, grids, geopackage, table_name="tiles"):
     """
     Returns the cache template which is "controlled" settings for the application.
@@ -376,6 +605,160 @@ def get_cache_template(sources, grids, geopackage, table_name="tiles"):
     }
 
 
+def get_shared_tile_cache_dir(provider_slug, conf_dict=None, service_url=None):
+    """
+    Returns the directory of the provider in the shared tile cache, or of the current configuration of the provider if a
+    configuration is given. The configuration directory is named by a hash of everything the tiles depend on (sources,
+    grids, caches and the service url), so that tiles downloaded before a provider was changed aren't reused.
+    :param provider_slug: The slug of the provider.
+    :param conf_dict: The mapproxy configuration, before the shared tile cache is added to it.
+    :param service_url: The url of the provider's service.
+    """
+    provider_dir = os.path.join(settings.SHARED_TILE_CACHE_DIR, provider_slug)
+    if conf_dict is None:
+        return provider_dir
+    tile_config = {
+        "service_url": service_url,
+        "sources": conf_dict.get("sources"),
+        "grids": conf_dict.get("grids"),
+        # The storage of each cache is left out, the default cache is written to a new geopackage for every run.
+        "caches": {
+            name: {key: value for key, value in cache_config.items() if key != "cache"}
+            for name, cache_config in conf_dict.get("caches", {}).items()
+        },
+    }
+    return os.path.join(provider_dir, get_mapproxy_config_hash(tile_config))
+
+
+def get_shared_tile_cache_ttl(config):
+    """
+    Returns the number of seconds tiles are kept in the shared tile cache, or None if the provider doesn't use it.
+    :param config: The provider configuration, with the shared_tile_cache option set to true or {"ttl": seconds}.
+    """
+    shared_tile_cache = (config or {}).get("shared_tile_cache")
+    if not shared_tile_cache:
+        return None
+    ttl = shared_tile_cache.get("ttl") if isinstance(shared_tile_cache, dict) else None
+    return int(ttl or settings.SHARED_TILE_CACHE_TTL)
+
+
+def add_shared_tile_cache(conf_dict, provider_slug, table_name, service_url=None):
+    """
+    Puts the tile cache shared by every run of the provider between the default cache and its sources, so that tiles
+    downloaded by a previous run are copied from disk, and tiles downloaded by this run are kept for the next one.
+
+    The shared cache stores one geopackage per configuration of the provider, grid and level, the level is the unit
+    the LRU and TTL are applied to.
+    :param conf_dict: The mapproxy configuration, updated in place.
+    :param provider_slug: The slug of the provider, used to keep the tiles of each provider apart.
+    :param table_name: The table the tiles are stored in.
+    :param service_url: The url of the provider's service.
+    :return: The directory of the shared cache, or None if the default cache has no sources to share.
+    """
+    default_cache = conf_dict["caches"]["default"]
+    if not default_cache.get("sources"):
+        return None
+    cache_dir = get_shared_tile_cache_dir(provider_slug, conf_dict=conf_dict, service_url=service_url)
+    shared_cache = copy.deepcopy(default_cache)
+    shared_cache["cache"] = {
+        "type": "geopackage",
+        "directory": cache_dir,
+        "levels": True,
+        "table_name": table_name,
+    }
+    conf_dict["caches"][SHARED_TILE_CACHE] = shared_cache
+    default_cache["sources"] = [SHARED_TILE_CACHE]
+    return cache_dir
+
+
+def get_shared_tile_cache_files(cache_dir, level_from=None, level_to=None):
+    """
+    Returns the paths to the level geopackages in a directory of the shared tile cache, e.g. of a provider.
+    """
+    cache_files = []
+    for directory, _, filenames in os.walk(cache_dir):
+        for filename in filenames:
+            level, ext = os.path.splitext(filename)
+            if ext != ".gpkg" or not level.isdigit():
+                continue
+            if (level_from is None or int(level) >= level_from) and (level_to is None or int(level) <= level_to):
+                cache_files.append(os.path.join(directory, filename))
+    return cache_files
+
+
+def touch_shared_tile_cache(cache_dir, level_from, level_to):
+    """
+    Marks the levels of the shared tile cache read by a run as recently used, reads don't update the modified time.
+    """
+    for cache_file in get_shared_tile_cache_files(cache_dir, level_from=level_from, level_to=level_to):
+        try:
+            os.utime(cache_file)
+        except OSError as e:
+            logger.warning(f"Could not update the shared tile cache file {cache_file}: {e}")
+
+
+def get_shared_tile_cache_created_at(cache_file):
+    """
+    Returns the time the level geopackage was created at, which mapproxy records in gpkg_contents.
+    """
+    try:
+        with sqlite3.connect(cache_file) as conn:
+            created_at = conn.execute("SELECT strftime('%s', MIN(last_change)) FROM gpkg_contents").fetchone()[0]
+        if created_at:
+            return float(created_at)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read the creation time of {cache_file}: {e}")
+    return os.path.getmtime(cache_file)
+
+
+def prune_shared_tile_cache(max_size=None):
+    """
+    Removes the levels of the shared tile cache which are older than the TTL of their provider, or which belong to a
+    provider which no longer uses it, then removes the least recently used levels until the cache fits in max_size.
+    :param max_size: The maximum size of the shared tile cache in MB, defaults to SHARED_TILE_CACHE_MAX_SIZE.
+    :return: The number of level geopackages removed.
+    """
+    from eventkit_cloud.jobs.models import DataProvider  # Circular reference
+
+    cache_dir = settings.SHARED_TILE_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    max_size = (max_size if max_size is not None else settings.SHARED_TILE_CACHE_MAX_SIZE) * 1024 * 1024
+    ttls = {
+        slug: get_shared_tile_cache_ttl(config) for slug, config in DataProvider.objects.values_list("slug", "config")
+    }
+
+    now = time.time()
+    removed = 0
+    cache_files = []
+    for provider_slug in os.listdir(cache_dir):
+        ttl = ttls.get(provider_slug)
+        for cache_file in get_shared_tile_cache_files(get_shared_tile_cache_dir(provider_slug)):
+            if ttl is None or get_shared_tile_cache_created_at(cache_file) + ttl < now:
+                removed += remove_shared_tile_cache_file(cache_file)
+                continue
+            stat = os.stat(cache_file)
+            cache_files.append((stat.st_mtime, stat.st_size, cache_file))
+
+    total_size = sum(size for _, size, _ in cache_files)
+    for _, size, cache_file in sorted(cache_files):
+        if total_size <= max_size:
+            break
+        removed += remove_shared_tile_cache_file(cache_file)
+        total_size -= size
+    logger.info(f"Removed {removed} files from the shared tile cache, {total_size / 1024 / 1024:.1f}MB remaining.")
+    return removed
+
+
+def remove_shared_tile_cache_file(cache_file):
+    try:
+        os.remove(cache_file)
+        return 1
+    except OSError as e:
+        logger.warning(f"Could not remove the shared tile cache file {cache_file}: {e}")
+        return 0
+
+
 def get_seed_coverages(coverage_file=None, bbox=None, projection=None) -> dict[str, SeedCoverage]:
     projection = projection or DEFAULT_PROJECTION
     seed_coverage: dict[str, SeedCoverage] = {"geom": {"srs": f"EPSG:{projection}"}}
@@ -458,6 +841,13 @@ def get_concurrency(conf_dict):
     return int(concurrency)
 
 
+def get_seed_partition_count(conf_dict):
+    seed_partitions = conf_dict.get("seed_partitions")
+    if not seed_partitions:
+        seed_partitions = getattr(settings, "MAPPROXY_SEED_PARTITIONS", 1)
+    return int(seed_partitions)
+
+
 def create_mapproxy_app(slug: str, user: User = None) -> TestApp:
     mapproxy_config_key = get_mapproxy_config_template(slug, user=user)
     mapproxy_config = cache.get(mapproxy_config_key)
@@ -496,6 +886,7 @@ def create_mapproxy_app(slug: str, user: User = None) -> TestApp:
                 }
             ]
         base_config, conf_dict = add_restricted_regions_to_config(base_config, conf_dict, slug, user)
+        mapproxy_configuration = None
         try:
             mapproxy_config = load_default_config()
             load_config(mapproxy_config, config_dict=base_config)
@@ -514,12 +905,6 @@ def create_mapproxy_app(slug: str, user: User = None) -> TestApp:
         except ConfigurationError as e:
             logger.error(e)
             raise
-    else:
-        try:
-            mapproxy_configuration = ProxyConfiguration(mapproxy_config)
-        except ConfigurationError as e:
-            logger.error(e)
-            raise
 
     cert_info = conf_dict.get("cert_info")
     auth_requests.patch_https(cert_info=cert_info)
@@ -527,9 +912,50 @@ def create_mapproxy_app(slug: str, user: User = None) -> TestApp:
     cred_var = conf_dict.get("cred_var")
     auth_requests.patch_mapproxy_opener_cache(slug=slug, cred_var=cred_var)
 
-    app = MapProxyApp(mapproxy_configuration.configured_services(), mapproxy_config)
+    return get_mapproxy_app(slug, mapproxy_config, mapproxy_configuration=mapproxy_configuration)
+
+
+def get_mapproxy_config_hash(mapproxy_config: dict) -> str:
+    return hashlib.md5(json.dumps(mapproxy_config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_mapproxy_app(slug: str, mapproxy_config: dict, mapproxy_configuration: ProxyConfiguration = None) -> TestApp:
+    """
+    Returns the mapproxy app for a configuration, reusing the apps recently built by this process since parsing the
+    configuration costs far more than serving a tile.
+
+    The apps are keyed by the hash of the configuration, which holds both the provider configuration and the regions
+    restricted for the user, so users with the same restrictions share an app and any change builds a new one.
+    :param slug: The slug of the provider.
+    :param mapproxy_config: The mapproxy configuration as a dict.
+    :param mapproxy_configuration: The configuration object if it was already created from the dict.
+    :return: A TestApp wrapping the mapproxy app.
+    """
+    key = (slug, get_mapproxy_config_hash(mapproxy_config))
+    with mapproxy_apps_lock:
+        app = mapproxy_apps.get(key)
+        if app:
+            mapproxy_apps.move_to_end(key)
+            return app
+
+    if not mapproxy_configuration:
+        try:
+            mapproxy_configuration = ProxyConfiguration(mapproxy_config)
+        except ConfigurationError as e:
+            logger.error(e)
+            raise
+    app = TestApp(MapProxyApp(mapproxy_configuration.configured_services(), mapproxy_config))
+
+    with mapproxy_apps_lock:
+        mapproxy_apps[key] = app
+        while len(mapproxy_apps) > settings.MAPPROXY_APP_CACHE_SIZE:
+            mapproxy_apps.popitem(last=False)
+    return app
+
 
-    return TestApp(app)
+def clear_mapproxy_apps():
+    with mapproxy_apps_lock:
+        mapproxy_apps.clear()
 
 
 def get_conf_dict(slug: str) -> dict:
@@ -663,3 +1089,5 @@ def get_height(extent: list):
 def clear_mapproxy_config_cache():
     mapproxy_config_keys = cache.get_or_set(mapproxy_config_keys_index, set())
     cache.delete_many(list(mapproxy_config_keys))
+    # Other processes build new apps when they read the new configurations, since they no longer match the old hash.
+    clear_mapproxy_apps()
@@ -1,15 +1,24 @@
+import hashlib
 import logging
+import math
 import os
 import pathlib
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Union
 from urllib.parse import urlparse
 
 import boto3
 import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
 from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from storages.backends.s3boto3 import S3Boto3Storage
 
 logger = logging.getLogger(__name__)
 
+# The most keys S3 accepts in a single delete request.
+S3_DELETE_BATCH_SIZE = 1000
+
 
 def get_s3_client():
     return boto3.client(
@@ -29,6 +38,60 @@ def get_s3_resource():
     )
 
 
+def get_transfer_config() -> TransferConfig:
+    """
+    :return: The multipart settings used for transfers, files over AWS_S3_MULTIPART_THRESHOLD bytes are sent in parts of
+    AWS_S3_MULTIPART_CHUNKSIZE bytes, AWS_S3_MAX_CONCURRENCY parts at a time.
+    """
+    return TransferConfig(
+        multipart_threshold=settings.AWS_S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=settings.AWS_S3_MULTIPART_CHUNKSIZE,
+        max_concurrency=settings.AWS_S3_MAX_CONCURRENCY,
+    )
+
+
+def get_etag(file_path: Union[str, pathlib.Path], part_count: int = 0, chunk_size: int = None) -> str:
+    """
+    Computes the ETag S3 gives to a file.
+    :param file_path: The local file path.
+    :param part_count: The number of parts the file was uploaded in, or 0 if it wasn't a multipart upload.
+    :param chunk_size: The size of each part of a multipart upload.
+    :return: The ETag without quotes.
+    """
+    read_size = chunk_size if part_count else 1024 * 1024 * 8
+    part_hashes = []
+    file_hash = hashlib.md5()
+    with open(file_path, "rb") as local_file:
+        for chunk in iter(lambda: local_file.read(read_size), b""):
+            if part_count:
+                part_hashes.append(hashlib.md5(chunk).digest())
+            else:
+                file_hash.update(chunk)
+    if not part_count:
+        return file_hash.hexdigest()
+    return f"{hashlib.md5(b''.join(part_hashes)).hexdigest()}-{len(part_hashes)}"
+
+
+def is_downloaded(file_path: Union[str, pathlib.Path], size: int, etag: str) -> bool:
+    """
+    Checks whether a file already matches an object on S3, so that it doesn't need to be downloaded again.
+    :param file_path: The local file path.
+    :param size: The size of the object.
+    :param etag: The ETag of the object.
+    :return: True if the file has the same size and content as the object.
+    """
+    if not os.path.isfile(file_path) or os.path.getsize(file_path) != size:
+        return False
+    etag = etag.strip('"')
+    part_count = int(etag.split("-")[1]) if "-" in etag else 0
+    chunk_size = settings.AWS_S3_MULTIPART_CHUNKSIZE
+    if part_count and part_count != math.ceil(size / chunk_size):
+        # The object was uploaded with different multipart settings, so its ETag can't be computed from the file.
+        logger.info(f"Could not verify {file_path}, multipart uploads of {part_count} parts aren't supported.")
+        return False
+    return get_etag(file_path, part_count=part_count, chunk_size=chunk_size) == etag
+
+
 def upload_to_s3(
     source_path: Union[str, pathlib.Path],
     destination_filename: Union[str, pathlib.Path] = None,
@@ -64,7 +127,10 @@ def upload_to_s3(
         try:
             logger.info(f"Uploading s3 file {source_path} -> {destination_filename}")
             client.upload_fileobj(
-                Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=str(destination_filename), Fileobj=asset_file
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=str(destination_filename),
+                Fileobj=asset_file,
+                Config=get_transfer_config(),
             )
         except botocore.exceptions.ClientError:
             logger.error(f"Could not s3 upload file {source_path} -> {destination_filename}")
@@ -76,60 +142,111 @@ def upload_to_s3(
     ).split("?")[0]
 
 
-def download_folder_from_s3(folder_to_download: str, output_dir: str = None):
+def download_folder_from_s3(folder_to_download: str, output_dir: str = None, client=None) -> List[str]:
     """
     Downloads a folder from S3 into the EXPORT_STAGING_ROOT.
+    Up to AWS_S3_DOWNLOAD_CONCURRENCY files are downloaded at once. Files which already match the objects on S3 are kept
+    as they are instead of being downloaded again.
     :param folder_to_download: The folder path on S3 you want to download.
     :param output_dir: A different directory other than the original uid in the staging root.
+    :param client: An S3 client, optional.
+    :return: The paths of the files in the folder.
     """
-    logger.error(f"Downloading s3 {folder_to_download} to output_dir {output_dir}")
-    resource = get_s3_resource()
-    bucket = resource.Bucket(settings.AWS_STORAGE_BUCKET_NAME)
-
-    for s3_object in bucket.objects.filter(Prefix=folder_to_download):
-
-        destination_path = os.path.join(settings.EXPORT_STAGING_ROOT, s3_object.key)
-        if output_dir:
-            destination_path = os.path.join(output_dir, s3_object.key.lstrip(folder_to_download).lstrip("\/"))
-
-        # We don't want or need the original zip file, since we're creating a new one.
-        suffix = pathlib.PurePosixPath(s3_object.key).suffix
-        logger.error(f"file suffix: {suffix}")
-        if suffix == ".zip":
-            logger.error(f"Skipping zip {s3_object.key}.")
-            continue
-
+    logger.info(f"Downloading s3 {folder_to_download} to output_dir {output_dir}")
+    if not client:
+        client = get_s3_client()
+    transfer_config = get_transfer_config()
+
+    downloads = []
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=folder_to_download):
+        for s3_object in page.get("Contents", []):
+            key = s3_object["Key"]
+            # We don't want or need the original zip file, since we're creating a new one.
+            if pathlib.PurePosixPath(key).suffix == ".zip":
+                logger.info(f"Skipping zip {key}.")
+                continue
+
+            destination_path = os.path.join(settings.EXPORT_STAGING_ROOT, key)
+            if output_dir:
+                destination_path = os.path.join(output_dir, key[len(folder_to_download) :].lstrip("/"))
+            downloads.append((key, destination_path, s3_object["Size"], s3_object["ETag"]))
+
+    def download_file(key: str, destination_path: str, size: int, etag: str) -> str:
+        if is_downloaded(destination_path, size, etag):
+            logger.info(f"Keeping file {destination_path}, it matches {key}.")
+            return destination_path
         os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        logger.info(f"Downloading file {key} -> {destination_path}")
+        # Clients are threadsafe, unlike resources.
+        client.download_file(settings.AWS_STORAGE_BUCKET_NAME, key, destination_path, Config=transfer_config)
+        return destination_path
 
-        print(f"Downloading file {s3_object.key} -> {destination_path}")
-        bucket.download_file(s3_object.key, destination_path)
+    with ThreadPoolExecutor(max_workers=settings.AWS_S3_DOWNLOAD_CONCURRENCY) as executor:
+        return list(executor.map(lambda download: download_file(*download), downloads))
 
 
-def delete_from_s3(run_uid=None, download_url=None, client=None):
+def delete_from_s3(run_uid=None, download_url=None, client=None) -> List[str]:
     """
 
     :param run_uid: An ExportRun uuid. If run uid is provided the entire run will be removed.
     :param download_url: A url for the download path. If a download url is provided only that file will be removed.
     :param client: An S3 Client, if not provided one will be created based on django settings if available.
-    :return: None
+    :return: The keys which could not be deleted.
     """
 
     if not client:
         client = get_s3_client()
 
-    if run_uid:
-        path_objects = client.list_objects(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=run_uid)
-        items = path_objects.get("Contents", [])
-
     if download_url:
         parts = download_url.split("/")
-        items = [{"Key": "/".join([parts[-2], parts[-1]])}]
+        return delete_keys_from_s3(["/".join([parts[-2], parts[-1]])], client=client)
+
+    failed_keys = []
+    if run_uid:
+        # Each page holds up to 1000 keys, which is also the most a single delete request can remove.
+        paginator = client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=run_uid):
+            failed_keys += delete_keys_from_s3([item["Key"] for item in page.get("Contents", [])], client=client)
+    return failed_keys
+
 
-    for item in items:
-        _key = item["Key"]
-        client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=_key)
-        if "Contents" in client.list_objects(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=_key):
-            logger.warn("Could not delete {0} from S3.".format(_key))
+def delete_keys_from_s3(keys: List[str], client=None) -> List[str]:
+    """
+    Deletes objects from S3 in batches of up to 1000 keys per request.
+    :param keys: The keys of the objects to delete.
+    :param client: An S3 client, optional.
+    :return: The keys which could not be deleted.
+    """
+    if not client:
+        client = get_s3_client()
+
+    failed_keys = []
+    for batch_start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[batch_start : batch_start + S3_DELETE_BATCH_SIZE]
+        # Quiet mode only reports the keys which failed.
+        response = client.delete_objects(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        for error in response.get("Errors", []):
+            logger.warning(f"Could not delete {error.get('Key')} from S3: {error.get('Code')} {error.get('Message')}")
+            failed_keys.append(error.get("Key"))
+    return failed_keys
+
+
+def open_storage_file(field_file: FieldFile) -> IO[bytes]:
+    """
+    Opens a stored file so that it can be read a chunk at a time. Opening a file from S3Boto3Storage downloads the whole
+    object into memory first, so the body of the object is read from S3 as it is requested instead.
+    :param field_file: The file of a model, e.g. a FileProducingTaskResult.
+    :return: A readable file, which should be closed once it has been read.
+    """
+    storage = field_file.storage
+    if not isinstance(storage, S3Boto3Storage):
+        return storage.open(field_file.name, "rb")
+    key = storage._normalize_name(storage._clean_name(field_file.name))
+    return storage.bucket.Object(key).get()["Body"]
 
 
 def get_presigned_url(download_url=None, client=None, expires=300):
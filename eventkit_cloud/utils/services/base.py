@@ -22,7 +22,16 @@ logger = logging.getLogger(__name__)
 class GisClient(abc.ABC):
     aoi: Optional[GeometryCollection] = None
 
-    def __init__(self, service_url, layer, aoi_geojson=None, slug=None, max_area=0, config: dict = None):
+    def __init__(
+        self,
+        service_url,
+        layer,
+        aoi_geojson=None,
+        slug=None,
+        max_area=0,
+        config: dict = None,
+        session: Optional[requests.Session] = None,
+    ):
         """
         Initialize this ProviderCheck object with a service URL and layer.
         :param service_url: URL of provider, if applicable. Query string parameters are ignored.
@@ -30,6 +39,7 @@ class GisClient(abc.ABC):
         :param aoi_geojson: (Optional) AOI to check for layer intersection
         :param slug: (Optional) A provider slug to use for getting credentials.
         :param max_area: The upper limit for this datasource.
+        :param session: (Optional) A new session to set up for this provider, e.g. to share a connection pool.
         """
 
         self.service_url = service_url
@@ -39,7 +49,7 @@ class GisClient(abc.ABC):
         self.max_area = max_area
         self.timeout = 10
         self.config = config or dict()
-        self.session = get_or_update_session(session=None, **self.config)
+        self.session = get_or_update_session(session=session, **self.config)
 
         self.set_aoi(aoi_geojson)
 
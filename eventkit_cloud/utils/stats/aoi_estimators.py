@@ -81,6 +81,7 @@ class AoiEstimator(object):
         self._with_clipping = with_clipping
         self._cap_estimates = cap_estimates
         self._results = dict()
+        self._statistics = dict()
 
     def get_estimate_from_slug(self, estimate_type, provider_slug):
         """Get the specified estimate type for a provider by doing a slug lookup."""
@@ -121,6 +122,31 @@ class AoiEstimator(object):
 
             return [ftr.result() for ftr in futures_list]  # return size and time.
 
+    def get_providers_estimates(self, slugs):
+        """
+        Get the size and time estimates for several providers at once, the providers and their statistics are each
+        fetched in a single lookup and the bbox is only intersected with the tile grid once.
+
+        :param slugs: list of provider slugs
+        :return: A dictionary mapping each slug to its size and time estimates.
+        """
+        providers = {
+            provider.slug: provider
+            for provider in DataProvider.objects.select_related("export_provider_type").filter(slug__in=slugs)
+        }
+        for slug in slugs:
+            if slug not in providers:
+                raise ValueError("Provider slug '{}' is not valid".format(slug))
+        self._statistics.update(ek_stats.get_many_statistics(slugs))
+
+        return {
+            slug: [
+                self.get_estimate(AoiEstimator.Types.SIZE, providers[slug])[0],
+                self.get_estimate(AoiEstimator.Types.TIME, providers[slug])[0],
+            ]
+            for slug in slugs
+        }
+
     def _get_size_estimate(self, provider):
         """Get size estimate for this provider by checking the provider type."""
         if is_raster_single(provider) or is_raster_tile_grid(provider):
@@ -131,16 +157,23 @@ class AoiEstimator(object):
                 with_clipping=self._with_clipping,
                 min_zoom=self.min_zoom,
                 max_zoom=self.max_zoom,
+                custom_stats=self._statistics.get(provider.slug),
             )
         elif is_vector(provider):
-            return get_vector_estimate(provider, bbox=self.bbox, srs=self.bbox_srs)
+            return get_vector_estimate(
+                provider, bbox=self.bbox, srs=self.bbox_srs, custom_stats=self._statistics.get(provider.slug)
+            )
         else:
             logger.info(f"""Non-specific provider found with slug {provider.slug}, falling back to vector estimate""")
-            return get_vector_estimate(provider, bbox=self.bbox, srs=self.bbox_srs)
+            return get_vector_estimate(
+                provider, bbox=self.bbox, srs=self.bbox_srs, custom_stats=self._statistics.get(provider.slug)
+            )
 
     def _get_time_estimate(self, provider):
         """Get the time estimate for the specified provider."""
-        return get_time_estimate(provider, bbox=self.bbox, bbox_srs=self.bbox_srs)
+        return get_time_estimate(
+            provider, bbox=self.bbox, bbox_srs=self.bbox_srs, custom_stats=self._statistics.get(provider.slug)
+        )
 
 
 def get_size_estimate_slug(slug, bbox, srs="4326", min_zoom=None, max_zoom=None):
@@ -204,12 +237,15 @@ def is_vector(provider):
     return type_name == "osm-generic" or type_name == "osm" or type_name == "wfs"
 
 
-def get_raster_tile_grid_size_estimate(provider, bbox, srs="4326", with_clipping=True, min_zoom=None, max_zoom=None):
+def get_raster_tile_grid_size_estimate(
+    provider, bbox, srs="4326", with_clipping=True, min_zoom=None, max_zoom=None, custom_stats=None
+):
     """
     :param provider: The DataProvider to test
     :param bbox: The bounding box of the request
     :param srs: The SRS of the bounding box
     :param with_clipping: see get_total_num_pixels
+    :param custom_stats: see query
     :return: (estimate in mbs, object w/ metadata about how it was generated)
     """
     # TODO: Both total_pixels and query intersect the tile grid, can save time if we do it once for both
@@ -224,6 +260,7 @@ def get_raster_tile_grid_size_estimate(provider, bbox, srs="4326", with_clipping
         bbox_srs=srs,
         gap_fill_thresh=0.1,
         default_value=0.00000006,
+        custom_stats=custom_stats,
     )
     method["mpp"] = mpp
     method["with_clipping"] = with_clipping
@@ -234,11 +271,12 @@ def get_raster_tile_grid_size_estimate(provider, bbox, srs="4326", with_clipping
     return estimate if estimate < max_acceptable else max_acceptable, method
 
 
-def get_vector_estimate(provider, bbox, srs="4326"):
+def get_vector_estimate(provider, bbox, srs="4326", custom_stats=None):
     """
     :param provider: The DataProvider to test
     :param bbox: The bounding box of the request
     :param srs: The SRS of the bounding box
+    :param custom_stats: see query
     :return: (estimate in mbs, object w/ metadata about how it was generated)
     """
     # TODO tile_grid params should be serialized on all_stats object
@@ -255,16 +293,18 @@ def get_vector_estimate(provider, bbox, srs="4326"):
         bbox_srs=srs,
         gap_fill_thresh=0.1,
         default_value=0,
+        custom_stats=custom_stats,
     )
     method["size_per_km"] = size_per_km
     return req_area * size_per_km, method
 
 
-def get_time_estimate(provider, bbox, bbox_srs="4326"):
+def get_time_estimate(provider, bbox, bbox_srs="4326", custom_stats=None):
     """
     :param provider: The DataProvider to test
     :param bbox: The bounding box of the request
     :param bbox_srs: The SRS of the bounding box
+    :param custom_stats: see query
     :return: (estimate in seconds, object w/ metadata about how it was generated)
     """
     duration_per_unit_area, method = ek_stats.query(
@@ -275,6 +315,7 @@ def get_time_estimate(provider, bbox, bbox_srs="4326"):
         bbox_srs=bbox_srs,
         gap_fill_thresh=0.1,
         default_value=0,
+        custom_stats=custom_stats,
     )
 
     area = get_area_bbox(bbox)
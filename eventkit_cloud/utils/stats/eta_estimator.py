@@ -1,4 +1,5 @@
 import datetime
+import math
 import time
 
 
@@ -17,6 +18,8 @@ class ETA(object):
         self.last_tick_start = start_time
         self.progress = 0.0
         self.ticks = 10000
+        # Reduces the influence of older measurements, applied once per tick.
+        self.decay = 0.999
         self.tick_duration_sums = 0.0
         self.tick_duration_divisor = 0.0
         self.tick_count = 0
@@ -38,17 +41,17 @@ class ETA(object):
         if missing_ticks:
             tick_duration = (time.time() - self.last_tick_start) / missing_ticks
 
-            while missing_ticks > 0:
-                # reduce the influence of older measurements
-                self.tick_duration_sums *= 0.999
-                self.tick_duration_divisor *= 0.999
-
-                self.tick_count += 1
-
-                self.tick_duration_sums += tick_duration
-                self.tick_duration_divisor += 1
-
-                missing_ticks -= 1
+            # Every missing tick has the same duration, so decaying the sums and adding the tick once per tick is a
+            # geometric series which can be applied in constant time:
+            #   sums = sums * decay^n + tick_duration * (1 + decay + ... + decay^(n-1))
+            tick_steps = max(math.ceil(missing_ticks), 0)
+            if tick_steps:
+                total_decay = self.decay**tick_steps
+                decayed_ticks = (1 - total_decay) / (1 - self.decay)
+
+                self.tick_duration_sums = self.tick_duration_sums * total_decay + tick_duration * decayed_ticks
+                self.tick_duration_divisor = self.tick_duration_divisor * total_decay + decayed_ticks
+                self.tick_count += tick_steps
 
             self.last_tick_start = time.time()
 
@@ -1,4 +1,3 @@
-import copy
 import datetime
 import itertools
 import json
@@ -6,14 +5,17 @@ import logging
 import math
 import os
 import statistics
-import threading
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from typing import Any, Dict, List, Type, Union
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Union
 
+import numpy as np
 from django import db
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models.query import QuerySet
+from django.utils import timezone
 
 from eventkit_cloud.jobs.models import DataProvider
 from eventkit_cloud.tasks.enumerations import TaskState
@@ -32,31 +34,87 @@ global_key = "GLOBAL"
 # Method to pull normalized data values off of the run, provider_task, or provider_task.task objects
 
 
+def get_statistics_cache_key(provider_slug):
+    return f"{provider_slug}_data_statistics"
+
+
+def get_statistics_state_cache_key(provider_slug):
+    return f"{provider_slug}_data_statistics_state"
+
+
 def get_statistics(provider_slug, force=os.getenv("FORCE_STATISTICS_RECOMPUTE", False)):
     """
     :param provider_slug: A slug value of the data provider you want to get statistics for.
     :param force: True to re-compute the desired statistics
     :return: The statistics object
     """
-    cache_key = f"{provider_slug}_data_statistics"
-
-    def compute_stats():
-        return json.dumps(compute_statistics(provider_slug))
-
     if force:
         logger.info("Force Statistics Recompute.")
-        stats = compute_stats()
-        cache.set(cache_key, stats, timeout=DEFAULT_CACHE_EXPIRATION)
-    else:
-        # get_or_set needs a callable to avoid evaluating early.
-        # compute stats will only be evaluated if the cache is not set.
-        stats = cache.get_or_set(cache_key, compute_stats, timeout=DEFAULT_CACHE_EXPIRATION)
+        return update_statistics(provider_slug, rebuild=True)
 
+    stats = cache.get(get_statistics_cache_key(provider_slug))
+    if stats is None:
+        return update_statistics(provider_slug)
     return json.loads(stats)
 
 
-def get_default_stat():
-    return {"duration": [], "area": [], "size": [], "mpp": []}
+def get_many_statistics(provider_slugs):
+    """
+    :param provider_slugs: The slug values of the data providers you want to get statistics for.
+    :return: A dict mapping each slug to its statistics object, the cached statistics are fetched at once.
+    """
+    cache_keys = {get_statistics_cache_key(provider_slug): provider_slug for provider_slug in provider_slugs}
+    cached_stats = cache.get_many(list(cache_keys))
+    return {
+        provider_slug: json.loads(cached_stats[cache_key])
+        if cache_key in cached_stats
+        else get_statistics(provider_slug)
+        for cache_key, provider_slug in cache_keys.items()
+    }
+
+
+def update_statistics(provider_slug, rebuild=False):
+    """
+    Updates the cached statistics with the ExportTaskRecords finished since the last update.  Running sums and counts
+    of the samples are cached along with the time of the last update, so only the new records need to be read.
+    :param provider_slug: A slug value of the data provider you want to update statistics for.
+    :param rebuild: True to re-compute the statistics from scratch, this also happens if there is no previous update or
+    the last rebuild is older than STATISTICS_REBUILD_INTERVAL hours.
+    :return: The statistics object
+    """
+    state_cache_key = get_statistics_state_cache_key(provider_slug)
+    state = None if rebuild else cache.get(state_cache_key)
+    rebuild_interval = timezone.timedelta(hours=float(os.getenv("STATISTICS_REBUILD_INTERVAL", 96)))
+    overlap = timezone.timedelta(minutes=float(os.getenv("STATISTICS_UPDATE_OVERLAP", 60)))
+    if state is None or timezone.now() - state["rebuilt_at"] > rebuild_interval:
+        logger.info(f"Rebuilding the {provider_slug} statistics.")
+        state = {"sums": {}, "finished_at": None, "counted": {}, "rebuilt_at": timezone.now()}
+
+    # A data provider task can be committed after one which finished later was already counted, so the tasks which
+    # finished within the overlap before the last update are read again, skipping the ones already counted.
+    counted = state.get("counted", {})
+    finished_after = state["finished_at"] - overlap if state["finished_at"] else None
+    samples, rollup_keys, finished_times = collect_statistics_samples(
+        provider_slug, finished_after=finished_after, counted_ids=list(counted)
+    )
+    merge_statistics_sums(state["sums"], samples.get_sums(rollup_keys))
+    counted.update(finished_times)
+    state["finished_at"] = max(counted.values(), default=None)
+    state["counted"] = {
+        data_provider_task_record_id: finished_at
+        for data_provider_task_record_id, finished_at in counted.items()
+        if finished_at > state["finished_at"] - overlap
+    }
+    cache.set(state_cache_key, state, timeout=DEFAULT_CACHE_EXPIRATION)
+
+    totals: Dict[str, Union[int, dict]] = {
+        "run_count": 0,
+        "data_provider_task_count": 0,
+        "export_task_count": 0,
+    }
+    totals.update(get_statistics_totals(state["sums"]))
+    cache.set(get_statistics_cache_key(provider_slug), json.dumps(totals), timeout=DEFAULT_CACHE_EXPIRATION)
+    return totals
 
 
 def get_accessors():
@@ -70,16 +128,29 @@ def get_accessors():
     }
 
 
-def update_all_statistics_caches(executor=ProcessPoolExecutor):
+def update_all_statistics_caches(executor=ProcessPoolExecutor, rebuild=False):
     """
     A helper function to compute all of the statistics and update all caches at once.
     :param executor: The concurrent.futures.executor to use for processing the statistics.
+    :param rebuild: True to re-compute the statistics from scratch instead of updating them with new records.
     """
     provider_slugs = [provider.slug for provider in DataProvider.objects.all()]
     for conn in db.connections.all():
         conn.close_if_unusable_or_obsolete()
     with executor() as pool:
-        pool.map(get_statistics, provider_slugs, itertools.repeat(True))
+        pool.map(update_statistics, provider_slugs, itertools.repeat(rebuild))
+
+
+@lru_cache(maxsize=256)
+def get_tile_grid(res=None):
+    """
+    The tile grids are memoized so that the pixel counts of each provider grid are too.
+    :param res: A tuple of the resolutions of each level, or None for the default resolutions
+    :return: A geodetic grid for EPSG:4326
+    """
+    return mapproxy_grid.tile_grid_for_epsg(
+        "EPSG:4326", tile_size=(256, 256), res=list(res) if res is not None else None
+    )
 
 
 def get_default_tile_grid(level=10):
@@ -88,10 +159,9 @@ def get_default_tile_grid(level=10):
     :param level: The desired level for the tiling grid
     :return:
     """
-    tmp = mapproxy_grid.tile_grid_for_epsg("EPSG:4326")
-    res = tmp.resolution(level)
+    res = get_tile_grid().resolution(level)
 
-    return mapproxy_grid.tile_grid_for_epsg("EPSG:4326", res=[res])
+    return get_tile_grid((res,))
 
 
 def has_tiles(export_task_record_name):
@@ -110,36 +180,76 @@ def has_tiles(export_task_record_name):
 
 def compute_statistics(provider_slug, tile_grid=get_default_tile_grid(), filename=None):
     """
-    :param export_task_records: ExporTaskRecords is a list of all export tasks
-    :param get_group: Function to generate a group id given a DataExportProviderTask
+    :param provider_slug: A slug value of the data provider you want to compute statistics for.
     :param tile_grid: Calculate statistics for each tile in the tile grid
     :param filename: Serializes the intermediate data-sample data so it can be shared btw different deployments
     :return: A dict with statistics including area, duration, and package size per sq. kilometer
     """
+    samples, rollup_keys, _ = collect_statistics_samples(provider_slug, tile_grid)
 
-    max_estimate_export_task_records = os.getenv("MAX_ESTIMATE_EXPORT_TASK_RECORDS", 10000)
-    # Order by time descending to ensure more recent samples are collected first
-    export_task_records: QuerySet[ExportTaskRecord] = (
-        ExportTaskRecord.objects.filter(
-            export_provider_task__provider__slug=provider_slug,
-            status=TaskState.SUCCESS.value,
-            export_provider_task__status=TaskState.COMPLETED.value,
-            result__isnull=False,
-            # Only use results larger than a MB,
-            # anything less is likely a failure or a test.
-            result__size__gt=1,
-        )
-        .order_by("-finished_at")
-        .select_related("result", "export_provider_task__run__job", "export_provider_task__provider")
-        .all()[: int(max_estimate_export_task_records)]
-    )
+    # TODO: Merge in any auxiliary sample data?
+
+    if filename is not None:
+        all_stats = samples.to_dict(rollup_keys)
+        all_stats["timestamp"] = str(datetime.datetime.now())
+        with open(filename, "w") as file:
+            json.dump(all_stats, file)
+
+    totals: Dict[str, Union[int, dict]] = {
+        "run_count": 0,
+        "data_provider_task_count": 0,
+        "export_task_count": 0,
+    }
+    totals.update(get_statistics_totals(samples.get_sums(rollup_keys)))
+    tile_count = sum([provider.get("tile_count", 0) for slug, provider in totals.items() if isinstance(provider, dict)])
+    logger.info("Generated statistics for %d tiles for group %s", tile_count, provider_slug)
+    return totals
 
-    processed_runs: Dict[str, Any] = {}
-    processed_dptr: Dict[str, Any] = {}
-    export_task_count = 0
-    total_count = len(export_task_records)  # This should be the first and only DB hit.
 
-    all_stats: Dict[str, Any] = {}
+def collect_statistics_samples(provider_slug, tile_grid=get_default_tile_grid(), finished_after=None, counted_ids=None):
+    """
+    :param provider_slug: A slug value of the data provider you want to collect samples for.
+    :param tile_grid: Collect samples for each tile in the tile grid
+    :param finished_after: Only collect samples from data provider tasks finished after this time, in the order they
+    finished, so that the tasks past MAX_ESTIMATE_EXPORT_TASK_RECORDS are collected by the next update
+    :param counted_ids: The ids of data provider tasks which were already collected
+    :return: The StatisticsSamples, the keys of the roll-ups and the time each data provider task collected finished
+    """
+
+    max_estimate_export_task_records = int(os.getenv("MAX_ESTIMATE_EXPORT_TASK_RECORDS", 10000))
+    export_task_records: QuerySet[ExportTaskRecord] = ExportTaskRecord.objects.filter(
+        export_provider_task__provider__slug=provider_slug,
+        status=TaskState.SUCCESS.value,
+        export_provider_task__status=TaskState.COMPLETED.value,
+        result__isnull=False,
+        # Only use results larger than a MB,
+        # anything less is likely a failure or a test.
+        result__size__gt=1,
+    )
+    if counted_ids:
+        export_task_records = export_task_records.exclude(export_provider_task_id__in=counted_ids)
+    if finished_after:
+        export_task_records = export_task_records.filter(export_provider_task__finished_at__gt=finished_after)
+        ordering = ["export_provider_task__finished_at", "export_provider_task_id"]
+    else:
+        # Order by time descending to ensure more recent samples are collected first
+        ordering = ["-finished_at"]
+    export_task_records = list(
+        export_task_records.order_by(*ordering)
+        .select_related("result", "export_provider_task__run__job", "export_provider_task__provider")
+        .all()[:max_estimate_export_task_records]
+    )  # This should be the first and only DB hit.
+    if finished_after and len(export_task_records) == max_estimate_export_task_records:
+        # The last data provider task may not have all of its records within the limit, so it's left for the next
+        # update unless it's the only one.
+        last_id = export_task_records[-1].export_provider_task_id
+        export_task_records = [
+            export_task_record
+            for export_task_record in export_task_records
+            if export_task_record.export_provider_task_id != last_id
+        ] or export_task_records
+
+    total_count = len(export_task_records)
 
     logger.debug("Prefetching geometry data from all Jobs")
 
@@ -150,141 +260,368 @@ def compute_statistics(provider_slug, tile_grid=get_default_tile_grid(), filenam
     data_provider_task_records: List[DataProviderTaskRecord] = list(
         set([export_task_record.export_provider_task for export_task_record in export_task_records])
     )
-    default_stat = get_default_stat()
+    geometry_descriptions = {run.id: get_geometry_description(run.job.the_geom) for run in runs}
     accessors = get_accessors()
-    global_stats = get_child_entry(all_stats, global_key, default_stat)
+    samples = StatisticsSamples(tile_grid)
 
+    # The GLOBAL and provider roll-ups have always shared their samples, so both are collected as one target.
+    rollup_keys = [global_key]
     for run in runs:
-        area = get_geometry_description(run.job.the_geom)["area"]
-        collect_samples(run, [global_stats], ["duration", "area"], accessors, area)
+        samples.add_rollup_samples(run, ["duration", "area"], accessors, geometry_descriptions[run.id]["area"])
 
     for data_provider_task_record in data_provider_task_records:
-        area = get_geometry_description(data_provider_task_record.run.job.the_geom)["area"]
-        provider_stats = get_child_entry(all_stats, data_provider_task_record.provider.slug, default_stat)
-        collect_samples(data_provider_task_record, [provider_stats], ["duration", "area"], accessors, area)
+        rollup_keys.append(data_provider_task_record.provider.slug)
+        samples.add_rollup_samples(
+            data_provider_task_record,
+            ["duration", "area"],
+            accessors,
+            geometry_descriptions[data_provider_task_record.run.id]["area"],
+        )
 
-    collected_stats = collect_samples_for_export_task_records(export_task_records, copy.deepcopy(all_stats), tile_grid)
-    [all_stats.update(stat) for stat in collected_stats]
+    samples.add_export_task_records(export_task_records, accessors, geometry_descriptions)
 
     logger.info(
-        f"Computing statistics across {export_task_count} completed "
+        f"Collected statistics across {total_count} completed "
         f"{provider_slug} ExportTaskRecords (geom_cache_misses={_dbg_geom_cache_misses})"
     )
 
-    # TODO: Merge in any auxiliary sample data?
-
-    if filename is not None:
-        all_stats["timestamp"] = str(datetime.datetime.now())
-        with open(filename, "w") as file:
-            json.dump(all_stats, file)
-
-    totals: Dict[str, Union[int, dict]] = {
-        "run_count": len(processed_runs),
-        "data_provider_task_count": len(processed_dptr),
-        "export_task_count": export_task_count,
+    finished_times = {
+        data_provider_task_record.id: data_provider_task_record.finished_at
+        for data_provider_task_record in data_provider_task_records
+        if data_provider_task_record.finished_at
     }
-    returned_totals = process_totals_concurrently(list(all_stats.keys()), copy.deepcopy(all_stats))
-    [totals.update(total) for total in returned_totals]
-    tile_count = sum([provider.get("tile_count", 0) for slug, provider in totals.items() if isinstance(provider, dict)])
-    logger.info("Generated statistics for %d tiles for group %s", tile_count, provider_slug)
-    return totals
+    return samples, list(dict.fromkeys(rollup_keys)), finished_times
 
 
-def process_totals(provider_slug: str, stats: dict) -> dict:
-
-    if provider_slug in ["timestamp"]:
-        return dict()
+def get_bbox_tiles(tile_grid, bboxes, level=None):
+    """
+    Computes the tiles affected by many bounding boxes at once, matching tile_grid.get_affected_level_tiles.
+    :param tile_grid: The tile grid
+    :param bboxes: An (n, 4) array of bounding boxes (w, s, e, n) in the srs of the tile grid
+    :param level: The level of the tile grid, defaults to the highest resolution level
+    :return: (bbox_index, x, y) arrays with an entry for each affected tile, ordered by bbox and then row-wise
+    """
+    level = tile_grid.levels - 1 if level is None else level
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    res = tile_grid.resolution(level)
+    tile_width = float(res * tile_grid.tile_size[0])
+    tile_height = float(res * tile_grid.tile_size[1])
+    flipped_y_axis = tile_grid.flipped_y_axis
+
+    def tile(x, y):
+        x = x - tile_grid.bbox[0]
+        y = tile_grid.bbox[3] - y if flipped_y_axis else y - tile_grid.bbox[1]
+        return np.floor(x / tile_width).astype(np.int64), np.floor(y / tile_height).astype(np.int64)
+
+    # remove 1/10 of a pixel so we don't get a tiles we only touch
+    delta = res / 10.0
+    x0, y0 = tile(bboxes[:, 0] + delta, bboxes[:, 1] + delta)
+    x1, y1 = tile(bboxes[:, 2] - delta, bboxes[:, 3] - delta)
+
+    # Rows start at the top of the bbox (y1) and go down, or up if the y-axis is flipped.
+    y_step = 1 if flipped_y_axis else -1
+    x_counts = np.maximum(x1 - x0 + 1, 0)
+    y_counts = np.maximum((y0 - y1) * y_step + 1, 0)
+    counts = x_counts * y_counts
+
+    bbox_index = np.repeat(np.arange(len(bboxes)), counts)
+    tile_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows, columns = np.divmod(tile_index, np.repeat(x_counts, counts))
+    xs = np.repeat(x0, counts) + columns
+    ys = np.repeat(y1, counts) + rows * y_step
+
+    # Tiles outside of the grid don't exist.
+    grid_width, grid_height = tile_grid.grid_sizes[level]
+    in_grid = (xs >= 0) & (ys >= 0) & (xs < grid_width) & (ys < grid_height)
+    return bbox_index[in_grid], xs[in_grid], ys[in_grid]
+
+
+def get_sample_ranks(target_ids):
+    """
+    :param target_ids: The target of each sample, in the order the samples were collected
+    :return: The number of samples collected for the same target before each sample
+    """
+    order = np.argsort(target_ids, kind="stable")
+    sorted_ids = target_ids[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(sorted_ids)])
+    ranks = np.empty(len(target_ids), dtype=np.int64)
+    ranks[order] = np.arange(len(sorted_ids)) - np.repeat(group_starts, group_sizes)
+    return ranks
 
-    totals = {provider_slug: get_summary_stats(stats[provider_slug], ("area", "duration", "size", "mpp"))}
-    tile_count = 0
 
-    for task_name in stats[provider_slug]:
-        if task_name in ["duration", "area", "size", "mpp"]:
-            # These are properties on the roll'ed up statistics
-            continue
-        elif task_name.startswith("tile_"):
-            # Two-level map, index by y then x+z
-            y_s = stats[provider_slug][task_name]
-            total_ys: Dict[str, Any] = {}
-            totals[provider_slug][task_name] = total_ys
-            for xz_s in y_s:
-                total_ys[xz_s] = get_summary_stats(y_s[xz_s], ("area", "duration", "size", "mpp"))
-                total_ys[xz_s]["tile_coord"] = y_s[xz_s]["tile_coord"]
-                tile_count += 1
-        else:
-            totals[provider_slug][task_name] = get_summary_stats(
-                stats[provider_slug][task_name], ("area", "duration", "size")
-            )
+class SampleStore(object):
+    """
+    Stores the data samples of many targets (e.g. a roll-up, a task or a tile) in flat NumPy arrays, so the mean of
+    every target can be computed at once.  Each target keeps at most max_samples of each capped field, in the order
+    the samples were added.
+    """
 
-    totals[provider_slug]["tile_count"] = tile_count
-    return totals
+    def __init__(self, max_samples=MAX_SAMPLES_PER_TARGET):
+        self.max_samples = max_samples
+        self._samples: Dict[str, List[tuple]] = defaultdict(list)
+
+    def add(self, field, target_ids, values, capped=True):
+        """
+        :param field: The field of the samples (e.g. duration)
+        :param target_ids: The target (or targets) of each sample
+        :param values: The value (or values) of each sample
+        :param capped: False to keep every sample regardless of max_samples
+        """
+        target_ids, values = np.broadcast_arrays(
+            np.asarray(target_ids, dtype=np.int64), np.asarray(values, dtype=float)
+        )
+        if target_ids.size:
+            self._samples[field].append((target_ids.ravel(), values.ravel(), capped))
+
+    def get_samples(self, field):
+        """
+        :return: (target_ids, values) of the samples kept for the field, in the order they were added
+        """
+        chunks = self._samples.get(field)
+        if not chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+        target_ids = np.concatenate([chunk[0] for chunk in chunks])
+        values = np.concatenate([chunk[1] for chunk in chunks])
+        capped = np.concatenate([np.full(len(chunk[0]), chunk[2]) for chunk in chunks])
+        keep = ~capped | (get_sample_ranks(target_ids) < self.max_samples)
+        return target_ids[keep], values[keep]
+
+    def get_sums(self, field, num_targets):
+        """
+        :return: (sums, counts) arrays of the samples indexed by target id
+        """
+        target_ids, values = self.get_samples(field)
+        counts = np.bincount(target_ids, minlength=num_targets)
+        sums = np.bincount(target_ids, weights=values, minlength=num_targets)
+        return sums, counts
+
+
+class StatisticsSamples(object):
+    """
+    Collects the data samples used to generate the statistics of a provider, for the roll-up, each task name and each
+    tile of the tile grid affected by a task.
+    """
 
+    ROLLUP_ID = 0
+
+    def __init__(self, tile_grid):
+        self.tile_grid = tile_grid
+        self.store = SampleStore()
+        self.level = tile_grid.levels - 1  # Use highest res grid
+        # Children of the provider in the order they were first seen, the position of each is (record, tile).
+        self.task_ids: Dict[str, int] = {}
+        self.task_positions: Dict[str, tuple] = {}
+        self.tiles: Dict[int, dict] = {}
+        self.num_targets = 1
+
+    def add_rollup_samples(self, item, fields, accessors, area):
+        for field in fields:
+            sample = accessors[field](item, area)
+            if sample:
+                self.store.add(field, self.ROLLUP_ID, sample)
+
+    def get_task_id(self, task_name, position):
+        if task_name not in self.task_ids:
+            self.task_ids[task_name] = self.num_targets
+            self.task_positions[task_name] = position
+            self.num_targets += 1
+        return self.task_ids[task_name]
+
+    def add_export_task_records(self, export_task_records, accessors, geometry_descriptions):
+        """
+        Adds the samples for each ExportTaskRecord to its task, the tiles it affects and the roll-up.
+        """
+        task_ids, durations, areas, sizes, mpps, bboxes, tiled = [], [], [], [], [], [], []
+        for index, export_task_record in enumerate(export_task_records):
+            geometry_description = geometry_descriptions[export_task_record.export_provider_task.run.id]
+            area = geometry_description["area"]
+            task_ids.append(self.get_task_id(export_task_record.name, (index, -1)))
+            durations.append(accessors["duration"](export_task_record, area))
+            areas.append(accessors["area"](export_task_record, area))
+            sizes.append(accessors["size"](export_task_record, area))
+            tiled.append(has_tiles(export_task_record.name))
+            bboxes.append(
+                mapproxy_grid.grid_bbox(
+                    geometry_description["bbox"], bbox_srs=mapproxy_srs.SRS(4326), srs=self.tile_grid.srs
+                )
+            )
+            mpp = np.nan
+            if tiled[-1]:
+                try:
+                    provider = export_task_record.export_provider_task.provider
+                    mpp = compute_mpp(provider, geometry_description["bbox"], export_task_record.result.size)
+                except ObjectDoesNotExist:
+                    pass
+            mpps.append(mpp)
+
+        if not task_ids:
+            return
+
+        task_ids_array = np.asarray(task_ids, dtype=np.int64)
+        has_mpp = ~np.isnan(mpps)
+        tiled_array = np.asarray(tiled)
+        bbox_index, xs, ys = get_bbox_tiles(self.tile_grid, np.asarray(bboxes)[tiled_array], self.level)
+        bbox_index = np.flatnonzero(tiled_array)[bbox_index]
+        tile_target_ids = self.get_tile_ids(bbox_index, xs, ys)
+
+        for field, values in [("duration", durations), ("area", areas), ("size", sizes)]:
+            values_array = np.asarray(values, dtype=float)
+            # Tiles don't collect an area.
+            if field != "area":
+                record_has_sample = values_array[bbox_index].astype(bool)
+                self.store.add(field, tile_target_ids[record_has_sample], values_array[bbox_index][record_has_sample])
+            has_sample = values_array.astype(bool)
+            self.store.add(field, task_ids_array[has_sample], values_array[has_sample])
+
+        mpps_array = np.asarray(mpps, dtype=float)
+        tile_has_mpp = has_mpp[bbox_index]
+        self.store.add("mpp", tile_target_ids[tile_has_mpp], mpps_array[bbox_index][tile_has_mpp])
+
+        # Each sample was added to the provider and GLOBAL roll-ups, which share the same samples.
+        self.store.add("size", self.ROLLUP_ID, np.repeat(np.asarray(sizes, dtype=float), 2), capped=False)
+        self.store.add("mpp", self.ROLLUP_ID, np.repeat(mpps_array[has_mpp], 2))
+
+    def get_tile_ids(self, bbox_index, xs, ys):
+        """
+        Registers each of the affected tiles as a target.
+        :return: The target id for each of the affected tiles.
+        """
+        if not len(xs):
+            return np.empty(0, dtype=np.int64)
+        grid_width = self.tile_grid.grid_sizes[self.level][0]
+        tile_keys = ys * grid_width + xs
+        unique_keys, first_index, inverse = np.unique(tile_keys, return_index=True, return_inverse=True)
+        tile_ids = np.arange(self.num_targets, self.num_targets + len(unique_keys))
+        for tile_key, tile_id, index in zip(unique_keys.tolist(), tile_ids.tolist(), first_index.tolist()):
+            self.tiles[tile_id] = {
+                "tile_coord": (int(xs[index]), int(ys[index]), self.level),
+                "position": (int(bbox_index[index]), index),
+            }
+        self.num_targets += len(unique_keys)
+        return tile_ids[inverse]
+
+    def get_summary_sums(self, target_id, fields, sums):
+        """
+        :return: The sum and count of the samples of each field for the target, leaving out fields without samples.
+        """
+        target = {}
+        for field in fields:
+            field_sums, counts = sums[field]
+            if counts[target_id]:
+                target[field] = {"sum": float(field_sums[target_id]), "count": int(counts[target_id])}
+        return target
+
+    def get_children(self):
+        """
+        :return: A (key, target) for each task and row of tiles in the order they were first seen, the target of a task
+        is its target id and the target of a row of tiles is a list of ("{x}_{z}", target id) for each tile in the row.
+        """
+        children: List[tuple] = [(self.task_positions[name], name, task_id) for name, task_id in self.task_ids.items()]
+        tile_rows: Dict[str, List[tuple]] = {}
+        for tile_id, tile in sorted(self.tiles.items(), key=lambda item: item[1]["position"]):
+            x, y, z = tile["tile_coord"]
+            if f"tile_{y}" not in tile_rows:
+                tile_rows[f"tile_{y}"] = []
+                children.append((tile["position"], f"tile_{y}", tile_rows[f"tile_{y}"]))
+            tile_rows[f"tile_{y}"].append((f"{x}_{z}", tile_id))
+        return [(key, target) for _, key, target in sorted(children, key=lambda child: child[0])]
+
+    def get_sums(self, rollup_keys):
+        """
+        :param rollup_keys: The keys (e.g. GLOBAL and the provider slug) to return the roll-up sums for.
+        :return: The sum and count of the samples for each key, with the task and tile sums nested under the provider.
+        """
+        fields = ("area", "duration", "size", "mpp")
+        sums = {field: self.store.get_sums(field, self.num_targets) for field in fields}
+
+        provider_children: Dict[str, Any] = {}
+        for key, target in self.get_children():
+            if isinstance(target, list):
+                total_ys: Dict[str, Any] = {}
+                for xz_key, tile_id in target:
+                    total_ys[xz_key] = self.get_summary_sums(tile_id, fields, sums)
+                    total_ys[xz_key]["tile_coord"] = self.tiles[tile_id]["tile_coord"]
+                provider_children[key] = total_ys
+            else:
+                provider_children[key] = self.get_summary_sums(target, ("area", "duration", "size"), sums)
 
-def process_totals_concurrently(provider_slugs, stats):
-    thread = threading.current_thread()
-    executor: Union[Type[ProcessPoolExecutor], Type[ThreadPoolExecutor]] = ThreadPoolExecutor
-    if thread.daemon:
-        executor = ProcessPoolExecutor
-    with executor() as pool:
-        totals = pool.map(
-            process_totals, provider_slugs, itertools.repeat(stats), chunksize=math.ceil(len(provider_slugs) / 8)
-        )
+        totals: Dict[str, Any] = {}
+        for rollup_key in rollup_keys:
+            totals[rollup_key] = self.get_summary_sums(self.ROLLUP_ID, fields, sums)
+            if rollup_key == global_key:
+                totals[rollup_key]["tile_count"] = 0
+            else:
+                totals[rollup_key].update(provider_children)
+                totals[rollup_key]["tile_count"] = len(self.tiles)
         return totals
 
+    def to_dict(self, rollup_keys):
+        """
+        :param rollup_keys: The keys (e.g. GLOBAL and the provider slug) to return the roll-up samples for.
+        :return: The collected data samples for each target, nested the same way as the statistics.
+        """
+        targets: Dict[int, dict] = {self.ROLLUP_ID: {"duration": [], "area": [], "size": [], "mpp": []}}
+        provider_children: Dict[str, Any] = {}
+        for key, target in self.get_children():
+            if isinstance(target, list):
+                provider_children[key] = {}
+                for xz_key, tile_id in target:
+                    tile_coord = self.tiles[tile_id]["tile_coord"]
+                    targets[tile_id] = {"duration": [], "size": [], "mpp": [], "tile_coord": tile_coord}
+                    provider_children[key][xz_key] = targets[tile_id]
+            else:
+                targets[target] = provider_children[key] = {"duration": [], "area": [], "size": [], "mpp": []}
+
+        for field in ("duration", "area", "size", "mpp"):
+            for target_id, value in zip(*self.store.get_samples(field)):
+                targets[int(target_id)][field].append(float(value))
 
-def collect_samples_for_export_task_record(export_task_record: ExportTaskRecord, stats: dict, tile_grid):
+        samples: Dict[str, Any] = {}
+        for rollup_key in rollup_keys:
+            # The roll-ups share the same samples.
+            samples[rollup_key] = targets[self.ROLLUP_ID].copy()
+            if rollup_key != global_key:
+                samples[rollup_key].update(provider_children)
+        return samples
 
-    default_stat = get_default_stat()
-    accessors = get_accessors()
-    global_stats = stats["GLOBAL"]
-    geometry_description = get_geometry_description(export_task_record.export_provider_task.run.job.the_geom)
-    area = geometry_description["area"]
-    provider_stats = get_child_entry(stats, export_task_record.export_provider_task.provider.slug, default_stat)
 
-    task_stats = get_child_entry(provider_stats, export_task_record.name, default_stat)
+def merge_statistics_sums(sums, new_sums):
+    """
+    Adds the sums and counts of newly collected samples to previously collected sums and counts.
+    :param sums: The sums and counts to update, as returned by StatisticsSamples.get_sums
+    :param new_sums: The sums and counts of the new samples
+    :return: The updated sums
+    """
+    for key, value in new_sums.items():
+        if key not in sums or not isinstance(value, dict):
+            sums[key] = value
+        elif "count" in value:
+            sums[key] = {"sum": sums[key]["sum"] + value["sum"], "count": sums[key]["count"] + value["count"]}
+        else:
+            merge_statistics_sums(sums[key], value)
 
-    if has_tiles(export_task_record.name):
-        cache_key = f"{tid_cache_prefix}.{export_task_record.export_provider_task.run}"
-        affected_tile_stats = get_tile_stats(
-            provider_stats, tile_grid, geometry_description["bbox"], True, cache_key=cache_key
+    if "tile_count" in sums:
+        sums["tile_count"] = sum(
+            [len(tiles) for key, tiles in sums.items() if key.startswith("tile_") and isinstance(tiles, dict)]
         )
-    else:
-        affected_tile_stats = []
+    return sums
 
-    collect_samples(
-        export_task_record, affected_tile_stats + [task_stats], ["duration", "area", "size"], accessors, area
-    )
 
-    sz = accessors["size"](export_task_record, area)
-    provider_stats["size"] += [sz]  # Roll-up into provider_task level
-    global_stats["size"] += [sz]  # Roll-up into global level
-
-    # Collect a sample of the megabytes per pixel
-    if has_tiles(export_task_record.name):
-        try:
-            provider = export_task_record.export_provider_task.provider
-            mpp = compute_mpp(provider, geometry_description["bbox"], export_task_record.result.size)
-            if len(provider_stats["mpp"]) < MAX_SAMPLES_PER_TARGET:
-                provider_stats["mpp"] += [mpp]
-            if len(global_stats["mpp"]) < MAX_SAMPLES_PER_TARGET:
-                global_stats["mpp"] += [mpp]
-            for ts in affected_tile_stats:
-                if len(ts["mpp"]) < MAX_SAMPLES_PER_TARGET:
-                    ts["mpp"] += [mpp]
-
-        except ObjectDoesNotExist:
-            pass
-    return stats
-
-
-def collect_samples_for_export_task_records(export_task_records, stats, tile_grid):
-    # Can't do this concurrently because proj can't be pickled (i.e. tile_grid)
-    return map(
-        collect_samples_for_export_task_record,
-        export_task_records,
-        itertools.repeat(stats),
-        itertools.repeat(tile_grid),
-    )
+def get_statistics_totals(sums):
+    """
+    :param sums: The sums and counts of the samples, as returned by StatisticsSamples.get_sums
+    :return: The statistics with the mean of each field in place of its sum and count
+    """
+    totals: Dict[str, Any] = {}
+    for key, value in sums.items():
+        if isinstance(value, dict) and "count" in value:
+            totals[key] = {"mean": value["sum"] / value["count"]}
+        elif isinstance(value, dict):
+            totals[key] = get_statistics_totals(value)
+        else:
+            totals[key] = value
+    return totals
 
 
 def get_child_entry(parent, key, default=None):
@@ -333,6 +670,23 @@ def get_tile_stats(parent, tile_grid, bbox, create_if_absent=False, cache_key=No
         return [x for x in tile_stats if x is not None]
 
 
+@lru_cache(maxsize=256)
+def get_tile_weights(tile_grid, bbox):
+    """
+    :param tile_grid: The tile grid
+    :param bbox: Query bounding box in the srs of the tile grid
+    :return: The (tile_coord, weight) of each tile intersecting the bbox, weighted by its % overlap with the bbox
+    """
+    bbox_area = get_area_bbox(bbox)
+    affected_tiles = tile_grid.get_affected_level_tiles(bbox, tile_grid.levels - 1)  # Use highest res grid
+
+    tile_weights = []
+    for tile_coord in filter(None, affected_tiles[2]):
+        inter = get_bbox_intersect(bbox, tile_grid.tile_bbox(tile_coord, True))
+        tile_weights += [(tile_coord, get_area_bbox(inter) / bbox_area)]
+    return tuple(tile_weights)
+
+
 def get_tile_stat(parent, tile_coord, create_if_absent=False):
     """
     :param parent: Parent dictionary
@@ -354,28 +708,6 @@ def get_tile_stat(parent, tile_coord, create_if_absent=False):
     return xz_s
 
 
-def collect_samples(item, targets, fields, accessors, area):
-    """
-    Appends data points to the list of samples on each target object
-    :param item: Item containing a single data point for each field in fields
-    :param targets: List of objects collecting the data points
-    :param fields: List of fields to collect
-    :param accessors: Dictionary of access method applied to item to generate a data point
-    :param area: The area in sq. km used for normalizing data points (e.g. size per sq km)
-    """
-    for i in range(0, len(fields)):
-        # Get the value for this field
-        field = fields[i]
-        sample = accessors[field](item, area)
-
-        if sample:
-            # Append to to each target that is interested in that value
-            for target in targets:
-                if field in target and len(target[field]) < MAX_SAMPLES_PER_TARGET:
-                    target[field] += [sample]
-    return targets
-
-
 def compute_mpp(provider, bbox, size_mb, srs="4326", with_clipping=True):
     """
     Computes the megabytes per pixel within the specified bounding box
@@ -401,30 +733,65 @@ def get_total_num_pixels(tile_grid, bbox, srs="4326", with_clipping=True):
                           the bbox excluded.  False will use all pixels from tiles that intersect the bbox
     :return: Total number of pixels
     """
+    return _get_total_num_pixels(tile_grid, tuple(bbox), str(srs), with_clipping)
+
+
+@lru_cache(maxsize=4096)
+def _get_total_num_pixels(tile_grid, bbox, srs, with_clipping):
     grid_bbox = mapproxy_grid.grid_bbox(bbox, mapproxy_srs.SRS(srs), tile_grid.srs)
+    return sum([get_level_num_pixels(tile_grid, grid_bbox, lvl, with_clipping) for lvl in range(0, tile_grid.levels)])
 
-    # Determine all affected tiles across all provider levels
-    total_pixels = 0
-    px_per_tile = tile_grid.tile_size[0] * tile_grid.tile_size[1]
 
-    for lvl in range(0, tile_grid.levels):
-        result = tile_grid.get_affected_level_tiles(grid_bbox, int(lvl))
-        tile_coords = result[2]
+def get_level_num_pixels(tile_grid, grid_bbox, level, with_clipping=True):
+    """
+    Determine the number of pixels in a level of the tile_grid that are within the bounding box.  The fraction of a
+    tile's area within the bbox is the fraction of its width times the fraction of its height within the bbox, so
+    every column and row of tiles is only visited once and only the edge columns and rows need to be clipped.
+    :param tile_grid: The tile grid
+    :param grid_bbox: The bounding box defining the export region in the srs of the tile grid
+    :param level: The level of the tile grid
+    :param with_clipping: see get_total_num_pixels
+    :return: The number of pixels
+    """
+    # remove 1/10 of a pixel so we don't get a tiles we only touch
+    delta = tile_grid.resolution(level) / 10.0
+    x0, y0, _ = tile_grid.tile(grid_bbox[0] + delta, grid_bbox[1] + delta, level)
+    x1, y1, _ = tile_grid.tile(grid_bbox[2] - delta, grid_bbox[3] - delta, level)
+    xs = range(x0, x1 + 1)
+    ys = range(y1, y0 + 1) if tile_grid.flipped_y_axis else range(y0, y1 + 1)
+    if not xs or not ys:
+        raise mapproxy_grid.GridError("Invalid BBOX")
 
-        if with_clipping:
-            # Determine number of pixels contained in the bbox ONLY
-            for tile_coord in tile_coords:
-                tile_bbox = tile_grid.tile_bbox(tile_coord, True)
-                i = get_bbox_intersect(grid_bbox, tile_bbox)
+    px_per_tile = tile_grid.tile_size[0] * tile_grid.tile_size[1]
+    if not with_clipping:
+        return px_per_tile * len(xs) * len(ys)
+
+    # Tiles outside of the grid don't exist.
+    grid_width, grid_height = tile_grid.grid_sizes[level]
+    xs = range(max(xs.start, 0), min(xs.stop, grid_width))
+    ys = range(max(ys.start, 0), min(ys.stop, grid_height))
+    if not xs or not ys:
+        return 0
+
+    def column_coverage(x):
+        tile_x0, _, tile_x1, _ = tile_grid.tile_bbox((x, ys[0], level), True)
+        return (min(tile_x1, grid_bbox[2]) - max(tile_x0, grid_bbox[0])) / (tile_x1 - tile_x0)
+
+    def row_coverage(y):
+        # Areas are geodesic (see get_area_bbox), so the height of a row is measured as the sine of its latitude.
+        _, tile_y0, _, tile_y1 = tile_grid.tile_bbox((xs[0], y, level), True)
+        covered = math.sin(math.radians(min(tile_y1, grid_bbox[3]))) - math.sin(
+            math.radians(max(tile_y0, grid_bbox[1]))
+        )
+        return covered / (math.sin(math.radians(tile_y1)) - math.sin(math.radians(tile_y0)))
 
-                # Assume uniform spacing of pixels in the tile
-                tile_num_px = (get_area_bbox(i) / get_area_bbox(tile_bbox)) * px_per_tile
-                total_pixels += tile_num_px
-        else:
-            num_tiles = result[1][0] * result[1][1]  # xdim * ydim
-            total_pixels += px_per_tile * num_tiles
+    def get_coverage(tiles, coverage):
+        # Only the tiles on the edges can be partially within the bbox.
+        if len(tiles) == 1:
+            return coverage(tiles[0])
+        return coverage(tiles[0]) + coverage(tiles[-1]) + len(tiles) - 2
 
-    return total_pixels
+    return px_per_tile * get_coverage(xs, column_coverage) * get_coverage(ys, row_coverage)
 
 
 def get_summary_stats(input_item, fields):
@@ -491,14 +858,14 @@ def get_provider_grid(provider, min_zoom=None, max_zoom=None):
         res = config.get("grids", {}).get("default", {}).get("res", [])[min_zoom:max_zoom]
         if not res:
             levels = list(range(min_zoom, max_zoom))
-            tmp = mapproxy_grid.tile_grid_for_epsg("EPSG:4326")
+            tmp = get_tile_grid()
             res = list(map(lambda l: tmp.resolution(l), levels))
     except Exception as e:
         logger.warning("Error getting resolutions from mapproxy grid.")
         logger.error(e)
         res = None
 
-    return mapproxy_grid.tile_grid_for_epsg("EPSG:4326", tile_size=(256, 256), res=res)
+    return get_tile_grid(tuple(res) if res is not None else None)
 
 
 def query(
@@ -552,9 +919,13 @@ def query(
             # We have some statistics specific to this group (e.g. osm, wms, etc)
             tile_grid = get_default_tile_grid()
             req_bbox = mapproxy_grid.grid_bbox(bbox, mapproxy_srs.SRS(bbox_srs), tile_grid.srs)
-            req_area = get_area_bbox(req_bbox)
 
-            affected_tiles = get_tile_stats(provider_stats, tile_grid, req_bbox)
+            affected_tiles = []
+            for tile_coord, weight in get_tile_weights(tile_grid, req_bbox):
+                tile_stat = get_tile_stat(provider_stats, tile_coord)
+                if tile_stat is not None:
+                    affected_tiles += [(tile_stat, weight)]
+
             if affected_tiles and len(affected_tiles) > 0:
                 # We have some stats specific to this group, at tiles within the user-defined region
                 # We want to weight tile-specific statistics based on its % overlap with the bbox
@@ -563,13 +934,9 @@ def query(
                 values = []
                 stat_value = 0.0
 
-                for tile_stat in affected_tiles:
+                for tile_stat, weight in affected_tiles:
                     t_val = get_value(tile_stat)
                     if t_val is not None:
-                        tile_coord = tile_stat["tile_coord"]
-                        inter = get_bbox_intersect(req_bbox, tile_grid.tile_bbox(tile_coord, True))
-                        weight = get_area_bbox(inter) / req_area
-
                         stat_value += weight * t_val
                         values += [t_val]
                         total_weight += weight
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 import math
@@ -115,5 +116,38 @@ def get_bbox_intersect(one, two):
 
 def get_estimate_cache_key(bbox, srs, min_zoom, max_zoom, slug):
     estimate_tuple = (tuple(bbox), int(srs), int(min_zoom), int(max_zoom), str(slug))
-    hash_val = hash(estimate_tuple)
+    # hash() of a str is salted per process, so use a digest which is the same for every process sharing the cache.
+    hash_val = hashlib.md5(repr(estimate_tuple).encode()).hexdigest()
     return str(hash_val)
+
+
+def get_quantized_bbox(bbox, srs="4326", precision=3):
+    """
+    Snaps a bounding box outward to a grid scaled to the size of each of its axes, so that nearly identical bounding
+    boxes (e.g. while dragging an AOI) share the same estimate cache key. Each axis grows by less than 2% at the default
+    precision, the bbox itself should still be used to compute the estimates.
+    :param bbox: bounding box tuple (w, s, e, n)
+    :param srs: The srs of the bounding box
+    :param precision: The number of significant digits of the bbox's width and height to keep
+    :return: The quantized bounding box tuple (w, s, e, n)
+    """
+    w, s, e, n = map(float, bbox)
+    w, e = quantize_extent(w, e, precision)
+    s, n = quantize_extent(s, n, precision)
+    if str(srs) == "4326":
+        w, s, e, n = max(w, -180.0), max(s, -90.0), min(e, 180.0), min(n, 90.0)
+    return w, s, e, n
+
+
+def quantize_extent(low, high, precision):
+    """
+    Snaps the extent of an axis outward to a step of precision significant digits of its size.
+    """
+    size = high - low
+    if size <= 0:
+        return low, high
+    digits = precision - 1 - math.floor(math.log10(size))
+    step = 10.0**-digits
+    # Rounded first so that an edge already on the grid isn't moved by floating point error.
+    low, high = math.floor(round(low / step, 9)), math.ceil(round(high / step, 9))
+    return round(low * step, digits), round(high * step, digits)
@@ -0,0 +1,115 @@
+import random
+import time
+import unittest
+from unittest.mock import patch
+
+from eventkit_cloud.utils.stats.eta_estimator import ETA
+
+
+class IterativeETA(ETA):
+    """
+    The original ETA update which applies the decay one tick at a time, used as a reference for the closed form update.
+    """
+
+    def update(self, progress, dbg_msg=""):
+        self.progress = progress
+        missing_ticks = (self.progress * self.ticks) - self.tick_count
+        if missing_ticks:
+            tick_duration = (time.time() - self.last_tick_start) / missing_ticks
+
+            while missing_ticks > 0:
+                self.tick_duration_sums *= 0.999
+                self.tick_duration_divisor *= 0.999
+
+                self.tick_count += 1
+
+                self.tick_duration_sums += tick_duration
+                self.tick_duration_divisor += 1
+
+                missing_ticks -= 1
+
+            self.last_tick_start = time.time()
+
+
+def get_progress_trace(num_updates=200, seed=None):
+    """
+    Creates a synthetic progress trace of (time, progress) pairs, with a mix of small steps, large jumps (e.g. Overpass
+    jumping to 85%) and stalls.
+    :param num_updates: The number of updates in the trace.
+    :param seed: The seed to the prng generating the trace.
+    :return: A list of (timestamp, progress) tuples.
+    """
+    rng = random.Random(seed)
+    timestamp = 1000.0
+    progress = 0.0
+    trace = []
+    for _ in range(num_updates):
+        timestamp += rng.uniform(0.1, 30.0)
+        step = rng.choice([0.0, rng.uniform(0.0001, 0.01), rng.uniform(0.05, 0.5)])
+        progress = min(progress + step, 1.0)
+        trace.append((timestamp, progress))
+    return trace
+
+
+def run_progress_trace(eta, trace):
+    """
+    Updates the eta with every point in the trace.
+    :return: The eta after each update.
+    """
+    estimates = []
+    with patch("eventkit_cloud.utils.stats.eta_estimator.time.time") as mock_time:
+        for timestamp, progress in trace:
+            mock_time.return_value = timestamp
+            eta.update(progress)
+            estimates.append(eta.eta())
+    return estimates
+
+
+def perf_benchmark(num_traces=20, num_updates=200, seed=None):
+    """
+    Benchmarks the cost (time) of updating the iterative and closed form ETA estimators over synthetic progress traces.
+    :param num_traces: The number of traces to run.
+    :param num_updates: The number of updates in each trace.
+    :param seed: The seed to the prng generating the traces.
+    :return: The total time and time per update measured in seconds for each implementation.
+    """
+    traces = [get_progress_trace(num_updates, seed=(seed or 0) + index) for index in range(num_traces)]
+    results = {}
+    for name, eta_class in [("iterative", IterativeETA), ("closed_form", ETA)]:
+        start = time.perf_counter()
+        for trace in traces:
+            run_progress_trace(eta_class(start_time=trace[0][0]), trace)
+        total_time = time.perf_counter() - start
+        results[name] = {"total_time": total_time, "time_per_update": total_time / (num_traces * num_updates)}
+    return results
+
+
+class TestETA(unittest.TestCase):
+    def test_update_matches_iterative_update(self):
+        for seed in range(10):
+            trace = get_progress_trace(seed=seed)
+            expected_eta = IterativeETA(start_time=trace[0][0])
+            eta = ETA(start_time=trace[0][0])
+            expected_estimates = run_progress_trace(expected_eta, trace)
+            estimates = run_progress_trace(eta, trace)
+
+            self.assertEqual(expected_eta.tick_count, eta.tick_count)
+            self.assertAlmostEqual(expected_eta.tick_duration_divisor, eta.tick_duration_divisor, places=6)
+            for expected_estimate, estimate in zip(expected_estimates, estimates):
+                if expected_estimate is None:
+                    self.assertIsNone(estimate)
+                else:
+                    self.assertAlmostEqual(expected_estimate, estimate, places=3)
+
+    def test_update_jump(self):
+        eta = ETA(start_time=0.0)
+        with patch("eventkit_cloud.utils.stats.eta_estimator.time.time") as mock_time:
+            mock_time.return_value = 85.0
+            eta.update(0.85)
+        self.assertEqual(8500, eta.tick_count)
+        # At a constant rate of 1% every second the task should be done 15 seconds later.
+        self.assertAlmostEqual(100.0, eta.eta(), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
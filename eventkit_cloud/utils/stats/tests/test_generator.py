@@ -0,0 +1,201 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from mapproxy import grid as mapproxy_grid
+
+from eventkit_cloud.utils.stats.generator import (
+    SampleStore,
+    get_bbox_tiles,
+    get_default_tile_grid,
+    get_sample_ranks,
+    get_statistics_totals,
+    get_tile_grid,
+    get_total_num_pixels,
+    global_key,
+    merge_statistics_sums,
+    update_statistics,
+)
+from eventkit_cloud.utils.stats.geomutils import get_area_bbox, get_bbox_intersect
+
+
+def get_total_num_pixels_per_tile(tile_grid, bbox):
+    """
+    The original pixel count which clips every affected tile, used as a reference for the closed form pixel count.
+    """
+    total_pixels = 0
+    px_per_tile = tile_grid.tile_size[0] * tile_grid.tile_size[1]
+    for lvl in range(0, tile_grid.levels):
+        for tile_coord in tile_grid.get_affected_level_tiles(bbox, lvl)[2]:
+            tile_bbox = tile_grid.tile_bbox(tile_coord, True)
+            i = get_bbox_intersect(bbox, tile_bbox)
+            total_pixels += (get_area_bbox(i) / get_area_bbox(tile_bbox)) * px_per_tile
+    return total_pixels
+
+
+class TestGenerator(unittest.TestCase):
+    def test_get_bbox_tiles(self):
+        bboxes = [
+            [-1.0, -1.0, 1.0, 1.0],
+            [10.1, 20.2, 10.3, 20.4],
+            [0.0, 0.0, 0.05, 0.05],
+            # At the edge of the grid.
+            [179.5, 89.5, 180.0, 90.0],
+        ]
+        tile_grids = [
+            get_default_tile_grid(),
+            get_default_tile_grid(level=5),
+            mapproxy_grid.TileGrid(srs=4326, bbox=(-180, -90, 180, 90), res=[0.01], origin="ul"),
+        ]
+        for tile_grid in tile_grids:
+            level = tile_grid.levels - 1
+            expected_tiles = []
+            for index, bbox in enumerate(bboxes):
+                affected_tiles = tile_grid.get_affected_level_tiles(bbox, level)[2]
+                expected_tiles += [(index, x, y) for x, y, _ in filter(None, affected_tiles)]
+
+            bbox_index, xs, ys = get_bbox_tiles(tile_grid, np.array(bboxes), level)
+            self.assertEqual(expected_tiles, list(zip(bbox_index.tolist(), xs.tolist(), ys.tolist())))
+
+    def test_get_sample_ranks(self):
+        ranks = get_sample_ranks(np.array([3, 1, 3, 3, 0, 1]))
+        self.assertEqual([0, 0, 1, 2, 0, 1], ranks.tolist())
+
+    def test_sample_store(self):
+        store = SampleStore(max_samples=2)
+        store.add("size", [0, 1, 0, 0], [1.0, 2.0, 3.0, 5.0])
+        store.add("size", 1, [4.0, 6.0])
+        store.add("size", 2, [1.0, 2.0, 3.0], capped=False)
+        store.add("duration", [], [])
+
+        target_ids, values = store.get_samples("size")
+        self.assertEqual([0, 1, 0, 1, 2, 2, 2], target_ids.tolist())
+        self.assertEqual([1.0, 2.0, 3.0, 4.0, 1.0, 2.0, 3.0], values.tolist())
+
+        sums, counts = store.get_sums("size", 4)
+        self.assertEqual([4.0, 6.0, 6.0, 0.0], sums.tolist())
+        self.assertEqual([2, 2, 3, 0], counts.tolist())
+
+        sums, counts = store.get_sums("duration", 4)
+        self.assertEqual([0, 0, 0, 0], counts.tolist())
+
+    def test_merge_statistics_sums(self):
+        sums = {
+            "GLOBAL": {"size": {"sum": 4.0, "count": 2}, "tile_count": 0},
+            "osm": {
+                "size": {"sum": 4.0, "count": 2},
+                "Geopackage (.gpkg)": {"size": {"sum": 4.0, "count": 2}},
+                "tile_1": {"2_10": {"size": {"sum": 4.0, "count": 2}, "tile_coord": [2, 1, 10]}},
+                "tile_count": 1,
+            },
+        }
+        new_sums = {
+            "GLOBAL": {"size": {"sum": 2.0, "count": 2}, "mpp": {"sum": 1.0, "count": 1}, "tile_count": 0},
+            "osm": {
+                "size": {"sum": 2.0, "count": 2},
+                "mpp": {"sum": 1.0, "count": 1},
+                "Geopackage (.gpkg)": {"size": {"sum": 2.0, "count": 2}},
+                "tile_1": {
+                    "2_10": {"size": {"sum": 2.0, "count": 2}, "tile_coord": [2, 1, 10]},
+                    "3_10": {"size": {"sum": 2.0, "count": 2}, "tile_coord": [3, 1, 10]},
+                },
+                "tile_2": {"3_10": {"size": {"sum": 2.0, "count": 2}, "tile_coord": [3, 2, 10]}},
+                "tile_count": 3,
+            },
+        }
+        expected_totals = {
+            "GLOBAL": {"size": {"mean": 1.5}, "tile_count": 0, "mpp": {"mean": 1.0}},
+            "osm": {
+                "size": {"mean": 1.5},
+                "Geopackage (.gpkg)": {"size": {"mean": 1.5}},
+                "tile_1": {
+                    "2_10": {"size": {"mean": 1.5}, "tile_coord": [2, 1, 10]},
+                    "3_10": {"size": {"mean": 1.0}, "tile_coord": [3, 1, 10]},
+                },
+                "tile_count": 3,
+                "mpp": {"mean": 1.0},
+                "tile_2": {"3_10": {"size": {"mean": 1.0}, "tile_coord": [3, 2, 10]}},
+            },
+        }
+        totals = get_statistics_totals(merge_statistics_sums(sums, new_sums))
+        self.assertEqual(expected_totals, totals)
+
+    def test_get_total_num_pixels(self):
+        default_grid = get_tile_grid()
+        tile_grid = get_tile_grid(tuple(default_grid.resolution(level) for level in range(3, 12)))
+        self.assertIs(tile_grid, get_tile_grid(tuple(default_grid.resolution(level) for level in range(3, 12))))
+
+        bboxes = [(-1.0, -1.0, 1.0, 1.0), (10.1, 20.2, 12.3, 20.4), (170.0, 80.0, 180.0, 90.0), (5.0, 5.0, 5.01, 5.01)]
+        for bbox in bboxes:
+            expected_pixels = get_total_num_pixels_per_tile(tile_grid, bbox)
+            self.assertAlmostEqual(1.0, get_total_num_pixels(tile_grid, bbox) / expected_pixels, places=9)
+
+            # Without clipping every pixel of an affected tile is counted.
+            expected_pixels = 0
+            for level in range(tile_grid.levels):
+                width, height = tile_grid.get_affected_level_tiles(bbox, level)[1]
+                expected_pixels += 256 * 256 * width * height
+            self.assertEqual(expected_pixels, get_total_num_pixels(tile_grid, bbox, with_clipping=False))
+
+    @patch("eventkit_cloud.utils.stats.generator.timezone.now")
+    @patch("eventkit_cloud.utils.stats.generator.cache")
+    @patch("eventkit_cloud.utils.stats.generator.collect_statistics_samples")
+    def test_update_statistics(self, mock_collect_statistics_samples, mock_cache, mock_now):
+        cached = {}
+        mock_cache.get.side_effect = cached.get
+        mock_cache.set.side_effect = lambda key, value, timeout=None: cached.update({key: value})
+        start = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+        mock_now.return_value = start
+
+        def get_samples(count):
+            samples = MagicMock()
+            samples.get_sums.return_value = {global_key: {"size": {"sum": float(count), "count": count}}}
+            return samples
+
+        # The first update collects everything.
+        mock_collect_statistics_samples.return_value = (
+            get_samples(2),
+            [global_key],
+            {1: start - datetime.timedelta(minutes=30), 2: start - datetime.timedelta(minutes=10)},
+        )
+        totals = update_statistics("osm")
+        mock_collect_statistics_samples.assert_called_once_with("osm", finished_after=None, counted_ids=[])
+        self.assertEqual({"mean": 1.0}, totals[global_key]["size"])
+
+        # The next update reads the overlap again, skipping the tasks already counted, and gets task 3 which finished
+        # before task 2 but was committed after it.
+        mock_collect_statistics_samples.reset_mock()
+        mock_collect_statistics_samples.return_value = (
+            get_samples(1),
+            [global_key],
+            {3: start - datetime.timedelta(minutes=20)},
+        )
+        update_statistics("osm")
+        mock_collect_statistics_samples.assert_called_once_with(
+            "osm", finished_after=start - datetime.timedelta(minutes=70), counted_ids=[1, 2]
+        )
+        state = cached["osm_data_statistics_state"]
+        self.assertEqual(3, state["sums"][global_key]["size"]["count"])
+        # The watermark doesn't move back for a task which finished earlier.
+        self.assertEqual(start - datetime.timedelta(minutes=10), state["finished_at"])
+
+        # Tasks which finished before the overlap of the last one aren't kept.
+        mock_collect_statistics_samples.reset_mock()
+        mock_collect_statistics_samples.return_value = (
+            get_samples(1),
+            [global_key],
+            {4: start + datetime.timedelta(minutes=45)},
+        )
+        update_statistics("osm")
+        mock_collect_statistics_samples.assert_called_once_with(
+            "osm", finished_after=start - datetime.timedelta(minutes=70), counted_ids=[1, 2, 3]
+        )
+        state = cached["osm_data_statistics_state"]
+        self.assertEqual(start + datetime.timedelta(minutes=45), state["finished_at"])
+        self.assertEqual([2, 4], sorted(state["counted"]))
+        self.assertEqual(4, state["sums"][global_key]["size"]["count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
+from random import Random
 
-from eventkit_cloud.utils.stats.geomutils import get_estimate_cache_key
+from eventkit_cloud.utils.stats.geomutils import get_estimate_cache_key, get_quantized_bbox
 
 
 class MyTestCase(unittest.TestCase):
@@ -9,6 +10,35 @@ class MyTestCase(unittest.TestCase):
         cache_key_2 = get_estimate_cache_key(bbox=(1, 2, 3), srs="1234", min_zoom=2, max_zoom=10, slug="osm")
         self.assertEqual(cache_key_1, cache_key_2)
 
+    def test_get_quantized_bbox(self):
+        # Each axis is snapped outward to three significant digits of its own size.
+        self.assertEqual((10.123, 20.543, 10.346, 20.679), get_quantized_bbox((10.1234, 20.5432, 10.3456, 20.6789)))
+        self.assertEqual((-129.6, -44.2, -100.3, 9.9), get_quantized_bbox((-129.6, -44.2, -100.3, 9.9)))
+        self.assertEqual((0.0, 0.0, 9.9, 0.06), get_quantized_bbox((0.0, 0.0, 9.9, 0.06)))
+        self.assertEqual(
+            get_quantized_bbox((10.12341, 20.54321, 10.34561, 20.67891)),
+            get_quantized_bbox((10.12345, 20.54325, 10.34565, 20.67895)),
+        )
+        self.assertEqual((-180.0, -90.0, 180.0, 90.0), get_quantized_bbox((-179.99, -89.99, 179.99, 89.99)))
+
+    def test_get_quantized_bbox_area(self):
+        def get_area(bbox):
+            return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+
+        random = Random(4326)
+        bboxes = [(0.0, 0.0, 1.01, 1.01), (0.01, 0.01, 9.91, 0.07)]
+        for _ in range(1000):
+            w, s = random.uniform(-170, 160), random.uniform(-80, 70)
+            bboxes.append((w, s, w + 10 ** random.uniform(-4, 1), s + 10 ** random.uniform(-4, 1)))
+        for bbox in bboxes:
+            quantized_bbox = get_quantized_bbox(bbox)
+            # The quantized bbox contains the bbox, and its area is at most about 4% larger.
+            self.assertLessEqual(quantized_bbox[0], bbox[0])
+            self.assertLessEqual(quantized_bbox[1], bbox[1])
+            self.assertGreaterEqual(quantized_bbox[2], bbox[2])
+            self.assertGreaterEqual(quantized_bbox[3], bbox[3])
+            self.assertLess(get_area(quantized_bbox) / get_area(bbox), 1.0405)
+
 
 if __name__ == "__main__":
     unittest.main()
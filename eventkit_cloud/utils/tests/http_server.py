@@ -0,0 +1,62 @@
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Type
+
+
+class LocalServer(ThreadingHTTPServer):
+    """
+    A local HTTP server which records the requests answered by its handler and how many were being served at once.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler_class: Type[BaseHTTPRequestHandler], latency: float = 0, path: str = ""):
+        super().__init__(("127.0.0.1", 0), handler_class)
+        self.latency = latency
+        self.path = path
+        self.lock = threading.Lock()
+        self.requests: list = []
+        self.active_requests = 0
+        self.max_active_requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}{self.path}"
+
+    @contextmanager
+    def serving(self, params: dict):
+        """
+        Records a request and how many requests were being served at once.
+        """
+        with self.lock:
+            self.requests.append(params)
+            self.active_requests += 1
+            self.max_active_requests = max(self.max_active_requests, self.active_requests)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active_requests -= 1
+
+
+@contextmanager
+def local_server(
+    handler_class: Type[BaseHTTPRequestHandler], latency: float = 0, path: str = ""
+) -> Iterator[LocalServer]:
+    """
+    Runs a local HTTP server in a background thread, useful for exercising clients without a network.
+    :param handler_class: The request handler, it should answer within self.server.serving and wait self.server.latency.
+    :param latency: The number of seconds the server waits before answering each request.
+    :param path: The path of the service, appended to the url of the server.
+    :return: The server.
+    """
+    server = LocalServer(handler_class, latency=latency, path=path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
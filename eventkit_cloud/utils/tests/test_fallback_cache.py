@@ -1,20 +1,154 @@
 from unittest.mock import patch
 
 from django.core.cache import caches
-from django.test import TestCase
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from pymemcache.exceptions import MemcacheServerError, MemcacheUnexpectedCloseError
 
-from eventkit_cloud.utils.fallback_cache import get_cache
+from eventkit_cloud.utils.fallback_cache import cache_health, get_cache, get_cache_metrics
 
 
+class OutageCache(LocMemCache):
+    """
+    A local cache which refuses connections while it is down, like memcached during an outage.
+    """
+
+    down = False
+    error: Exception = ConnectionRefusedError("The cache is down.")
+    calls = 0
+
+    def _check(self):
+        OutageCache.calls += 1
+        if OutageCache.down:
+            raise OutageCache.error
+
+    def get(self, *args, **kwargs):
+        self._check()
+        return super().get(*args, **kwargs)
+
+    def set(self, key, value, *args, **kwargs):
+        self._check()
+        if isinstance(value, bytes) and len(value) > 1024:
+            raise MemcacheServerError("object too large for cache")
+        return super().set(key, value, *args, **kwargs)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "eventkit_cloud.utils.fallback_cache.FallbackCache"},
+        "primary_cache": {
+            "BACKEND": "eventkit_cloud.utils.tests.test_fallback_cache.OutageCache",
+            "LOCATION": "primary",
+        },
+        "fallback_cache": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "fallback"},
+    },
+    FALLBACK_CACHE_HEALTH_TTL=10,
+    FALLBACK_CACHE_RETRY_INTERVAL=5,
+    FALLBACK_CACHE_MAX_RETRY_INTERVAL=20,
+)
 class TestFallbackCache(TestCase):
-    def test_get_cache(self):
-        with patch.object(caches.__getitem__("primary_cache"), "get") as mock_get_cache:
+    def setUp(self):
+        cache_health.reset()
+        OutageCache.down = False
+        OutageCache.error = ConnectionRefusedError("The cache is down.")
+        OutageCache.calls = 0
+        self.addCleanup(cache_health.reset)
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_get_cache(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        with patch.object(caches["primary_cache"], "get") as mock_get_cache:
             # Test that we use the primary cache.
             mock_get_cache.return_value = True
             cache = get_cache()
             self.assertEqual(cache, caches["primary_cache"])
 
-            # Test that we use the fallback cache.
+            # Test that we use the fallback cache once the health of the primary cache is checked again.
+            mock_monotonic.return_value = 111
             mock_get_cache.return_value = False
             cache = get_cache()
             self.assertEqual(cache, caches["fallback_cache"])
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_healthy_primary_cache(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        caches["default"].set("key", "value")
+        OutageCache.calls = 0
+
+        # Only the operation itself goes to the primary cache while its health is known.
+        self.assertEqual(caches["default"].get("key"), "value")
+        self.assertEqual(caches["default"].get("key"), "value")
+        self.assertEqual(OutageCache.calls, 2)
+
+        # The health is checked again after the TTL.
+        mock_monotonic.return_value = 111
+        self.assertEqual(caches["default"].get("key"), "value")
+        self.assertEqual(OutageCache.calls, 5)
+        self.assertEqual(get_cache_metrics()["primary_probes"], 2)
+        self.assertNotIn("fallback_operations", get_cache_metrics())
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_primary_cache_outage(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        caches["default"].set("key", "primary")
+        caches["fallback_cache"].set("key", "fallback")
+
+        # The operation is made again on the fallback cache when the primary cache fails during it.
+        OutageCache.down = True
+        OutageCache.calls = 0
+        self.assertEqual(caches["default"].get("key"), "fallback")
+        self.assertEqual(OutageCache.calls, 1)
+
+        # The primary cache isn't tried again until the retry interval has passed.
+        mock_monotonic.return_value = 104
+        self.assertEqual(caches["default"].get("key"), "fallback")
+        self.assertEqual(OutageCache.calls, 1)
+
+        # The retry interval doubles while the primary cache is still down.
+        mock_monotonic.return_value = 105
+        self.assertEqual(caches["default"].get("key"), "fallback")
+        self.assertEqual(OutageCache.calls, 2)
+        mock_monotonic.return_value = 114
+        self.assertEqual(caches["default"].get("key"), "fallback")
+        self.assertEqual(OutageCache.calls, 2)
+
+        # The primary cache is used again once it recovers.
+        OutageCache.down = False
+        mock_monotonic.return_value = 115
+        self.assertEqual(caches["default"].get("key"), "primary")
+
+        metrics = get_cache_metrics()
+        self.assertEqual(metrics["primary_failures"], 2)
+        self.assertEqual(metrics["fallback_operations"], 4)
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_max_retry_interval(self, mock_monotonic):
+        OutageCache.down = True
+        for now in [100, 105, 115, 135, 155]:
+            mock_monotonic.return_value = now
+            get_cache()
+        self.assertEqual(get_cache_metrics()["primary_probes"], 5)
+        self.assertEqual(cache_health.retry_at, 175)
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_primary_cache_closed_connection(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        caches["fallback_cache"].set("key", "fallback")
+        OutageCache.down = True
+        OutageCache.error = MemcacheUnexpectedCloseError()
+
+        self.assertEqual(caches["default"].get("key"), "fallback")
+        self.assertEqual(get_cache_metrics()["primary_failures"], 1)
+
+    @patch("eventkit_cloud.utils.fallback_cache.time.monotonic")
+    def test_primary_cache_operation_error(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        caches["default"].set("key", "primary")
+
+        # A value the primary cache refuses raises the error, without sending other operations to the fallback cache.
+        with self.assertRaises(MemcacheServerError):
+            caches["default"].set("snapshot", b"0" * 2048)
+        self.assertIsNone(caches["fallback_cache"].get("snapshot"))
+        self.assertEqual(caches["default"].get("key"), "primary")
+        self.assertNotIn("primary_failures", get_cache_metrics())
+        self.assertNotIn("fallback_operations", get_cache_metrics())
@@ -443,3 +443,14 @@ class TestGeoCode(TestCase):
         ]
 
         self.geocode_test(nominatim_response)
+
+    @override_settings(GEOCODING_API_URL="mock://pelias.url/", GEOCODING_API_TYPE="pelias", GEOCODING_CACHE_TIMEOUT=60)
+    @patch("eventkit_cloud.utils.geocoding.geocode_auth_response.get_or_update_session")
+    def test_search_cached(self, mock_get_session):
+        mock_get_session.return_value = self.session
+        api_response = {"features": [{"type": "Feature", "geometry": None, "properties": {}}]}
+        self.adapter.register_uri("GET", settings.GEOCODING_API_URL, text=json.dumps(api_response), status_code=200)
+
+        result = Geocode().search("Boston")
+        self.assertEqual(result, Geocode().search(" boston "))
+        self.assertEqual(self.adapter.call_count, 1)
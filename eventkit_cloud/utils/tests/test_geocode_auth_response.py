@@ -2,13 +2,16 @@ import logging
 import os
 from unittest.mock import MagicMock, Mock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from eventkit_cloud.utils.geocoding.geocode_auth_response import (
     GeocodeAuthResponse,
     check_data,
+    geocoding_sessions,
     get_auth_response,
     get_cached_response,
+    get_cached_search,
+    get_geocoding_session,
 )
 
 logger = logging.getLogger(__name__)
@@ -101,3 +104,55 @@ class TestGeoCodeAuthResponse(TestCase):
         self.assertTrue(check_data(example_response))
         example_response.json.return_value = {"something": []}
         self.assertFalse(check_data(example_response))
+
+    @override_settings(GEOCODING_CACHE_TIMEOUT=60)
+    def test_get_cached_search(self):
+        example_url = "http://geocoder.test/search"
+        expected_result = {"type": "FeatureCollection", "features": [{"type": "Feature"}]}
+        mock_search = Mock(return_value=expected_result)
+
+        self.assertEqual(expected_result, get_cached_search(example_url, "Boston, MA", mock_search))
+        # Searches which only differ by case or whitespace are answered from the cache.
+        self.assertEqual(expected_result, get_cached_search(example_url, "  boston,   ma ", mock_search))
+        mock_search.assert_called_once_with("Boston, MA")
+
+        # Other geocoders and parameters aren't.
+        get_cached_search("http://other.test/search", "Boston, MA", mock_search)
+        get_cached_search(example_url, {"lat": "42.36", "lon": "-71.06"}, mock_search)
+        self.assertEqual(
+            expected_result, get_cached_search(example_url, {"lon": "-71.06", "lat": "42.36"}, mock_search)
+        )
+        self.assertEqual(mock_search.call_count, 3)
+
+        # Empty results are requested again.
+        mock_search.reset_mock()
+        mock_search.return_value = None
+        get_cached_search(example_url, "nowhere", mock_search)
+        get_cached_search(example_url, "nowhere", mock_search)
+        self.assertEqual(mock_search.call_count, 2)
+
+    @override_settings(GEOCODING_SESSION_TIMEOUT=300)
+    @patch("eventkit_cloud.utils.geocoding.geocode_auth_response.time.monotonic")
+    @patch("eventkit_cloud.utils.geocoding.geocode_auth_response.get_or_update_session")
+    def test_get_geocoding_session(self, mock_get_or_update_session, mock_monotonic):
+        geocoding_sessions.sessions = {}
+        self.addCleanup(setattr, geocoding_sessions, "sessions", {})
+        mock_get_or_update_session.side_effect = lambda **session_info: MagicMock()
+        mock_monotonic.return_value = 100
+
+        # The session is kept for the host and auth context.
+        session = get_geocoding_session("http://geocoder.test/search", headers={"Authorization": "Bearer 1"})
+        self.assertIs(
+            session, get_geocoding_session("http://geocoder.test/reverse", headers={"Authorization": "Bearer 1"})
+        )
+        mock_get_or_update_session.assert_called_once_with(headers={"Authorization": "Bearer 1"})
+        new_token_session = get_geocoding_session("http://geocoder.test/search", headers={"Authorization": "Bearer 2"})
+        self.assertIsNot(session, new_token_session)
+
+        # Sessions are replaced once they expire.
+        mock_monotonic.return_value = 400
+        new_session = get_geocoding_session("http://geocoder.test/search", headers={"Authorization": "Bearer 1"})
+        self.assertIsNot(session, new_session)
+        session.close.assert_called_once()
+        new_token_session.close.assert_called_once()
+        self.assertEqual(list(geocoding_sessions.sessions.values()), [(new_session, 400)])
@@ -2,6 +2,8 @@
 import doctest
 import logging
 import os
+import sqlite3
+import tempfile
 from unittest.mock import Mock, call, patch
 from uuid import uuid4
 
@@ -23,6 +25,7 @@ from eventkit_cloud.utils.geopackage import (
     get_tile_matrix_table_zoom_levels,
     get_tile_table_names,
     get_zoom_levels_table,
+    merge_tile_tables,
     remove_empty_zoom_levels,
     remove_zoom_level,
     set_gpkg_contents_bounds,
@@ -313,3 +316,37 @@ class TestGeopackage(TransactionTestCase):
         add_file_metadata(gpkg, metadata)
         mock_sqlite3.connect().__enter__().execute.assert_called()
         mock_create_metadata_tables.assert_called_once_with(gpkg)
+
+    def test_merge_tile_tables(self):
+        def create_tile_gpkg(gpkg, tiles, zoom_levels):
+            with sqlite3.connect(gpkg) as conn:
+                conn.execute("CREATE TABLE gpkg_contents (table_name TEXT PRIMARY KEY, data_type TEXT);")
+                conn.execute("INSERT INTO gpkg_contents VALUES ('imagery', 'tiles');")
+                conn.execute(
+                    "CREATE TABLE gpkg_tile_matrix (table_name TEXT, zoom_level INTEGER, "
+                    "PRIMARY KEY (table_name, zoom_level));"
+                )
+                conn.executemany("INSERT INTO gpkg_tile_matrix VALUES ('imagery', ?);", [(z,) for z in zoom_levels])
+                conn.execute(
+                    "CREATE TABLE imagery (id INTEGER PRIMARY KEY AUTOINCREMENT, zoom_level INTEGER, "
+                    "tile_column INTEGER, tile_row INTEGER, tile_data BLOB, "
+                    "UNIQUE (zoom_level, tile_column, tile_row));"
+                )
+                conn.executemany(
+                    "INSERT INTO imagery (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?);", tiles
+                )
+
+        with tempfile.TemporaryDirectory() as stage_dir:
+            gpkg = os.path.join(stage_dir, "test.gpkg")
+            source_gpkg = os.path.join(stage_dir, "test-1.gpkg")
+            create_tile_gpkg(gpkg, [(0, 0, 0, b"a"), (1, 0, 0, b"b")], [0, 1])
+            create_tile_gpkg(source_gpkg, [(1, 0, 0, b"c"), (2, 1, 1, b"d")], [1, 2])
+
+            merge_tile_tables(gpkg, source_gpkg)
+
+            with sqlite3.connect(gpkg) as conn:
+                tiles = conn.execute(
+                    "SELECT zoom_level, tile_column, tile_row, tile_data FROM imagery ORDER BY zoom_level;"
+                ).fetchall()
+            self.assertEqual([(0, 0, 0, b"a"), (1, 0, 0, b"c"), (2, 1, 1, b"d")], tiles)
+            self.assertEqual([0, 1, 2], sorted(get_tile_matrix_table_zoom_levels(gpkg, "imagery")))
@@ -1,13 +1,39 @@
 import logging
+import re
+import time
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
 from unittest.mock import MagicMock, Mock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from PIL import Image
 
 from eventkit_cloud.utils.image_snapshot import get_tile, get_wmts_snapshot_image, save_thumbnail
+from eventkit_cloud.utils.tests.http_server import local_server
 
 logger = logging.getLogger(__name__)
 
 
+class TileRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves 256px tiles filled with a color derived from their coordinates, after the latency of the server.
+    """
+
+    def do_GET(self):
+        z, x, y = map(int, re.search(r"/(\d+)/(\d+)/(\d+)\.png", self.path).groups())
+        with self.server.serving({"z": z, "x": x, "y": y}):
+            time.sleep(self.server.latency)
+            tile = BytesIO()
+            Image.new("RGB", (256, 256), (x * 32 % 256, y * 32 % 256, z * 32 % 256)).save(tile, format="PNG")
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.end_headers()
+        self.wfile.write(tile.getvalue())
+
+    def log_message(self, *args):
+        pass
+
+
 class TestImageSnapshot(TestCase):
     @patch("eventkit_cloud.utils.image_snapshot.Image")
     @patch("eventkit_cloud.utils.image_snapshot.get_tile")
@@ -63,3 +89,41 @@ class TestImageSnapshot(TestCase):
         mock_thumbnail.thumbnail.called_once_with(thumbnail_size)
         mock_thumbnail.save.assert_called()
         self.assertEquals(expected_file_path, returned_path)
+
+    @override_settings(SNAPSHOT_CACHE_TIMEOUT=0)
+    def test_get_wmts_snapshot_image_concurrently(self):
+        with local_server(TileRequestHandler, latency=0.1, path="/tiles") as server:
+            test_url = f"{server.url}/{{z}}/{{x}}/{{y}}.png"
+
+            start = time.perf_counter()
+            serial_snapshot = get_wmts_snapshot_image(test_url, zoom_level=1, concurrency=1)
+            serial_duration = time.perf_counter() - start
+
+            start = time.perf_counter()
+            concurrent_snapshot = get_wmts_snapshot_image(test_url, zoom_level=1, concurrency=8)
+            concurrent_duration = time.perf_counter() - start
+
+        logger.info(
+            f"Snapshot of 8 tiles took {serial_duration:.2f}s serially and {concurrent_duration:.2f}s concurrently."
+        )
+        self.assertEqual(len(server.requests), 16)
+        self.assertLess(concurrent_duration * 2, serial_duration)
+        # Tiles arriving out of order are still pasted into their own position.
+        self.assertEqual((1024, 512), concurrent_snapshot.size)
+        self.assertEqual(serial_snapshot.tobytes(), concurrent_snapshot.tobytes())
+        self.assertEqual((96, 32, 32), concurrent_snapshot.getpixel((3 * 256, 256)))
+
+    @override_settings(SNAPSHOT_CACHE_TIMEOUT=60)
+    def test_get_wmts_snapshot_image_cached(self):
+        with local_server(TileRequestHandler, path="/tiles") as server:
+            test_url = f"{server.url}/{{z}}/{{x}}/{{y}}.png"
+            snapshot = get_wmts_snapshot_image(test_url, zoom_level=0)
+            self.assertEqual(len(server.requests), 2)
+
+            cached_snapshot = get_wmts_snapshot_image(test_url, zoom_level=0)
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(snapshot.tobytes(), cached_snapshot.tobytes())
+
+            # A different area isn't served from the cache.
+            get_wmts_snapshot_image(test_url, zoom_level=0, bbox=[-180, -90, 0, 90])
+            self.assertEqual(len(server.requests), 3)
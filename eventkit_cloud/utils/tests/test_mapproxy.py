@@ -1,34 +1,82 @@
 # -*- coding: utf-8 -*-
+import copy
 import logging
+import os
+import sqlite3
+import tempfile
+import time
 from unittest.mock import MagicMock, Mock, patch
 from uuid import uuid4
 
 from django.conf import settings
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
 
 from eventkit_cloud.jobs.models import DataProvider
 from eventkit_cloud.tasks.enumerations import TaskState
 from eventkit_cloud.utils.mapproxy import (
     CustomLogger,
     MapproxyGeopackage,
+    add_shared_tile_cache,
     check_zoom_levels,
+    clear_mapproxy_apps,
     clear_mapproxy_config_cache,
+    create_mapproxy_app,
     get_cache_template,
     get_conf_dict,
     get_custom_exp_backoff,
     get_footprint_layer_name,
     get_height,
+    get_mapproxy_app,
     get_mapproxy_footprint_url,
     get_mapproxy_metadata_url,
+    get_partition_seed_template,
     get_resolution_for_extent,
+    get_seed_partitions,
+    get_seed_template,
+    get_shared_tile_cache_files,
+    get_shared_tile_cache_ttl,
     get_width,
     mapproxy_config_keys_index,
+    prune_shared_tile_cache,
 )
 from mapproxy.config.config import load_default_config
+from mapproxy.grid import tile_grid_for_epsg
 
 logger = logging.getLogger(__name__)
 
 
+def perf_benchmark(num_tiles=200):
+    """
+    Benchmarks serving map tiles through create_mapproxy_app when the app is built for every tile, as it was before
+    the apps were kept, and when the built app is reused. The source is seed only so no tiles are requested.
+    :param num_tiles: The number of tiles to serve.
+    :return: The total time and tiles per second measured for each case.
+    """
+    conf_dict = {
+        "sources": {"default": {"type": "tile", "url": "http://example.test/%(z)s/%(x)s/%(y)s.png", "seed_only": True}},
+        "grids": {"default": {"srs": "EPSG:4326", "tile_size": [256, 256], "origin": "nw"}},
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tile_cache_dir, override_settings(
+        TILE_CACHE_DIR=tile_cache_dir, MAPPROXY_APP_CACHE_SIZE=32
+    ), patch("eventkit_cloud.utils.mapproxy.get_conf_dict", return_value=conf_dict), patch(
+        "eventkit_cloud.utils.mapproxy.add_restricted_regions_to_config",
+        side_effect=lambda base_config, config, slug, user: (base_config, config),
+    ):
+        for name, reuse_app in [("rebuilt", False), ("reused", True)]:
+            clear_mapproxy_config_cache()
+            start = time.perf_counter()
+            for tile in range(num_tiles):
+                if not reuse_app:
+                    clear_mapproxy_apps()
+                mapproxy_app = create_mapproxy_app("benchmark")
+                mapproxy_app.get(f"/wmts/benchmark/default/4/{tile % 32}/{tile % 16}.png", expect_errors=True)
+            total_time = time.perf_counter() - start
+            results[name] = {"total_time": total_time, "tiles_per_second": num_tiles / total_time}
+    clear_mapproxy_apps()
+    return results
+
+
 class TestGeopackage(TransactionTestCase):
     def setUp(self):
         self.path = settings.ABS_PATH()
@@ -273,6 +321,172 @@ class TestHelpers(TransactionTestCase):
         height = get_height(extent)
         self.assertEqual(height, 180)
 
+    @patch("eventkit_cloud.utils.mapproxy.MapProxyApp")
+    @patch("eventkit_cloud.utils.mapproxy.ProxyConfiguration")
+    def test_get_mapproxy_app(self, mock_proxy_configuration, mock_mapproxy_app):
+        clear_mapproxy_apps()
+        self.addCleanup(clear_mapproxy_apps)
+        config = {"sources": {"default": {"type": "tile", "coverage": {"difference": [{"bbox": [-1, -1, 1, 1]}]}}}}
+        restricted_config = copy.deepcopy(config)
+        restricted_config["sources"]["default"]["coverage"]["difference"].append({"bbox": [1, 1, 2, 2]})
+
+        with self.settings(MAPPROXY_APP_CACHE_SIZE=2):
+            mapproxy_app = get_mapproxy_app("osm", config)
+            self.assertIs(mapproxy_app, get_mapproxy_app("osm", copy.deepcopy(config)))
+            mock_proxy_configuration.assert_called_once_with(config)
+
+            # A user with other restrictions gets another app.
+            self.assertIsNot(mapproxy_app, get_mapproxy_app("osm", restricted_config))
+            get_mapproxy_app("imagery", config)
+            self.assertEqual(3, mock_proxy_configuration.call_count)
+
+            # The least recently used app was removed.
+            self.assertIsNot(mapproxy_app, get_mapproxy_app("osm", config))
+            self.assertEqual(4, mock_proxy_configuration.call_count)
+
+            clear_mapproxy_apps()
+            get_mapproxy_app("osm", config)
+            self.assertEqual(5, mock_proxy_configuration.call_count)
+
+    def test_get_seed_partitions(self):
+        grid = tile_grid_for_epsg("EPSG:4326", tile_size=(256, 256))
+        bbox = [-10.0, -5.0, 12.0, 8.0]
+
+        self.assertEqual(
+            [{"levels": {"from": 0, "to": 8}, "weight": 1.0}], get_seed_partitions(grid, bbox, "EPSG:4326", 0, 8, 1)
+        )
+
+        partitions = get_seed_partitions(grid, bbox, "EPSG:4326", 0, 8, 4)
+        self.assertEqual({"from": 0, "to": 7}, partitions[0]["levels"])
+        self.assertNotIn("bbox", partitions[0])
+        # The last level has most of the tiles so it is split into strips.
+        self.assertEqual(3, len(partitions[1:]))
+        self.assertAlmostEqual(1.0, sum(partition["weight"] for partition in partitions))
+        strips = []
+        for partition in partitions[1:]:
+            self.assertEqual({"from": 8, "to": 8}, partition["levels"])
+            self.assertEqual("EPSG:4326", partition["srs"])
+            strips.append(list(grid.get_affected_level_tiles(partition["bbox"], 8)[2]))
+        # Every tile of the last level is seeded by exactly one strip.
+        expected_tiles = list(grid.get_affected_level_tiles(bbox, 8)[2])
+        self.assertCountEqual(expected_tiles, [tile for strip in strips for tile in strip])
+
+    @patch("eventkit_cloud.utils.mapproxy.convert_bbox")
+    def test_get_partition_seed_template(self, mock_convert_bbox):
+        mock_convert_bbox.return_value = [-2, -2, 2, 2]
+        seed_template = get_seed_template(bbox=[-2, -2, 2, 2], level_from=0, level_to=10)
+        partition = {"levels": {"from": 10, "to": 10}, "weight": 0.5, "bbox": [0, -3, 3, 3], "srs": "EPSG:3857"}
+
+        partition_seed_template = get_partition_seed_template(seed_template, partition)
+        self.assertEqual({"from": 10, "to": 10}, partition_seed_template["seeds"]["seed"]["levels"])
+        self.assertEqual(
+            {
+                "intersection": [
+                    {"srs": "EPSG:4326", "bbox": [-2, -2, 2, 2]},
+                    {"bbox": [0, -3, 3, 3], "srs": "EPSG:3857"},
+                ]
+            },
+            partition_seed_template["coverages"]["geom"],
+        )
+        # The template itself isn't changed.
+        self.assertEqual({"from": 0, "to": 10}, seed_template["seeds"]["seed"]["levels"])
+
+    def test_get_shared_tile_cache_ttl(self):
+        with self.settings(SHARED_TILE_CACHE_TTL=60):
+            self.assertIsNone(get_shared_tile_cache_ttl(None))
+            self.assertIsNone(get_shared_tile_cache_ttl({"shared_tile_cache": False}))
+            self.assertEqual(60, get_shared_tile_cache_ttl({"shared_tile_cache": True}))
+            self.assertEqual(10, get_shared_tile_cache_ttl({"shared_tile_cache": {"ttl": 10}}))
+
+    def test_add_shared_tile_cache(self):
+        default_cache = get_cache_template(["imagery"], ["default"], "/test/example.gpkg", table_name="imagery")
+        conf_dict = {"caches": {"default": default_cache}}
+        with self.settings(SHARED_TILE_CACHE_DIR="/test/shared_tile_cache"):
+            cache_dir = add_shared_tile_cache(conf_dict, "osm", "imagery")
+
+        self.assertEqual("/test/shared_tile_cache/osm", os.path.dirname(cache_dir))
+        expected_shared_cache = get_cache_template(["imagery"], ["default"], "", table_name="imagery")
+        expected_shared_cache["cache"] = {
+            "type": "geopackage",
+            "directory": cache_dir,
+            "levels": True,
+            "table_name": "imagery",
+        }
+        self.assertEqual(expected_shared_cache, conf_dict["caches"]["shared_tile_cache"])
+        self.assertEqual(["shared_tile_cache"], conf_dict["caches"]["default"]["sources"])
+        self.assertEqual("/test/example.gpkg", conf_dict["caches"]["default"]["cache"]["filename"])
+
+    def test_add_shared_tile_cache_provider_changed(self):
+        def get_conf_dict(url, layers="imagery", run_gpkg="/test/run.gpkg"):
+            return {
+                "sources": {"imagery": {"type": "wms", "req": {"url": url, "layers": layers}}},
+                "grids": {"default": {"srs": "EPSG:4326", "tile_size": [256, 256], "origin": "nw"}},
+                "caches": {"default": get_cache_template(["imagery"], ["default"], run_gpkg, table_name="imagery")},
+            }
+
+        url = "http://example.test/wms"
+        with tempfile.TemporaryDirectory() as shared_tile_cache_dir, self.settings(
+            SHARED_TILE_CACHE_DIR=shared_tile_cache_dir
+        ):
+            cache_dir = add_shared_tile_cache(get_conf_dict(url), "osm", "imagery", service_url=url)
+            # A tile level downloaded by the run.
+            os.makedirs(os.path.join(cache_dir, "default"))
+            open(os.path.join(cache_dir, "default", "1.gpkg"), "w").close()
+
+            # Every run of the same configuration reads the same tiles.
+            next_run_conf_dict = get_conf_dict(url, run_gpkg="/test/next_run.gpkg")
+            self.assertEqual(cache_dir, add_shared_tile_cache(next_run_conf_dict, "osm", "imagery", service_url=url))
+
+            # Once the provider is pointed at another service or layer the old tiles aren't read.
+            new_url = "http://example.test/new/wms"
+            for conf_dict, service_url in [(get_conf_dict(new_url), new_url), (get_conf_dict(url, layers="new"), url)]:
+                new_cache_dir = add_shared_tile_cache(conf_dict, "osm", "imagery", service_url=service_url)
+                self.assertNotEqual(cache_dir, new_cache_dir)
+                self.assertEqual(new_cache_dir, conf_dict["caches"]["shared_tile_cache"]["cache"]["directory"])
+                self.assertEqual([], get_shared_tile_cache_files(new_cache_dir, level_from=1, level_to=1))
+            self.assertEqual(
+                [os.path.join(cache_dir, "default", "1.gpkg")],
+                get_shared_tile_cache_files(cache_dir, level_from=1, level_to=1),
+            )
+
+    def test_prune_shared_tile_cache(self):
+        def create_level(slug, level, size, created_at, used_at):
+            grid_dir = os.path.join(cache_dir, slug, "config", "default")
+            os.makedirs(grid_dir, exist_ok=True)
+            cache_file = os.path.join(grid_dir, f"{level}.gpkg")
+            with sqlite3.connect(cache_file) as conn:
+                conn.execute("CREATE TABLE gpkg_contents (table_name TEXT, last_change DATETIME)")
+                conn.execute(
+                    "INSERT INTO gpkg_contents VALUES ('imagery', strftime('%Y-%m-%dT%H:%M:%fZ', ?, 'unixepoch'))",
+                    (created_at,),
+                )
+            with open(cache_file, "ab") as open_file:
+                open_file.truncate(size)
+            os.utime(cache_file, (used_at, used_at))
+            return cache_file
+
+        now = time.time()
+        mb = 1024 * 1024
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expired = create_level("osm", 1, mb, now - 200, now)
+            oldest = create_level("osm", 2, mb, now - 50, now - 30)
+            newest = create_level("osm", 3, mb, now - 50, now - 10)
+            custom_ttl = create_level("imagery", 1, mb, now - 200, now - 20)
+            removed_provider = create_level("removed", 1, mb, now, now)
+
+            providers = [("osm", {"shared_tile_cache": True}), ("imagery", {"shared_tile_cache": {"ttl": 1000}})]
+            with self.settings(SHARED_TILE_CACHE_DIR=cache_dir, SHARED_TILE_CACHE_TTL=100), patch.object(
+                DataProvider, "objects"
+            ) as mock_objects:
+                mock_objects.values_list.return_value = providers
+                self.assertEqual(3, prune_shared_tile_cache(max_size=2))
+
+            self.assertFalse(os.path.exists(expired))
+            self.assertFalse(os.path.exists(oldest))
+            self.assertFalse(os.path.exists(removed_provider))
+            self.assertTrue(os.path.exists(newest))
+            self.assertTrue(os.path.exists(custom_ttl))
+
 
 class TestLogger(TransactionTestCase):
     @patch("eventkit_cloud.utils.mapproxy.get_cache_value")
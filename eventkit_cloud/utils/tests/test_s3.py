@@ -1,12 +1,26 @@
 import os
+import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, mock_open, patch
 
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from django.test import TestCase
 from django.test.utils import override_settings
+from moto import mock_s3
+from storages.backends.s3boto3 import S3Boto3Storage
 
-from eventkit_cloud.utils.s3 import delete_from_s3, upload_to_s3
+from eventkit_cloud.utils.s3 import (
+    delete_from_s3,
+    download_folder_from_s3,
+    get_s3_client,
+    get_transfer_config,
+    is_downloaded,
+    open_storage_file,
+    upload_to_s3,
+)
 
 
 @override_settings(AWS_STORAGE_BUCKET_NAME="test-bucket")
@@ -48,8 +62,121 @@ class TestS3Util(TestCase):
         url = "http://s3.url/{0}".format(expected_key)
         run_uid = "run"
 
-        delete_from_s3(run_uid=run_uid, download_url=url)
+        mock_client.delete_objects.return_value = {
+            "Errors": [{"Key": expected_key, "Code": "AccessDenied", "Message": "Access Denied"}]
+        }
 
-        mock_client.list_objects.return_value = {"contents": [expected_key]}
+        failed_keys = delete_from_s3(run_uid=run_uid, download_url=url)
 
-        mock_client.delete_object.assert_called_once_with(Bucket="test-bucket", Key=expected_key)
+        mock_client.delete_objects.assert_called_once_with(
+            Bucket="test-bucket", Delete={"Objects": [{"Key": expected_key}], "Quiet": True}
+        )
+        mock_client.get_paginator.assert_not_called()
+        self.assertEqual(failed_keys, [expected_key])
+
+
+@mock_s3
+@patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+@override_settings(
+    AWS_STORAGE_BUCKET_NAME="test-bucket",
+    AWS_S3_ENDPOINT_URL=None,
+    AWS_S3_ACCESS_KEY_ID="d3adb33f",
+    AWS_S3_SECRET_ACCESS_KEY="d3adb33f",
+    AWS_S3_MULTIPART_THRESHOLD=5 * 1024 * 1024,
+    AWS_S3_MULTIPART_CHUNKSIZE=5 * 1024 * 1024,
+    AWS_S3_DOWNLOAD_CONCURRENCY=2,
+)
+class TestS3Transfers(TestCase):
+    def setUp(self):
+        self.client = get_s3_client()
+        self.client.create_bucket(Bucket="test-bucket")
+        stage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(stage_dir.cleanup)
+        self.stage_dir = stage_dir.name
+
+    def write_file(self, path, size):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as local_file:
+            local_file.write(os.urandom(size))
+        return path
+
+    @patch("audit_logging.file_logging.logging_open", create=True)
+    def test_upload_to_s3_multipart(self, mock_logging_open):
+        mock_logging_open.side_effect = lambda path, mode, **kwargs: open(path, mode)
+        source_path = self.write_file(os.path.join(self.stage_dir, "run", "data.gpkg"), 11 * 1024 * 1024)
+
+        upload_to_s3(source_path, "run/data.gpkg")
+
+        s3_object = self.client.head_object(Bucket="test-bucket", Key="run/data.gpkg")
+        # The file was uploaded in three 5MB parts, and its ETag can be verified locally.
+        self.assertTrue(s3_object["ETag"].strip('"').endswith("-3"))
+        self.assertTrue(is_downloaded(source_path, s3_object["ContentLength"], s3_object["ETag"]))
+        self.assertFalse(is_downloaded(source_path, s3_object["ContentLength"] + 1, s3_object["ETag"]))
+
+    def test_download_folder_from_s3(self):
+        sizes = {"run/provider/data.gpkg": 6 * 1024 * 1024, "run/provider/data.kml": 1024, "run/data.json": 10}
+        for key, size in sizes.items():
+            local_path = self.write_file(os.path.join(self.stage_dir, "source", key), size)
+            self.client.upload_file(local_path, "test-bucket", key, Config=get_transfer_config())
+        self.client.put_object(Bucket="test-bucket", Key="run/run.zip", Body=b"zip")
+        self.client.put_object(Bucket="test-bucket", Key="other/data.json", Body=b"other")
+        output_dir = os.path.join(self.stage_dir, "output")
+
+        with patch.object(self.client, "download_file", wraps=self.client.download_file) as mock_download_file:
+            downloaded = download_folder_from_s3("run", output_dir=output_dir, client=self.client)
+            self.assertEqual(mock_download_file.call_count, 3)
+
+            expected_paths = [os.path.join(output_dir, key[len("run/") :]) for key in sizes]
+            self.assertCountEqual(downloaded, expected_paths)
+            self.assertFalse(os.path.exists(os.path.join(output_dir, "run.zip")))
+            for key, expected_path in zip(sizes, expected_paths):
+                with open(expected_path, "rb") as downloaded_file, open(
+                    os.path.join(self.stage_dir, "source", key), "rb"
+                ) as source_file:
+                    self.assertEqual(downloaded_file.read(), source_file.read())
+
+            # Only files which no longer match their objects are downloaded again.
+            mock_download_file.reset_mock()
+            self.write_file(expected_paths[1], 1024)
+            download_folder_from_s3("run", output_dir=output_dir, client=self.client)
+            mock_download_file.assert_called_once()
+            self.assertEqual(mock_download_file.call_args[0][1], "run/provider/data.kml")
+
+    def test_delete_from_s3(self):
+        keys = [f"run/provider/{index}.gpkg" for index in range(1500)]
+        for key in keys:
+            self.client.put_object(Bucket="test-bucket", Key=key, Body=b"data")
+        self.client.put_object(Bucket="test-bucket", Key="other/data.gpkg", Body=b"data")
+        operations = []
+        self.client.meta.events.register(
+            "before-call.s3", lambda model, **kwargs: operations.append(model.name), unique_id="count-requests"
+        )
+
+        failed_keys = delete_from_s3(run_uid="run", client=self.client)
+
+        # Two pages of keys, each removed by a single delete request.
+        self.assertEqual(failed_keys, [])
+        self.assertEqual(operations, ["ListObjectsV2", "DeleteObjects", "ListObjectsV2", "DeleteObjects"])
+        self.assertNotIn("Contents", self.client.list_objects_v2(Bucket="test-bucket", Prefix="run"))
+        self.assertEqual(self.client.list_objects_v2(Bucket="test-bucket")["KeyCount"], 1)
+
+    def test_open_storage_file(self):
+        data = os.urandom(3 * 1024)
+        self.client.put_object(Bucket="test-bucket", Key="run/provider/data.gpkg", Body=data)
+        storage = S3Boto3Storage(bucket_name="test-bucket", access_key="d3adb33f", secret_key="d3adb33f")
+        operations = []
+        storage.connection.meta.client.meta.events.register(
+            "before-call.s3", lambda model, **kwargs: operations.append(model.name), unique_id="count-requests"
+        )
+
+        with open_storage_file(SimpleNamespace(storage=storage, name="run/provider/data.gpkg")) as storage_file:
+            self.assertEqual(storage_file.read(1024), data[:1024])
+            self.assertEqual(storage_file.read(), data[1024:])
+        # The object is read from the body of a single request instead of being downloaded before it is read.
+        self.assertEqual(operations, ["GetObject"])
+
+        # Files of other storages are opened by the storage.
+        storage = FileSystemStorage(location=self.stage_dir)
+        name = storage.save("run/provider/data.gpkg", ContentFile(data))
+        with open_storage_file(SimpleNamespace(storage=storage, name=name)) as storage_file:
+            self.assertEqual(storage_file.read(), data)
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 import logging
 import os
+import tempfile
 from string import Template
 from unittest.mock import ANY, Mock, patch
 from uuid import uuid4
 
 from django.conf import settings
 from django.test import TransactionTestCase
+from osgeo import gdal
 
+from eventkit_cloud.utils.tests.wcs_server import wcs_server
 from eventkit_cloud.utils.wcs import WCSConverter
 
 logger = logging.getLogger(__name__)
@@ -144,3 +147,41 @@ class TestWCSConverter(TransactionTestCase):
         with patch("requests.Session.get", return_value=None):
             with self.assertRaises(Exception):
                 wcs_conv.convert()
+
+    @patch("audit_logging.file_logging.logging_open")
+    def test_convert_tiles_concurrently(self, mock_logging_open):
+        mock_logging_open.side_effect = lambda path, mode, **kwargs: open(path, mode)
+        self.task_process.return_value.start_process.side_effect = lambda func: func()
+        bbox = [0, 0, 0.2, 0.1]
+        config = {
+            "service": {"scale": "30", "coverages": "1"},
+            "params": {"VERSION": "1.0.0", "REQUEST": "GetCoverage", "FORMAT": "geotiff", "CRS": "EPSG:4326"},
+            "tile_concurrency": 4,
+        }
+
+        with tempfile.TemporaryDirectory() as stage_dir, wcs_server(latency=0.1) as server:
+            geotiff = os.path.join(stage_dir, "elevation.tif")
+            wcs_conv = WCSConverter(
+                config=config,
+                out=geotiff,
+                bbox=bbox,
+                service_url=server.url,
+                layer="1",
+                name="Great export",
+                task_uid=self.task_uid,
+            )
+            out = wcs_conv.convert()
+
+            # Every tile was requested, several at a time, and assembled into a single raster covering the bbox.
+            self.assertGreater(len(server.requests), 1)
+            self.assertGreater(server.max_active_requests, 1)
+            self.assertLessEqual(server.max_active_requests, 4)
+            self.assertEqual(out, geotiff)
+            dataset = gdal.Open(out)
+            west, x_res, _, north, _, y_res = dataset.GetGeoTransform()
+            self.assertAlmostEqual(west, bbox[0])
+            self.assertAlmostEqual(north, bbox[3])
+            self.assertLessEqual(north + y_res * dataset.RasterYSize, bbox[1] + 1e-6)
+            self.assertGreaterEqual(west + x_res * dataset.RasterXSize, bbox[2] - 1e-6)
+            dataset = None
+            self.assertFalse(os.path.exists(os.path.join(stage_dir, "elevation.vrt")))
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+from unittest.mock import patch
+from zipfile import ZIP_DEFLATED, ZIP_STORED, BadZipFile, ZipFile
+
+from django.test import TestCase
+
+from eventkit_cloud.utils import zip_archive
+from eventkit_cloud.utils.zip_archive import ParallelZipFile, StreamMember, compress_member, is_compressible, stream_zip
+
+
+class TestZipArchive(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.text = b"eventkit " * 300000
+        self.random = os.urandom(3 * 1024 * 1024)
+        self.files = {
+            self.write_file("features.gpkg", self.text): "data/osm/features.gpkg",
+            self.write_file("imagery.gpkg", self.random): "data/imagery/imagery.gpkg",
+            self.write_file("features.pbf", self.text): "data/osm/features.pbf",
+            self.write_file("empty.txt", b""): "empty.txt",
+        }
+
+    def write_file(self, name, data):
+        filename = os.path.join(self.temp_dir.name, name)
+        with open(filename, "wb") as open_file:
+            open_file.write(data)
+        return filename
+
+    def test_is_compressible(self):
+        filenames = list(self.files)
+        self.assertTrue(is_compressible(filenames[0]))
+        # The data doesn't compress.
+        self.assertFalse(is_compressible(filenames[1]))
+        # The format is already compressed.
+        self.assertFalse(is_compressible(filenames[2]))
+
+    def test_parallel_zip_file(self):
+        zip_filename = os.path.join(self.temp_dir.name, "test.zip")
+        with ParallelZipFile(zip_filename, "a", compression=ZIP_DEFLATED, allowZip64=True, max_workers=2) as zip_file:
+            for filename, arcname in self.files.items():
+                zip_file.write(filename, arcname=arcname)
+            zip_file.writestr("MANIFEST/manifest.xml", "<manifest/>")
+
+        with ZipFile(zip_filename) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(
+                list(self.files.values()) + ["MANIFEST/manifest.xml"], [info.filename for info in zip_file.infolist()]
+            )
+            self.assertEqual(
+                [ZIP_DEFLATED, ZIP_STORED, ZIP_STORED, ZIP_DEFLATED, ZIP_DEFLATED],
+                [info.compress_type for info in zip_file.infolist()],
+            )
+            for filename, arcname in self.files.items():
+                with open(filename, "rb") as open_file:
+                    self.assertEqual(open_file.read(), zip_file.read(arcname))
+
+    def test_parallel_zip_file_changed_file(self):
+        def compress_changed_member(*args, **kwargs):
+            member = compress_member(*args, **kwargs)
+            member.zinfo.CRC += 1
+            return member
+
+        zip_filename = os.path.join(self.temp_dir.name, "test.zip")
+        with patch.object(zip_archive, "compress_member", side_effect=compress_changed_member):
+            with self.assertRaises(BadZipFile):
+                with ParallelZipFile(zip_filename, "w", compression=ZIP_DEFLATED) as zip_file:
+                    zip_file.write(list(self.files)[2], arcname="features.pbf")
+
+        # The member which failed isn't in the archive.
+        with ZipFile(zip_filename) as zip_file:
+            self.assertEqual([], zip_file.namelist())
+
+    def test_stream_zip(self):
+        members = [
+            StreamMember(arcname=arcname, open=lambda filename=filename: open(filename, "rb"))
+            for filename, arcname in self.files.items()
+        ]
+        members.append(StreamMember(arcname="MANIFEST/manifest.xml", open=lambda: io.BytesIO(b"<manifest/>"), size=11))
+
+        chunks = list(stream_zip(members, chunk_size=1024 * 1024))
+        # The archive is sent a chunk at a time rather than all at once.
+        self.assertGreater(len(chunks), len(members))
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 2 * 1024 * 1024)
+
+        with ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual([member.arcname for member in members], zip_file.namelist())
+            self.assertEqual(
+                [ZIP_DEFLATED, ZIP_DEFLATED, ZIP_STORED, ZIP_DEFLATED, ZIP_DEFLATED],
+                [info.compress_type for info in zip_file.infolist()],
+            )
+            for filename, arcname in self.files.items():
+                with open(filename, "rb") as open_file:
+                    self.assertEqual(open_file.read(), zip_file.read(arcname))
+            self.assertEqual(b"<manifest/>", zip_file.read("MANIFEST/manifest.xml"))
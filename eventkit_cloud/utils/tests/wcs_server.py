@@ -0,0 +1,79 @@
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+import numpy
+from osgeo import gdal, osr
+
+from eventkit_cloud.utils.tests.http_server import LocalServer, local_server
+
+
+def render_coverage(bbox: list, width: int, height: int) -> bytes:
+    """
+    Renders a single band GeoTIFF of the bbox. Each pixel holds the sum of its column and row in a global grid of the
+    same resolution, so neighboring tiles line up and a mosaic can be checked against a single request.
+    """
+    path = f"/vsimem/{uuid.uuid4()}.tif"
+    x_res = (bbox[2] - bbox[0]) / width
+    y_res = (bbox[3] - bbox[1]) / height
+    dataset = gdal.GetDriverByName("GTiff").Create(path, width, height, 1, gdal.GDT_Float32)
+    dataset.SetGeoTransform([bbox[0], x_res, 0, bbox[3], 0, -y_res])
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    dataset.SetProjection(srs.ExportToWkt())
+    column = round((bbox[0] + 180) / x_res)
+    row = round((90 - bbox[3]) / y_res)
+    dataset.GetRasterBand(1).WriteArray(
+        numpy.add.outer(numpy.arange(row, row + height), numpy.arange(column, column + width))
+    )
+    dataset = None
+
+    vsi_file = gdal.VSIFOpenL(path, "rb")
+    gdal.VSIFSeekL(vsi_file, 0, 2)
+    size = gdal.VSIFTellL(vsi_file)
+    gdal.VSIFSeekL(vsi_file, 0, 0)
+    content = gdal.VSIFReadL(1, size, vsi_file)
+    gdal.VSIFCloseL(vsi_file)
+    gdal.Unlink(path)
+    return content
+
+
+class WCSRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers WCS 1.0.0 GetCoverage requests with a rendered coverage after the latency of the server.
+    """
+
+    def do_GET(self):
+        params = {key.lower(): values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        try:
+            bbox = [float(coord) for coord in params["bbox"].split(",")]
+            width, height = int(params["width"]), int(params["height"])
+        except (KeyError, ValueError):
+            self.send_error(400, "A GetCoverage request needs a bbox, width and height.")
+            return
+
+        with self.server.serving(params):
+            time.sleep(self.server.latency)
+            content = render_coverage(bbox, width, height)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/tiff")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def wcs_server(latency: float = 0) -> Iterator[LocalServer]:
+    """
+    Runs a local stand-in for a WCS service, useful for exercising WCSConverter without a network.
+    :param latency: The number of seconds the server waits before answering each request.
+    :return: The server, its url is the service url to use.
+    """
+    with local_server(WCSRequestHandler, latency=latency, path="/wcs") as server:
+        yield server
@@ -3,11 +3,15 @@ import os
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
+from typing import Callable, List, Optional
 
-from gdal_utils import get_dimensions, get_meta, merge_geotiffs
+import requests
+from gdal_utils import get_dimensions, get_meta
+from osgeo import gdal
 
-from eventkit_cloud.core.helpers import get_or_update_session
+from eventkit_cloud.core.helpers import copy_session, get_or_update_session
 from eventkit_cloud.tasks.task_process import TaskProcess
 from eventkit_cloud.utils import auth_requests
 from eventkit_cloud.utils.generic import retry
@@ -15,6 +19,42 @@ from eventkit_cloud.utils.mapproxy import get_chunked_bbox
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1024 * 1024 * 2  # 2MB chunks
+
+
+def mosaic_geotiffs(in_files: List[str], out_file: str, executor: Optional[Callable] = None) -> str:
+    """
+    Assembles tiles into a single GeoTIFF. The tiles are referenced by a VRT, which only holds their metadata, so their
+    pixels are only copied once when the VRT is translated. Later tiles are drawn over earlier ones where they overlap.
+    :param in_files: The paths to the tiles.
+    :param out_file: The path to the GeoTIFF to create.
+    :param executor: A function to run the assembly with, e.g. TaskProcess.start_process.
+    :return: The path to the GeoTIFF.
+    """
+    vrt_file = f"{os.path.splitext(out_file)[0]}.vrt"
+
+    def build_mosaic():
+        vrt = gdal.BuildVRT(vrt_file, in_files)
+        if vrt is None:
+            raise Exception(f"Could not build a mosaic of {len(in_files)} tiles.")
+        # The VRT is written to disk when the dataset is closed.
+        vrt = None
+        if (
+            gdal.Translate(out_file, vrt_file, format="GTiff", creationOptions=["TILED=YES", "BIGTIFF=IF_SAFER"])
+            is None
+        ):
+            raise Exception(f"Could not write the mosaic to {out_file}.")
+
+    try:
+        if executor:
+            executor(build_mosaic)
+        else:
+            build_mosaic()
+    finally:
+        if os.path.isfile(vrt_file):
+            os.remove(vrt_file)
+    return out_file
+
 
 class WCSConverter(object):
     """
@@ -166,61 +206,47 @@ class WCSConverter(object):
         width, height = get_dimensions(self.bbox, scale)
         tile_bboxes = get_chunked_bbox(self.bbox, (width, height))
 
-        geotiffs = []
-        session = get_or_update_session(slug=self.slug, **self.config)
+        file_path, ext = os.path.splitext(self.out)
+        tiles = []
         for idx, coverage in enumerate(coverages):
-            params["COVERAGE"] = coverage
-            file_path, ext = os.path.splitext(self.out)
-            try:
-                for (
-                    _bbox_idx,
-                    _tile_bbox,
-                ) in enumerate(tile_bboxes):
-                    outfile = "{0}-{1}-{2}{3}".format(file_path, idx, _bbox_idx, ext)
-                    try:
-                        os.remove(outfile)
-                    except OSError:
-                        pass
-
-                    # Setting this to arbitrarily high values improves the computed
-                    # resolution but makes the requests slow down.
-                    # If it is set in the config, use that value, otherwise compute approximate res based on scale
-                    if self.config.get("tile_size", None) is None:
-                        tile_x, tile_y = get_dimensions(_tile_bbox, scale)
-                        params["width"] = tile_x
-                        params["height"] = tile_y
-                    else:
-                        params["width"] = self.config.get("tile_size")
-                        params["height"] = self.config.get("tile_size")
-
-                    params["bbox"] = ",".join(map(str, _tile_bbox))
-
-                    req = session.get(self.service_url, params=params, stream=True)
-
-                    try:
-                        size = int(req.headers.get("content-length"))
-                    except (ValueError, TypeError):
-                        if req.content:
-                            size = len(req.content)
-                        else:
-                            raise Exception("Overpass Query failed to return any data")
-                    if not req:
-                        logger.error(req.content)
-                        raise Exception("WCS request for {0} failed.".format(self.name))
-                    CHUNK = 1024 * 1024 * 2  # 2MB chunks
-                    from audit_logging.file_logging import logging_open
-
-                    with logging_open(outfile, "wb", user_details=self.user_details) as fd:
-                        for chunk in req.iter_content(CHUNK):
-                            fd.write(chunk)
-                            size += CHUNK
-                    geotiffs += [outfile]
-            except Exception as e:
-                logger.error(e)
-                raise Exception("There was an error writing the file to disk.")
+            for _bbox_idx, _tile_bbox in enumerate(tile_bboxes):
+                tile_params = dict(params)
+                tile_params["COVERAGE"] = coverage
+                # Setting this to arbitrarily high values improves the computed
+                # resolution but makes the requests slow down.
+                # If it is set in the config, use that value, otherwise compute approximate res based on scale
+                if self.config.get("tile_size", None) is None:
+                    tile_x, tile_y = get_dimensions(_tile_bbox, scale)
+                    tile_params["width"] = tile_x
+                    tile_params["height"] = tile_y
+                else:
+                    tile_params["width"] = self.config.get("tile_size")
+                    tile_params["height"] = self.config.get("tile_size")
+                tile_params["bbox"] = ",".join(map(str, _tile_bbox))
+                tiles.append((tile_params, "{0}-{1}-{2}{3}".format(file_path, idx, _bbox_idx, ext)))
+
+        # Tiles spend most of their time waiting on the service, up to tile_concurrency of them are requested at once.
+        tile_concurrency = int(self.config.get("tile_concurrency") or 1)
+        session = get_or_update_session(slug=self.slug, **self.config)
+        for prefix, adapter in list(session.adapters.items()):
+            # Certificate adapters are left as they are, the other pools are sized so that no connections are discarded.
+            if type(adapter) is requests.adapters.HTTPAdapter:
+                session.mount(
+                    prefix,
+                    requests.adapters.HTTPAdapter(pool_maxsize=tile_concurrency, max_retries=adapter.max_retries),
+                )
+        try:
+            with ThreadPoolExecutor(max_workers=min(tile_concurrency, len(tiles))) as executor:
+                geotiffs = list(
+                    executor.map(lambda tile: self.fetch_coverage_tile(copy_session(session), *tile), tiles)
+                )
+        except Exception as e:
+            logger.error(e)
+            raise Exception("There was an error writing the file to disk.")
+
         if len(geotiffs) > 1:
             task_process = TaskProcess(self.task_uid)
-            self.out = merge_geotiffs(geotiffs, self.out, executor=task_process.start_process)
+            self.out = mosaic_geotiffs(geotiffs, self.out, executor=task_process.start_process)
         else:
             shutil.copy(geotiffs[0], self.out)
 
@@ -232,6 +258,28 @@ class WCSConverter(object):
                 logger.error(output_file.read())
             raise Exception("The service failed to return a proper response")
 
+    def fetch_coverage_tile(self, session: requests.Session, params: dict, outfile: str) -> str:
+        """
+        Requests a tile of a coverage and writes it to outfile.
+        :return: The path to the tile.
+        """
+        try:
+            os.remove(outfile)
+        except OSError:
+            pass
+
+        req = session.get(self.service_url, params=params, stream=True)
+
+        if not req:
+            logger.error(req.content)
+            raise Exception("WCS request for {0} failed.".format(self.name))
+        from audit_logging.file_logging import logging_open
+
+        with logging_open(outfile, "wb", user_details=self.user_details) as fd:
+            for chunk in req.iter_content(CHUNK_SIZE):
+                fd.write(chunk)
+        return outfile
+
     @retry
     def convert(self):
         """
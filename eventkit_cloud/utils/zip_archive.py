@@ -0,0 +1,323 @@
+import logging
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import IO, Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZIP_STORED, BadZipFile, LargeZipFile, ZipFile, ZipInfo
+
+logger = logging.getLogger(__name__)
+
+# Formats which are already compressed, so deflating them costs time for next to no gain in size.
+COMPRESSED_EXTENSIONS = {".7z", ".bz2", ".gz", ".jp2", ".jpeg", ".jpg", ".kmz", ".pbf", ".png", ".xz", ".zip"}
+
+CHUNK_SIZE = 1024 * 1024
+# The amount of data sampled to guess how well files of other formats compress.
+SAMPLE_SIZE = 1024 * 1024
+# Files which don't deflate to less than this ratio of their size are stored.
+MIN_COMPRESSION_RATIO = 0.9
+# Compressed members up to this size are kept in memory before they are written to the archive.
+MAX_MEMORY_MEMBER_SIZE = 16 * 1024 * 1024
+
+
+class CompressedMember(object):
+    """
+    A file compressed by a worker, ready to be written to the archive.
+    """
+
+    def __init__(self, filename: str, zinfo: ZipInfo, data: Optional[IO[bytes]] = None, data_crc: int = 0):
+        """
+        :param filename: The path to the file.
+        :param zinfo: The ZipInfo with the compress type, CRC and sizes of the member.
+        :param data: The deflated file, or None if the file is stored.
+        :param data_crc: The CRC of the deflated file.
+        """
+        self.filename = filename
+        self.zinfo = zinfo
+        self.data = data
+        self.data_crc = data_crc
+
+    def open(self) -> IO[bytes]:
+        if self.data:
+            self.data.seek(0)
+            return self.data
+        return open(self.filename, "rb")
+
+    @property
+    def expected_crc(self):
+        return self.data_crc if self.data else self.zinfo.CRC
+
+    def close(self):
+        if self.data:
+            self.data.close()
+
+
+def is_compressed_format(filename: str) -> bool:
+    """
+    :param filename: The name of the file.
+    :return: True if the file is in a format which is already compressed.
+    """
+    return Path(filename).suffix.lower() in COMPRESSED_EXTENSIONS
+
+
+def is_compressible(filename: str) -> bool:
+    """
+    Guesses whether deflating the file is worth it, from its extension or by deflating a sample from the middle of it
+    (the start of GeoPackages and TIFFs is mostly headers which compress well even when the data doesn't).
+    :param filename: The path to the file.
+    :return: True if the file should be deflated.
+    """
+    if is_compressed_format(filename):
+        return False
+    file_size = os.path.getsize(filename)
+    if file_size <= SAMPLE_SIZE:
+        return True
+    with open(filename, "rb") as open_file:
+        open_file.seek((file_size - SAMPLE_SIZE) // 2)
+        sample = open_file.read(SAMPLE_SIZE)
+    return len(zlib.compress(sample, 1)) < len(sample) * MIN_COMPRESSION_RATIO
+
+
+def compress_member(
+    filename: str, zinfo: ZipInfo, compresslevel: Optional[int] = None, temp_dir: Optional[str] = None
+) -> CompressedMember:
+    """
+    Deflates the file, or only computes its CRC if it is stored or doesn't compress well. Deflated data is inflated
+    again as it is written, so that the member is known to decompress to the file without reading the archive again.
+    zlib releases the GIL, so members can be compressed in threads.
+    :param filename: The path to the file.
+    :param zinfo: The ZipInfo for the member, with the compress type requested.
+    :param compresslevel: The deflate level, defaults to zlib's default.
+    :param temp_dir: Where to spool deflated data which doesn't fit in memory.
+    :return: The CompressedMember.
+    """
+    deflate = zinfo.compress_type == ZIP_DEFLATED and is_compressible(filename)
+    zinfo.compress_type = ZIP_DEFLATED if deflate else ZIP_STORED
+    crc = 0
+    file_size = 0
+    data = None
+    data_crc = 0
+    inflated_crc = 0
+    if deflate:
+        data = SpooledTemporaryFile(max_size=MAX_MEMORY_MEMBER_SIZE, dir=temp_dir)
+        level = zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        decompressor = zlib.decompressobj(-15)
+
+    try:
+        with open(filename, "rb") as open_file:
+            while True:
+                chunk = open_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                if deflate:
+                    compressed = compressor.compress(chunk)
+                    data.write(compressed)
+                    data_crc = zlib.crc32(compressed, data_crc)
+                    inflated_crc = zlib.crc32(decompressor.decompress(compressed), inflated_crc)
+        if deflate:
+            compressed = compressor.flush()
+            data.write(compressed)
+            data_crc = zlib.crc32(compressed, data_crc)
+            inflated_crc = zlib.crc32(decompressor.decompress(compressed) + decompressor.flush(), inflated_crc)
+            if inflated_crc != crc:
+                raise BadZipFile(f"The compressed data for {filename} is corrupted.")
+    except Exception:
+        if data:
+            data.close()
+        raise
+
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = data.tell() if deflate else file_size
+    return CompressedMember(filename, zinfo, data=data, data_crc=data_crc)
+
+
+class ParallelZipFile(ZipFile):
+    """
+    A ZipFile which compresses the files added with write in worker threads, stores files which are already compressed
+    and checks the CRC of each member as it is written, so the archive doesn't need to be read again with testzip.
+
+    Members are written to the archive in the order they are added, at the latest when the archive is closed.
+    """
+
+    def __init__(self, file, mode="r", *args, max_workers: Optional[int] = None, **kwargs):
+        self._pending: Deque[Future] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        self._max_pending = (max_workers or os.cpu_count() or 1) * 2
+        self._temp_dir = None
+        if isinstance(file, (str, os.PathLike)):
+            self._temp_dir = os.path.dirname(os.fspath(file)) or None
+        super(ParallelZipFile, self).__init__(file, mode, *args, **kwargs)
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        if not self._seekable or os.path.isdir(filename):
+            self.flush()
+            return super(ParallelZipFile, self).write(
+                filename, arcname=arcname, compress_type=compress_type, compresslevel=compresslevel
+            )
+        if not self.fp:
+            raise ValueError("Attempt to write to ZIP archive that was already closed")
+
+        zinfo = ZipInfo.from_file(filename, arcname)
+        zinfo.compress_type = self.compression if compress_type is None else compress_type
+        if compresslevel is None:
+            compresslevel = self.compresslevel
+        self._pending.append(
+            self._executor.submit(compress_member, os.fspath(filename), zinfo, compresslevel, self._temp_dir)
+        )
+        # Write the members which are done, and wait for the oldest one if too many are waiting to be written.
+        while self._pending and (self._pending[0].done() or len(self._pending) > self._max_pending):
+            self._write_member(self._pending.popleft().result())
+
+    def open(self, name, mode="r", pwd=None, *, force_zip64=False):
+        # Members are written in the order they are added, so the pending files are written first.
+        if mode == "w":
+            self.flush()
+        return super(ParallelZipFile, self).open(name, mode=mode, pwd=pwd, force_zip64=force_zip64)
+
+    def flush(self):
+        """
+        Waits for the files which are being compressed and writes them to the archive.
+        """
+        while self._pending:
+            self._write_member(self._pending.popleft().result())
+
+    def close(self):
+        try:
+            if self.fp:
+                self.flush()
+        finally:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            for future in self._pending:
+                if not future.cancelled() and not future.exception():
+                    future.result().close()
+            self._pending.clear()
+            super(ParallelZipFile, self).close()
+
+    def _write_member(self, member: CompressedMember):
+        """
+        Copies the compressed member into the archive, checking the CRC of the data as it is copied.
+        """
+        zinfo = member.zinfo
+        zip64 = zinfo.file_size > ZIP64_LIMIT or zinfo.compress_size > ZIP64_LIMIT
+        if zip64 and not self._allowZip64:
+            raise LargeZipFile("Filesize would require ZIP64 extensions")
+        try:
+            with self._lock:
+                if self._writing:
+                    raise ValueError("Can't write to the ZIP file while there is another write handle open on it.")
+                self.fp.seek(self.start_dir)
+                zinfo.header_offset = self.fp.tell()
+                self._writecheck(zinfo)
+                self._didModify = True
+                self.fp.write(zinfo.FileHeader(zip64))
+
+                crc = 0
+                size = 0
+                data = member.open()
+                try:
+                    while True:
+                        chunk = data.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        crc = zlib.crc32(chunk, crc)
+                        size += len(chunk)
+                        self.fp.write(chunk)
+                finally:
+                    if data is not member.data:
+                        data.close()
+                if crc != member.expected_crc or size != zinfo.compress_size:
+                    # Drop the member, the central directory is written over it when the archive is closed.
+                    self.fp.seek(self.start_dir)
+                    self.fp.truncate()
+                    raise BadZipFile(f"{member.filename} changed while it was added to the archive.")
+
+                self.start_dir = self.fp.tell()
+                self.filelist.append(zinfo)
+                self.NameToInfo[zinfo.filename] = zinfo
+        finally:
+            member.close()
+
+
+class StreamMember(NamedTuple):
+    """
+    A file to add to a streamed archive.
+    """
+
+    arcname: str
+    # Opens the file for reading, e.g. from the storage backend.
+    open: Callable[[], IO[bytes]]
+    # The size of the file if it is known, otherwise the member is always written with ZIP64 extensions.
+    size: Optional[int] = None
+
+
+class ZipStreamBuffer(object):
+    """
+    A write only file which holds the data written by a ZipFile until it is read from the stream. It can tell but not
+    seek, so ZipFile writes the sizes and CRC of each member in a data descriptor after the data.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def read(self) -> bytes:
+        """
+        :return: The data written since the last read.
+        """
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(
+    members: Iterable[StreamMember], compression: int = ZIP_DEFLATED, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Builds a zip archive on the fly without writing it to disk, so it can be sent while it is being built. Only about
+    a chunk of each file is held in memory at a time. Formats which are already compressed are stored.
+    :param members: The files to add to the archive, they are opened one at a time as they are added.
+    :param compression: The compression for the members, ZIP_DEFLATED or ZIP_STORED.
+    :param chunk_size: The size of the chunks read from each file.
+    :return: An iterator over the bytes of the archive.
+    """
+    buffer = ZipStreamBuffer()
+    with ZipFile(buffer, "w", compression=compression, allowZip64=True) as zip_file:
+        for member in members:
+            zinfo = ZipInfo(member.arcname, date_time=time.localtime(time.time())[:6])
+            zinfo.external_attr = 0o644 << 16
+            zinfo.compress_type = ZIP_STORED if is_compressed_format(member.arcname) else compression
+            zinfo.file_size = member.size or 0
+            with member.open() as source, zip_file.open(zinfo, "w", force_zip64=member.size is None) as destination:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    destination.write(chunk)
+                    data = buffer.read()
+                    if data:
+                        yield data
+            data = buffer.read()
+            if data:
+                yield data
+    # The central directory is written when the archive is closed.
+    yield buffer.read()
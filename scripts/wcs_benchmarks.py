@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from gdal_utils import merge_geotiffs
+
+from eventkit_cloud.utils.tests.wcs_server import wcs_server
+from eventkit_cloud.utils.wcs import WCSConverter, mosaic_geotiffs
+
+"""
+    Compares fetching WCS coverage tiles one at a time and merging them with merge_geotiffs, against fetching them
+    concurrently and assembling them through a VRT, using a local stand-in WCS server.
+    From the project directory run:
+    ./manage.py runscript wcs_benchmarks --script-args <latency> <tile_concurrency> -v2
+    Depends on django-extensions.
+"""
+
+
+class LocalProcess(object):
+    """
+    Runs the assembly in this process, TaskProcess would otherwise need a task record to report to.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start_process(self, func, *args, **kwargs):
+        return func()
+
+
+def run_mode(name, server_url, stage_dir, tile_concurrency, merge):
+    out = os.path.join(stage_dir, f"{name}.tif")
+    config = {
+        "service": {"scale": "30", "coverages": "1"},
+        "params": {"VERSION": "1.0.0", "REQUEST": "GetCoverage", "FORMAT": "geotiff", "CRS": "EPSG:4326"},
+        "tile_concurrency": tile_concurrency,
+    }
+    converter = WCSConverter(
+        config=config, out=out, bbox=[-0.25, -0.25, 0.25, 0.25], service_url=server_url, layer="1", name=name
+    )
+    with patch("eventkit_cloud.utils.wcs.TaskProcess", LocalProcess), patch(
+        "eventkit_cloud.utils.wcs.mosaic_geotiffs", merge
+    ):
+        start = time.perf_counter()
+        converter.convert()
+        duration = time.perf_counter() - start
+    size = os.stat(out).st_size / 1024 / 1024.00
+    print(f"{name}: {duration:.2f}s, result file size: {size:.2f}MB")
+    return duration
+
+
+def run(*script_args):
+    latency = float(script_args[0]) if script_args else 0.2
+    tile_concurrency = int(script_args[1]) if len(script_args) > 1 else 4
+
+    with tempfile.TemporaryDirectory() as stage_dir, wcs_server(latency=latency) as server:
+        print(f"Serving tiles with {latency}s of latency.")
+        serial = run_mode("serial_merge", server.url, stage_dir, 1, merge_geotiffs)
+        requests_per_run = len(server.requests)
+        concurrent = run_mode("concurrent_vrt", server.url, stage_dir, tile_concurrency, mosaic_geotiffs)
+        print(f"{requests_per_run} tiles per run, at most {server.max_active_requests} requests at once.")
+        print(f"Speedup with {tile_concurrency} concurrent requests: {serial / concurrent:.2f}x")